@@ -0,0 +1,4 @@
+"""
+Benchmarks for valid_model.  Each module can be run on its own with
+python -m benchmarks.<module> [n] or all of them with python -m benchmarks
+"""
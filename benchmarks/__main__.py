@@ -0,0 +1,6 @@
+from benchmarks import intern, is_in, async_validate, pool, startup, reads, scalars, construction, sampling, parsing
+
+for module in (intern, is_in, async_validate, pool, startup, reads, scalars, construction, sampling, parsing):
+	print module.__doc__.strip()
+	module.main()
+	print ''
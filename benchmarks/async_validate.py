@@ -0,0 +1,30 @@
+"""
+Deferred validators run concurrently by async_validate versus sequentially
+"""
+import time
+from valid_model import Object
+from valid_model.descriptors import Integer, List
+from valid_model.validators import deferred
+from benchmarks.utils import timed, report, get_n
+
+LATENCY = 0.005
+
+def lookup(value):
+	time.sleep(LATENCY)
+	return True
+
+class Foo(Object):
+	refs = List(value=Integer(validator=deferred(lookup)))
+
+def sequential(obj):
+	for _, validator, value in obj.deferred_checks():
+		validator(value)
+
+def main(n=50):
+	# unique values, so both run the same checks and only concurrency differs
+	obj = Foo(refs=range(n))
+	report('sequential, {} checks'.format(n), timed(sequential, obj), n)
+	report('async_validate, {} checks'.format(n), timed(obj.async_validate), n)
+
+if __name__ == '__main__':
+	main(get_n(50))
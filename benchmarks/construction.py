@@ -0,0 +1,44 @@
+"""
+Constructing instances from keyword arguments, with and without
+validators and mutators
+"""
+from datetime import datetime
+from valid_model import Object
+from valid_model.descriptors import Bool, DateTime, Float, Integer, String
+from benchmarks.utils import timed, report, get_n
+
+def positive(value):
+	return value >= 0
+
+def strip(value):
+	return value.strip()
+
+class Plain(Object):
+	name = String()
+	count = Integer()
+	ratio = Float()
+	flag = Bool()
+	created = DateTime()
+
+class Checked(Object):
+	name = String(mutator=strip)
+	count = Integer(validator=positive)
+	ratio = Float(validator=positive)
+	flag = Bool()
+	created = DateTime()
+
+def construct(klass, docs):
+	for doc in docs:
+		klass(**doc)
+
+def main(n=100000):
+	created = datetime(2015, 1, 1)
+	docs = [
+		dict(name=u'item', count=i, ratio=i * 0.5, flag=bool(i % 2), created=created)
+		for i in xrange(n)
+	]
+	report('no validators or mutators', timed(construct, Plain, docs), n)
+	report('validators and mutators', timed(construct, Checked, docs), n)
+
+if __name__ == '__main__':
+	main(get_n(100000))
@@ -0,0 +1,49 @@
+"""
+Memory used by low cardinality String fields with and without interning
+"""
+from valid_model import Object
+from valid_model.descriptors import String, List
+from benchmarks.utils import timed, report, size_of_distinct, get_n
+
+COUNTRIES = ['US', 'GB', 'FR', 'DE', 'IL', 'IN', 'JP', 'BR']
+DEVICES = ['desktop', 'mobile', 'tablet']
+
+class Plain(Object):
+	country = String()
+	device = String()
+	tags = List(value=String())
+
+class Interned(Object):
+	country = String(intern=True)
+	device = String(intern=1000)
+	tags = List(value=String(intern=True))
+
+def docs(n):
+	# values are decoded from str on every assignment like values from a parser
+	for i in xrange(n):
+		yield {
+			'country': COUNTRIES[i % len(COUNTRIES)],
+			'device': DEVICES[i % len(DEVICES)],
+			'tags': [COUNTRIES[(i + 1) % len(COUNTRIES)], DEVICES[i % len(DEVICES)]],
+		}
+
+def strings(objs):
+	for obj in objs:
+		yield obj.country
+		yield obj.device
+		for tag in obj.tags:
+			yield tag
+
+def main(n=100000):
+	for model in (Plain, Interned):
+		objs = []
+		seconds = timed(objs.extend, (model(**doc) for doc in docs(n)))
+		report('{} construct'.format(model.__name__), seconds, n)
+		count, size = size_of_distinct(strings(objs))
+		print '{:<40} {:>10} objects {:>12} bytes'.format(
+			'{} distinct strings'.format(model.__name__), count, size
+		)
+		del objs
+
+if __name__ == '__main__':
+	main(get_n(100000))
@@ -0,0 +1,23 @@
+"""
+Membership validators against large allow-lists
+"""
+from valid_model.validators import is_in, between
+from benchmarks.utils import timed, report, get_n
+
+def check(validator, values):
+	for value in values:
+		validator(value)
+
+def main(n=20000):
+	for size in (10, 1000, 10000):
+		allowed = range(0, size * 2, 2)
+		values = [i % (size * 2) for i in xrange(n)]
+		report('list scan, {} items'.format(size), timed(check, lambda x: x in allowed, values), n)
+		report('is_in, {} items'.format(size), timed(check, is_in(allowed), values), n)
+		report('is_in xrange, {} items'.format(size), timed(check, is_in(xrange(0, size * 2, 2)), values), n)
+	values = range(n)
+	report('lambda range check', timed(check, lambda x: 10 <= x <= 5000, values), n)
+	report('between', timed(check, between(10, 5000), values), n)
+
+if __name__ == '__main__':
+	main(get_n(20000))
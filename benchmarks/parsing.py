@@ -0,0 +1,43 @@
+"""
+Parsing ISO-8601 timestamps with strptime, utils.parse_datetime and by
+assigning them to DateTime(parse=True) attributes, with distinct and with
+repeating timestamps
+"""
+from datetime import datetime, timedelta
+from valid_model import Object
+from valid_model.descriptors import DateTime
+from valid_model.utils import parse_datetime
+from benchmarks.utils import timed, report, get_n
+
+FORMAT = '%Y-%m-%dT%H:%M:%S'
+
+class Event(Object):
+	created = DateTime(parse=True)
+	updated = DateTime(parse=100000)
+
+def with_strptime(values):
+	for value in values:
+		datetime.strptime(value, FORMAT)
+
+def with_parser(values):
+	for value in values:
+		parse_datetime(value)
+
+def assign(name, values):
+	obj = Event()
+	for value in values:
+		setattr(obj, name, value)
+
+def main(n=100000):
+	start = datetime(2015, 1, 1)
+	distinct = [(start + timedelta(seconds=i)).strftime(FORMAT) for i in xrange(n)]
+	# a batch in which every timestamp appears 100 times
+	repeated = [distinct[i // 100] for i in xrange(n)]
+	report('strptime', timed(with_strptime, distinct), n)
+	report('parse_datetime', timed(with_parser, distinct), n)
+	report('DateTime(parse=100000), distinct', timed(assign, 'updated', distinct), n)
+	report('DateTime(parse=True), repeated', timed(assign, 'created', repeated), n)
+	report('strptime, repeated', timed(with_strptime, repeated), n)
+
+if __name__ == '__main__':
+	main(get_n(100000))
@@ -0,0 +1,43 @@
+"""
+Short-lived instances allocated per request versus reused from Object.pool
+"""
+from valid_model import Object
+from valid_model.descriptors import String, Integer, List, Dict
+from benchmarks.utils import collected, report, get_n
+
+PER_REQUEST = 1000
+
+class Event(Object):
+	name = String()
+	user_id = Integer()
+	tags = List(value=String())
+	data = Dict(key=String())
+
+def handle(event):
+	event.tags.append('seen')
+	event.data['count'] = 1
+
+def allocated(requests):
+	for _ in xrange(requests):
+		events = [Event(name='click', user_id=i) for i in xrange(PER_REQUEST)]
+		for event in events:
+			handle(event)
+
+def pooled(requests):
+	pool = Event.pool(PER_REQUEST)
+	for _ in xrange(requests):
+		events = [pool.acquire(name='click', user_id=i) for i in xrange(PER_REQUEST)]
+		for event in events:
+			handle(event)
+			event.release()
+
+def main(n=200):
+	# long lived objects make every collection more expensive
+	heap = [{'i': i} for i in xrange(100000)]
+	for label, func in (('allocated', allocated), ('pooled', pooled)):
+		seconds, collections = collected(func, n)
+		report('{}, {} collections'.format(label, collections), seconds, n * PER_REQUEST)
+	del heap
+
+if __name__ == '__main__':
+	main(get_n(200))
@@ -0,0 +1,39 @@
+"""
+Attribute reads in a scoring loop with and without __fast_reads__
+"""
+from valid_model import Object
+from valid_model.descriptors import Float, Integer
+from benchmarks.utils import timed, report, get_n
+
+class Signal(Object):
+	weight = Float(default=1.0)
+	count = Integer(default=0)
+
+class FastSignal(Signal):
+	__fast_reads__ = True
+
+class Plain(object):
+	def __init__(self, weight=1.0, count=0):
+		self.weight = weight
+		self.count = count
+
+def score(signals):
+	total = 0.0
+	for signal in signals:
+		total += signal.weight * signal.count
+	return total
+
+def main(n=1000000):
+	repeat = 10
+	for label, klass in (('descriptor reads', Signal), ('__fast_reads__', FastSignal), ('plain object', Plain)):
+		signals = [klass(weight=0.5, count=i) for i in xrange(n // repeat)]
+		report(label, timed(lambda: [score(signals) for _ in xrange(repeat)]), n * 2)
+	for label, klass in (('descriptor writes', Signal), ('__fast_reads__ writes', FastSignal)):
+		signal = klass()
+		def write():
+			for i in xrange(n):
+				signal.count = i
+		report(label, timed(write), n)
+
+if __name__ == '__main__':
+	main(get_n(1000000))
@@ -0,0 +1,35 @@
+"""
+Assigning lists of 10000 embedded objects validated completely or by a
+sample of 100 elements
+"""
+from valid_model import Object
+from valid_model.descriptors import EmbeddedObject, Float, Integer, List
+from benchmarks.utils import timed, report, get_n
+
+class Point(Object):
+	x = Float()
+	y = Float()
+	label = Integer()
+
+class Full(Object):
+	points = List(value=EmbeddedObject(Point))
+
+class Sampled(Object):
+	points = List(value=EmbeddedObject(Point), sample=100)
+
+def assign(klass, points, repeat):
+	for _ in xrange(repeat):
+		klass(points=points)
+
+def complete(points, repeat):
+	for _ in xrange(repeat):
+		Sampled(points=points).validate(full=True)
+
+def main(n=10):
+	points = [{'x': i * 0.5, 'y': i * 0.25, 'label': i} for i in xrange(10000)]
+	report('full validation', timed(assign, Full, points, n), n)
+	report('sample=100', timed(assign, Sampled, points, n), n)
+	report('sample=100 then validate(full=True)', timed(complete, points, n), n)
+
+if __name__ == '__main__':
+	main(get_n(10))
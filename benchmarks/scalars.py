@@ -0,0 +1,37 @@
+"""
+Assignments to Integer, Float, Bool and String attributes
+"""
+from valid_model import Object
+from valid_model.descriptors import Integer, Float, Bool, String
+from benchmarks.utils import timed, report, get_n
+
+class Scalars(Object):
+	integer = Integer()
+	float = Float()
+	bool = Bool()
+	string = String()
+
+def assign(obj, name, values, repeat):
+	for _ in xrange(repeat):
+		for value in values:
+			setattr(obj, name, value)
+
+CASES = (
+	('Integer = int', 'integer', range(100)),
+	('Integer = float', 'integer', [i + 0.5 for i in range(100)]),
+	('Float = float', 'float', [i + 0.5 for i in range(100)]),
+	('Float = int', 'float', range(100)),
+	('Bool = bool', 'bool', [True, False] * 50),
+	('Bool = int', 'bool', [1, 0] * 50),
+	('String = unicode', 'string', [unicode(i) for i in range(100)]),
+	('String = str', 'string', [str(i) for i in range(100)]),
+)
+
+def main(n=1000000):
+	obj = Scalars()
+	for label, name, values in CASES:
+		repeat = max(n // len(values), 1)
+		report(label, timed(assign, obj, name, values, repeat), repeat * len(values))
+
+if __name__ == '__main__':
+	main(get_n(1000000))
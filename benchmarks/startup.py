@@ -0,0 +1,66 @@
+"""
+Importing a generated package of models which share base classes
+"""
+import resource
+import shutil
+import sys
+import tempfile
+import time
+import os
+import py_compile
+from benchmarks.utils import report, get_n
+
+FIELDS = ('String()', 'Integer()', 'Float()', 'Bool()', 'List(value=String())')
+
+def model_source(n):
+	lines = [
+		'from valid_model import Object',
+		'from valid_model.descriptors import String, Integer, Float, Bool, List',
+		'',
+		'class Base(Object):',
+	]
+	lines.extend('\tbase_{} = {}'.format(f, FIELDS[f % len(FIELDS)]) for f in xrange(20))
+	for i in xrange(n):
+		parent = 'Base' if i % 10 == 0 else 'Model{}'.format(i - 1)
+		lines.append('class Model{}({}):'.format(i, parent))
+		lines.extend(
+			'\tfield_{}_{} = {}'.format(i, f, FIELDS[f % len(FIELDS)]) for f in xrange(5)
+		)
+	return '\n'.join(lines) + '\n'
+
+def rss_kb():
+	"""
+	Current resident memory where /proc is available, otherwise the peak
+	"""
+	try:
+		with open('/proc/self/statm') as statm:
+			return int(statm.read().split()[1]) * resource.getpagesize() // 1024
+	except IOError:
+		return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+def main(n=400):
+	path = tempfile.mkdtemp()
+	try:
+		source = os.path.join(path, 'generated_models.py')
+		with open(source, 'w') as module:
+			module.write(model_source(n))
+		# deployments import byte compiled modules
+		py_compile.compile(source)
+		sys.path.insert(0, path)
+		rss = rss_kb()
+		start = time.time()
+		import generated_models
+		seconds = time.time() - start
+		rss = rss_kb() - rss
+		report('import {} models, +{}KB rss'.format(n, rss), seconds, n)
+		start = time.time()
+		for i in xrange(n):
+			getattr(generated_models, 'Model{}'.format(i))()
+		report('first instance of each model', time.time() - start, n)
+	finally:
+		sys.path.remove(path)
+		sys.modules.pop('generated_models', None)
+		shutil.rmtree(path)
+
+if __name__ == '__main__':
+	main(get_n(400))
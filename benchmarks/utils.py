@@ -0,0 +1,60 @@
+import gc
+import sys
+import time
+import weakref
+
+def timed(func, *args):
+	"""
+	Return the wall clock seconds taken by func(*args) with the garbage
+	collector disabled
+	"""
+	gc.collect()
+	gc.disable()
+	try:
+		start = time.time()
+		func(*args)
+		return time.time() - start
+	finally:
+		gc.enable()
+
+class _Sentinel(object):
+	pass
+
+def collected(func, *args):
+	"""
+	Return the wall clock seconds taken by func(*args) and the number of garbage
+	collections which ran meanwhile, with the garbage collector enabled.
+	Collections are counted with a cyclic sentinel in the youngest generation
+	which is replaced every time it is collected.
+	"""
+	count = [0]
+	refs = [None]
+	def arm():
+		sentinel = _Sentinel()
+		sentinel.cycle = sentinel
+		refs[0] = weakref.ref(sentinel, collected)
+	def collected(_):
+		count[0] += 1
+		arm()
+	gc.collect()
+	arm()
+	start = time.time()
+	func(*args)
+	seconds = time.time() - start
+	refs[0] = None
+	return seconds, count[0]
+
+def report(label, seconds, n):
+	print '{:<40} {:>8.3f}s {:>10.1f}ns/op'.format(label, seconds, seconds * 1e9 / n)
+
+def size_of_distinct(values):
+	"""
+	Count the distinct objects in values and the bytes they use
+	"""
+	seen = {}
+	for value in values:
+		seen[id(value)] = value
+	return len(seen), sum(sys.getsizeof(value) for value in seen.itervalues())
+
+def get_n(default):
+	return int(sys.argv[1]) if len(sys.argv) > 1 else default
@@ -1,5 +1,6 @@
 from valid_model.utils import is_descriptor
 from valid_model.descriptors import *
+from valid_model.schema import layout
 import types
 
 #TODO: figure how to bind C* functions such as NOW() to a value
@@ -162,71 +163,10 @@ def where_clause(obj, expression):
 	obj.parameters.append(other)
 	return' {}{}%s'.format(field, op)
 
-_type_map = {
-	String: 'text',
-	Integer: 'int',
-	Float: 'float',
-	Bool: 'boolean',
-	DateTime: 'timestamp',
-}
-_container_map = {
-	ObjectList: lambda x: 'list',
-	ObjectDict: lambda x: 'map',
-	EmbeddedObject: lambda x: x.class_obj.__name__.lower(),
-	List: lambda x: 'list',
-	Set: lambda x: 'set',
-	Dict: lambda x: 'map',
-}
 def cassandra_model(klass):
 	def generate_ddl(cls):
-		tablename = getattr(cls, '__cassandra_table__', cls.__name__.lower())
-		if not tablename:
-			raise ValueError('__cassandra_table__ must be defined with a non-empty string')
-		partition = getattr(cls, '__cassandra_partition__', None) or ([field for field in cls.field_names if not getattr(cls, field).nullable], tuple())
-		if not partition:
-			raise ValueError('__cassandra_partition__ must be defined as a tuple of 2 tuples')
-		ordering = getattr(cls, '__cassandra_order__', None) or None
-		options = getattr(cls, '__cassandra_options__', None) or []
-		columns = {}
-		for field in cls.field_names:
-			desc = getattr(cls, field)
-			desc_class = desc.__class__
-			if desc_class in _container_map:
-				cass_type = _container_map[desc_class](desc)
-				try:
-					value_desc = desc_class.value.__class__
-				except AttributeError:
-					value_desc = String
-				value_name = _type_map[value_desc]
-				if cass_type == 'map':
-					try:
-						key_desc = desc_class.key.__class__
-					except AttributeError:
-						key_desc = String
-					key_name = _type_map[key_desc]
-					columns[field] = "map<{},{}>".format(key_name, value_name)
-				else:
-					columns[field] = "{}<{}>".format(cass_type, value_name)
-			else:
-				columns[field] = _type_map[desc_class]
-
-		ddl = "CREATE TABLE {} (".format(tablename)
-		for name, type_ in columns.iteritems():
-			ddl += "\n\t{} {},".format(name, type_)
-		ddl += "\n\tPRIMARY KEY (({})".format(','.join(partition[0]))
-		if partition[1]:
-			ddl += ", {}".format(','.join(partition[1]))
-		ddl += ")\n)"
-		if options or ordering:
-			ddl += " WITH "
-			if ordering:
-				ddl += "CLUSTERING ORDER BY ({})".format(ordering)
-			if ordering and options:
-				ddl += "\nAND "	
-			if options:
-				ddl += "\nAND {}".join(options)
-
-		return ddl
+		"CREATE TYPE statements for embedded models followed by CREATE TABLE"
+		return layout(cls).ddl()
 
 	for desc_name in klass.field_names:
 		patch_descriptor(getattr(klass, desc_name).__class__)
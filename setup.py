@@ -14,7 +14,7 @@ setup(name='valid_model',
       author_email='jforman@outbrain.com',
       url='http://www.outbrain.com/',
       license='',
-      packages=find_packages(exclude=['ez_setup', 'examples', 'tests']),
+      packages=find_packages(exclude=['ez_setup', 'examples', 'tests', 'benchmarks']),
       include_package_data=True,
       zip_safe=False,
       install_requires=[
@@ -168,6 +168,207 @@ class TestObject(unittest.TestCase):
 			{'basic', 'default', 'called_default', 'new_attr'}
 		)
 
+	def test_inherited_fields(self):
+		from valid_model import Object
+		from valid_model.descriptors import Integer, String
+		class Mixin(object):
+			mixed = String()
+		class Base(Object):
+			a = Integer(default=1)
+			b = Integer()
+		class Child(Base, Mixin):
+			b = None
+			c = Integer()
+		self.assertSetEqual(Child.field_names, {'a', 'c', 'mixed'})
+		self.assertIs(Child.a, Base.a)
+		self.assertEquals(Child.mixed.name, 'mixed')
+		# constructors are compiled on first instantiation
+		self.assertIsNone(vars(Child)['_field_descriptors'])
+		self.assertEquals(Child(mixed='x').__json__(), {'a': 1, 'c': None, 'mixed': u'x'})
+		self.assertEquals(len(Child._field_descriptors), 3)
+		self.assertIsNone(vars(Base)['_field_descriptors'])
+
+	def test_update(self):
+		from valid_model import Object, ValidationError
+		from valid_model.descriptors import Integer, String, List
+		class Foo(Object):
+			__json_cache__ = True
+			a = Integer()
+			b = String(validator=lambda x: len(x) < 3)
+			c = List(value=Integer())
+		instance = Foo(a=1, b='x')
+		instance.__json__()
+		doc = dict(('junk{}'.format(i), i) for i in xrange(100))
+		doc.update(a=2, c=[3])
+		instance.update(doc)
+		self.assertEquals(instance.__json__(), {'a': 2, 'b': u'x', 'c': [3]})
+
+		with self.assertRaises(ValidationError) as ctx:
+			instance.update({'a': 5, 'zz': 1, 'yy': 2}, strict=True)
+		self.assertEquals(str(ctx.exception), "unknown fields 'yy', 'zz'")
+		self.assertEquals(instance.a, 2)
+		self.assertRaises(ValidationError, instance.update, {u'\xe9': 1}, strict=True)
+
+		# nothing is set when any value is invalid
+		self.assertRaises(
+			ValidationError, instance.update, {'a': 7, 'c': [4], 'b': 'long'}, atomic=True
+		)
+		self.assertEquals(instance.__json__(), {'a': 2, 'b': u'x', 'c': [3]})
+		tags = instance.c
+		instance.update({'a': 7, 'c': [4], 'b': 'ok'}, atomic=True)
+		self.assertEquals(instance.__json__(), {'a': 7, 'b': u'ok', 'c': [4]})
+		self.assertIsNot(instance.c, tags)
+		self.assertIs(instance.c.owner, instance)
+		instance.c.append(5)
+		self.assertEquals(instance.__json__()['c'], [4, 5])
+
+	def test_equality(self):
+		from valid_model import Object
+		from valid_model.descriptors import Integer, String, List, Dict, EmbeddedObject
+		class Part(Object):
+			label = String()
+		class Foo(Object):
+			a = Integer()
+			tags = List(value=String())
+			part = EmbeddedObject(Part)
+			parts = List(value=EmbeddedObject(Part))
+			named = Dict(value=EmbeddedObject(Part))
+		def make():
+			return Foo(
+				a=1, tags=['x', 'y'], part={'label': 'p'},
+				parts=[{'label': 'q'}], named={'r': {'label': 'r'}}
+			)
+		first, second = make(), make()
+		self.assertTrue(first == second)
+		self.assertFalse(first != second)
+		self.assertEquals(first.diff(second), [])
+		self.assertNotEqual(first, Part())
+		self.assertNotEqual(first, None)
+		# equal instances which are not frozen can not be hashed consistently
+		self.assertRaises(TypeError, hash, first)
+		self.assertRaises(TypeError, set, [first])
+
+		second.a = 2
+		second.tags.append('z')
+		second.part.label = 'other'
+		second.parts[0].label = 'other'
+		second.named['s'] = Part()
+		self.assertNotEqual(first, second)
+		self.assertEquals(
+			first.diff(second),
+			['a', "named['s']", 'part.label', 'parts[0].label', 'tags[2]']
+		)
+		self.assertRaises(TypeError, first.diff, Part())
+
+		# frozen lists are tuples but still compare equal to lists
+		frozen = make().freeze()
+		self.assertEquals(frozen, first)
+		self.assertEquals(first, frozen)
+		self.assertEquals(frozen.diff(second), first.diff(second))
+		self.assertEquals(hash(frozen), hash(make().freeze()))
+
+	def test_fingerprint(self):
+		from datetime import datetime, timedelta, tzinfo
+		from valid_model import Object
+		from valid_model.descriptors import (
+			Integer, Float, String, DateTime, Set, Dict, EmbeddedObject
+		)
+		class Offset(tzinfo):
+			def __init__(self, hours):
+				self.hours = hours
+			def utcoffset(self, dt):
+				return timedelta(hours=self.hours)
+		class Part(Object):
+			label = String()
+		class Foo(Object):
+			a = Integer()
+			b = Float()
+			when = DateTime()
+			tags = Set(value=String())
+			scores = Dict(value=Integer())
+			part = EmbeddedObject(Part)
+		class Cached(Foo):
+			__json_cache__ = True
+		def make(klass=Foo, **kwargs):
+			doc = dict(
+				a=1, b=1.0, when=datetime(2014, 1, 1, 12), tags=set(['x', 'y', 'z']),
+				scores={'m': 1, 'n': 2}, part={'label': 'p'}
+			)
+			doc.update(kwargs)
+			return klass(**doc)
+
+		first = make()
+		self.assertEquals(len(first.fingerprint()), 40)
+		self.assertEquals(first.fingerprint(), make().fingerprint())
+		# aware datetimes are compared in UTC
+		self.assertEquals(
+			make(when=datetime(2014, 1, 1, 12, tzinfo=Offset(0))).fingerprint(),
+			make(when=datetime(2014, 1, 1, 13, tzinfo=Offset(1))).fingerprint()
+		)
+		self.assertEquals(first.fingerprint(), make().freeze().fingerprint())
+		for changes in ({'a': 2}, {'tags': set(['x'])}, {'scores': {'m': 1}}, {'part': {'label': 'q'}}):
+			self.assertNotEqual(first.fingerprint(), make(**changes).fingerprint())
+		self.assertNotEqual(first.fingerprint(), make(Cached).fingerprint())
+		first.tags.add('w')
+		self.assertNotEqual(first.fingerprint(), make().fingerprint())
+
+		# cached until the instance or an Object nested in it changes
+		cached = make(Cached)
+		fingerprint = cached.fingerprint()
+		self.assertIs(cached.fingerprint(), fingerprint)
+		cached.part.label = 'q'
+		self.assertNotEqual(cached.fingerprint(), fingerprint)
+		cached.part.label = 'p'
+		self.assertEquals(cached.fingerprint(), fingerprint)
+		cached.scores['o'] = 3
+		self.assertNotEqual(cached.fingerprint(), fingerprint)
+
+		frozen = make().freeze()
+		self.assertIs(frozen.fingerprint(), frozen.fingerprint())
+
+		from valid_model.descriptors import Generic
+		class Opaque(Object):
+			value = Generic()
+		self.assertRaises(TypeError, Opaque(value=object()).fingerprint)
+
+	def test_project(self):
+		from valid_model import Object, ValidationError
+		from valid_model.descriptors import Integer, String, List
+		class Foo(Object):
+			a = Integer(nullable=False, default=0)
+			b = String(validator=lambda x: len(x) < 3)
+			c = List(value=Integer())
+			d = String(nullable=False, default=u'')
+			def validate(self):
+				Object.validate(self)
+				if self.a < 0:
+					raise ValidationError('a')
+		Summary = Foo.project('a', 'c')
+		self.assertIs(Foo.project('c', 'a'), Summary)
+		self.assertIs(Summary.project('a'), Foo.project('a'))
+		self.assertEquals(Summary.field_names, set(['a', 'c']))
+		self.assertTrue(issubclass(Summary, Foo))
+		self.assertRaises(ValueError, Foo.project, 'a', 'zz')
+		self.assertRaises(ValueError, Summary.project, 'b')
+
+		# other fields are neither set nor validated
+		summary = Summary(a=1, b='too long', c=[2])
+		self.assertEquals(summary.__json__(), {'a': 1, 'c': [2]})
+		self.assertRaises(AttributeError, getattr, summary, 'b')
+		self.assertRaises(AttributeError, setattr, summary, 'b', 'x')
+		self.assertRaises(ValidationError, Summary, a=None)
+		summary.validate()
+
+		full = summary.upgrade({'b': 'ok'})
+		self.assertIs(type(full), Foo)
+		self.assertEquals(full.__json__(), {'a': 1, 'b': u'ok', 'c': [2], 'd': u''})
+		full.c.append(3)
+		self.assertEquals(summary.c, [2])
+		self.assertIs(full.c.owner, full)
+		self.assertRaises(ValidationError, summary.upgrade, {'b': 'too long'})
+		self.assertEquals(summary.freeze().upgrade().__json__()['c'], [2])
+		self.assertRaises(TypeError, full.upgrade)
+
 	def test_nested_object(self):
 		# test initization from dict
 		Foo, Bar = self._make_nested()
@@ -247,14 +448,440 @@ class TestObject(unittest.TestCase):
 		instance = Foo(embedded={'a': 'b'})
 		self.assertDictEqual(instance.__json__(), {'basic': None, 'default': 5, 'embedded': {'a': 'b'}})
 
+	def test_freeze(self):
+		import copy
+		from valid_model import Object
+		from valid_model.descriptors import Generic, EmbeddedObject, List, Set, Dict
+		from valid_model.utils import FrozenDict
+		class Bar(Object):
+			t1 = Generic()
+		class Foo(Object):
+			embedded = EmbeddedObject(Bar)
+			items = List(value=EmbeddedObject(Bar))
+			tags = Set()
+			mapping = Dict()
+		def make():
+			return Foo(
+				embedded={'t1': [1, 2]}, items=[{'t1': 1}], tags={'a'},
+				mapping={'a': {'b': [1]}}
+			)
+		instance = make()
+		json_doc = instance.__json__()
+		self.assertIs(instance.freeze(), instance)
+		self.assertTrue(instance.embedded._frozen)
+		self.assertTrue(instance.items[0]._frozen)
+		self.assertEquals(instance.embedded.t1, (1, 2))
+		self.assertTrue(isinstance(instance.items, tuple))
+		self.assertTrue(isinstance(instance.tags, frozenset))
+		self.assertTrue(isinstance(instance.mapping, FrozenDict))
+		self.assertEquals(instance.mapping['a']['b'], (1,))
+
+		self.assertRaises(TypeError, setattr, instance, 'tags', set())
+		self.assertRaises(TypeError, delattr, instance, 'tags')
+		self.assertRaises(TypeError, setattr, instance.embedded, 't1', 5)
+		self.assertRaises(TypeError, instance.update, {'tags': set()})
+		self.assertRaises(TypeError, instance.mapping.__setitem__, 'b', 1)
+		self.assertRaises(TypeError, instance.mapping.pop, 'a')
+		self.assertFalse(hasattr(instance.items, 'append'))
+		instance.validate()
+
+		self.assertEquals(instance.__json__(), json_doc)
+		self.assertIs(instance.__json__(), instance.__json__())
+		self.assertEquals(hash(instance), hash(make().freeze()))
+		self.assertNotEquals(hash(instance), hash(Foo().freeze()))
+		self.assertEquals(len(set([instance, instance])), 1)
+		duplicate = copy.deepcopy(instance)
+		self.assertEquals(duplicate.mapping, instance.mapping)
+		self.assertTrue(isinstance(duplicate.mapping, FrozenDict))
+
+		# unfrozen instances are unhashable and keep mutable containers
+		other = make()
+		self.assertRaises(TypeError, hash, other)
+		other.tags.add('b')
+		other.embedded.t1 = 5
+
+	def test_copy_caches(self):
+		import copy
+		from valid_model import Object
+		from valid_model.descriptors import String, List
+		class Foo(Object):
+			__json_cache__ = True
+			name = String()
+			tags = List(value=String())
+		instance = Foo(name='a', tags=['a'])
+		instance.__json__()
+		instance.fingerprint()
+		duplicate = copy.deepcopy(instance)
+		for attr in ('_json_cache', '_fingerprint_cache', '_parents'):
+			self.assertIs(getattr(duplicate, attr), None)
+		duplicate.name = 'b'
+		self.assertEquals(duplicate.__json__(), {'name': u'b', 'tags': [u'a']})
+		self.assertEquals(instance.__json__(), {'name': u'a', 'tags': [u'a']})
+		self.assertNotEquals(duplicate.fingerprint(), instance.fingerprint())
+
+		frozen = Foo(name='c').freeze()
+		hash(frozen)
+		duplicate = copy.deepcopy(frozen)
+		self.assertNotIn('_hash_cache', vars(duplicate))
+		self.assertEquals(hash(duplicate), hash(frozen))
+		self.assertRaises(TypeError, setattr, duplicate, 'name', 'd')
+		# shallow copies do not share fields
+		shallow = copy.copy(instance)
+		shallow.name = 'e'
+		self.assertEquals(instance.name, u'a')
+
+	def test_json_cache(self):
+		from valid_model import Object
+		from valid_model.descriptors import Generic, EmbeddedObject, List
+		class Baz(Object):
+			t1 = Generic()
+		class Bar(Object):
+			baz = EmbeddedObject(Baz)
+		class Foo(Object):
+			__json_cache__ = True
+			basic = Generic()
+			embedded = EmbeddedObject(Bar)
+			items = List(value=EmbeddedObject(Baz))
+		instance = Foo(basic=1, embedded={'baz': {'t1': 2}}, items=[{'t1': 3}])
+		json_doc = instance.__json__()
+		self.assertIs(instance.__json__(), json_doc)
+		self.assertEquals(Bar().__json__(), Bar().__json__())
+		self.assertFalse(Bar().__json__() is Bar().__json__())
+
+		instance.basic = 5
+		self.assertEquals(instance.__json__()['basic'], 5)
+
+		# changes to nested objects invalidate the parent through uncached
+		# intermediate objects
+		instance.embedded.baz.t1 = 6
+		self.assertEquals(instance.__json__()['embedded'], {'baz': {'t1': 6}})
+		instance.items[0].t1 = 7
+		self.assertEquals(instance.__json__()['items'], [{'t1': 7}])
+		del instance.embedded.baz.t1
+		self.assertEquals(instance.__json__()['embedded'], {'baz': {'t1': None}})
+
+		# container attributes touch their owner when changed in place
+		instance.items.append(Baz(t1=8))
+		self.assertEquals(instance.__json__()['items'], [{'t1': 7}, {'t1': 8}])
+		instance.items[1].t1 = 9
+		self.assertEquals(instance.__json__()['items'], [{'t1': 7}, {'t1': 9}])
+
+		# other values changed in place require touch
+		instance.basic = [1]
+		instance.__json__()
+		instance.basic.append(2)
+		self.assertEquals(instance.__json__()['basic'], [1])
+		instance.touch()
+		self.assertEquals(instance.__json__()['basic'], [1, 2])
+
+	def test_from_row(self):
+		import sqlite3
+		from valid_model import Object, ValidationError
+		from valid_model.descriptors import String, Integer, List, EmbeddedObject
+		class Child(Object):
+			name = String()
+		class Row(Object):
+			id = Integer(nullable=False)
+			name = String(mutator=lambda x: x.upper())
+			tags = List(value=String())
+			child = EmbeddedObject(Child)
+		conn = sqlite3.connect(':memory:')
+		conn.execute('CREATE TABLE rows (id INTEGER, name TEXT, extra TEXT)')
+		conn.executemany('INSERT INTO rows VALUES (?, ?, ?)', [(1, u'a', u'x'), (2, u'b', u'y')])
+
+		rows = list(Row.iter_rows(conn.execute('SELECT id, name, extra FROM rows ORDER BY id')))
+		self.assertEquals([(r.id, r.name) for r in rows], [(1, u'A'), (2, u'B')])
+		self.assertFalse(hasattr(rows[0], 'extra'))
+		self.assertEquals(rows[0].tags, [])
+		self.assertIsInstance(rows[0].child, Child)
+		# bindings are computed once per column list
+		self.assertIs(Row._row_binding(['id', 'name', 'extra']), Row._row_binding(('id', 'name', 'extra')))
+		# but no more than ROW_BINDINGS_SIZE of them are kept
+		from valid_model.base import ROW_BINDINGS_SIZE
+		for i in xrange(ROW_BINDINGS_SIZE * 2):
+			Row.from_row([1, i], ['id', 'extra{}'.format(i)])
+		self.assertTrue(len(Row._row_bindings) <= ROW_BINDINGS_SIZE)
+
+		# trusted rows are stored without being mutated or validated
+		rows = list(Row.iter_rows(conn.execute('SELECT name, id FROM rows ORDER BY id'), validate=False))
+		self.assertEquals([(r.id, r.name) for r in rows], [(1, u'a'), (2, u'b')])
+		row = Row.from_row([None, 3, {'name': 'c'}], ['tags', 'id', 'child'], validate=False)
+		self.assertEquals(row.child.name, 'c')
+		row.tags.append('d')
+		self.assertEquals(row.tags, [u'd'])
+		self.assertRaises(ValidationError, row.tags.append, 1)
+
+		self.assertRaises(ValidationError, Row.from_row, [None], ['id'])
+		self.assertEquals(Row.from_row([None], ['id'], validate=False).id, None)
+
+	def test_pool(self):
+		from valid_model import Object, ValidationError
+		from valid_model.descriptors import String, List, Dict
+		class Event(Object):
+			name = String(default='none')
+			tags = List(value=String())
+			data = Dict()
+		pool = Event.pool(2)
+		self.assertIs(Event.pool(2), pool)
+		event = pool.acquire(name='click', tags=['a'])
+		tags, fields = event.tags, event._fields
+		event.data['x'] = 1
+		event.release()
+		self.assertEquals(len(pool), 1)
+
+		reused = pool.acquire(name='view')
+		self.assertIs(reused, event)
+		self.assertIs(reused._fields, fields)
+		self.assertIs(reused.tags, tags)
+		self.assertEquals(reused.__json__(), {'name': u'view', 'tags': [], 'data': {}})
+		self.assertRaises(ValidationError, reused.tags.append, 1)
+		pool.release(reused)
+
+		with pool.borrow() as borrowed:
+			self.assertIs(borrowed, event)
+			self.assertEquals(borrowed.name, 'none')
+		self.assertEquals(len(pool), 1)
+		# at most size instances are kept
+		for obj in [pool.acquire() for _ in xrange(4)]:
+			obj.release()
+		self.assertEquals(len(pool), 2)
+		Event.pool(1)
+		self.assertEquals(len(pool), 1)
+		self.assertRaises(ValueError, Object().release)
+
+		# every cached attribute is reset
+		from valid_model.base import CACHE_ATTRIBUTES
+		event = pool.acquire()
+		for attr in CACHE_ATTRIBUTES:
+			setattr(event, attr, {})
+		event.release()
+		for attr in CACHE_ATTRIBUTES:
+			self.assertIsNone(getattr(event, attr))
+
+	def test_pool_debug(self):
+		from valid_model import Object
+		from valid_model.descriptors import String
+		class Event(Object):
+			name = String()
+		class Other(Object):
+			pass
+		pool = Event.pool(4, debug=True)
+		event = pool.acquire(name='a')
+		event.release()
+		self.assertRaises(ValueError, event.release)
+		self.assertRaises(ReferenceError, getattr, event, 'name')
+		self.assertRaises(ReferenceError, setattr, event, 'name', 'b')
+		self.assertRaises(TypeError, pool.release, Other())
+		self.assertRaises(TypeError, pool.release, Event().freeze())
+		self.assertEquals(pool.acquire().name, None)
+
+	def test_fast_reads(self):
+		import copy
+		from valid_model import Object, ValidationError, ModelTable
+		from valid_model.descriptors import Integer, String, List, EmbeddedObject
+		class Part(Object):
+			label = String()
+		class Foo(Object):
+			__fast_reads__ = True
+			__json_cache__ = True
+			a = Integer(nullable=False, default=0)
+			tags = List(value=String())
+			part = EmbeddedObject(Part)
+		class Bar(Foo):
+			b = String()
+		class FastPart(Part):
+			__fast_reads__ = True
+		self.assertIsInstance(Foo.a, Integer)
+		self.assertIs(FastPart.label, Part.label)
+		self.assertEquals(FastPart(label='p').label, u'p')
+		self.assertEquals(vars(FastPart(label='p')), {'label': u'p'})
+		self.assertEquals(Bar.field_names, set(['a', 'tags', 'part', 'b']))
+
+		instance = Bar(a=1, tags=['x'], part={'label': 'p'}, b='y')
+		self.assertIs(vars(instance), instance._fields)
+		self.assertEquals(instance.a, 1)
+		self.assertEquals(instance.__json__(), {'a': 1, 'tags': ['x'], 'part': {'label': 'p'}, 'b': u'y'})
+		self.assertRaises(ValidationError, setattr, instance, 'a', None)
+		self.assertRaises(ValidationError, setattr, instance, 'a', 'x')
+		self.assertRaises(AttributeError, setattr, instance, 'other', 1)
+		instance.tags.append('z')
+		instance.part.label = 'q'
+		del instance.b
+		self.assertEquals(instance.__json__(), {'a': 1, 'tags': ['x', 'z'], 'part': {'label': 'q'}, 'b': None})
+		self.assertEquals(copy.copy(instance), instance)
+
+		instance.update({'a': 2, 'tags': ['w']}, atomic=True)
+		self.assertEquals((instance.a, instance.tags), (2, ['w']))
+		self.assertEquals(Bar.project('a').from_row([3], ['a']).__json__(), {'a': 3})
+
+		frozen = Bar(a=4).freeze()
+		self.assertEquals(frozen.a, 4)
+		self.assertRaises(TypeError, setattr, frozen, 'a', 5)
+		self.assertEquals(hash(frozen), hash(Bar(a=4).freeze()))
+
+		pool = Foo.pool(2, debug=True)
+		pooled = pool.acquire(a=6)
+		pooled.__json__()
+		pooled.release()
+		self.assertRaises(ReferenceError, getattr, pooled, 'a')
+		self.assertIsNone(pool.acquire()._json_cache)
+
+		table = ModelTable(Foo)
+		table.append({'a': 7, 'tags': ['t']})
+		row = table[0]
+		row.a = 8
+		self.assertEquals(table[0].a, 8)
+
+	def test_async_validate(self):
+		import threading
+		import time
+		from valid_model import Object, ValidationError
+		from valid_model.descriptors import Integer, EmbeddedObject, List, Dict, String
+		from valid_model.validators import deferred
+
+		class Service(object):
+			"Stand-in for a remote lookup which records concurrent calls"
+			def __init__(self, known):
+				self.known = known
+				self.calls = []
+				self.active = 0
+				self.max_active = 0
+				self.lock = threading.Lock()
+
+			def exists(self, value):
+				with self.lock:
+					self.calls.append(value)
+					self.active += 1
+					self.max_active = max(self.max_active, self.active)
+				time.sleep(0.02)
+				with self.lock:
+					self.active -= 1
+				return value in self.known
+
+		service = Service(set([1, 2, 3, u'a']))
+		exists = deferred(service.exists, key=lambda x: ('id', x))
+		class Bar(Object):
+			ref = Integer(validator=exists)
+		class Foo(Object):
+			ref = Integer(validator=exists)
+			other = Integer(validator=deferred(lambda x: x != 0))
+			bar = EmbeddedObject(Bar)
+			bars = List(value=EmbeddedObject(Bar))
+			refs = Dict(key=String(validator=exists), value=Integer(validator=exists))
+			def deferred_validate(self):
+				service.exists(self.ref)
+				if self.ref == self.other:
+					raise ValidationError('ref and other must differ')
+				return True
+
+		# deferred validators are not run when an attribute is set
+		instance = Foo(ref=1, other=0, bar={'ref': 99}, bars=[{'ref': 2}, {'ref': 3}], refs={'a': 1})
+		self.assertEquals(service.calls, [])
+		self.assertRaises(ValidationError, instance.async_validate)
+		instance.other = 5
+		try:
+			instance.async_validate()
+		except ValidationError as ex:
+			self.assertEquals(ex.field, 'bar.ref')
+		else:
+			self.fail('ValidationError not raised')
+
+		# identical keys are only checked once per pass and run concurrently
+		instance.bar.ref = 2
+		del service.calls[:]
+		instance.async_validate()
+		self.assertEquals(sorted(service.calls), [1, 1, 2, 3, u'a'])
+		self.assertTrue(service.max_active > 1)
+		instance.refs['b'] = 1
+		try:
+			instance.async_validate()
+		except ValidationError as ex:
+			self.assertEquals(ex.field, 'refs key b')
+		else:
+			self.fail('ValidationError not raised')
+
+		# errors raised by deferred_validate propagate
+		instance.bar.ref = 1
+		instance.other = 1
+		self.assertRaises(ValidationError, instance.async_validate)
+
+		# every call shares one pool unless it is given its own
+		from multiprocessing.pool import ThreadPool
+		instance.other = 5
+		instance.refs = {'a': 1}
+		instance.async_validate()
+		threads = threading.active_count()
+		for _ in xrange(3):
+			instance.async_validate()
+		self.assertEquals(threading.active_count(), threads)
+		pool = ThreadPool(2)
+		try:
+			del service.calls[:]
+			instance.async_validate(pool)
+			self.assertTrue(service.calls)
+		finally:
+			pool.close()
+			pool.join()
+
+# pickle finds classes by their module and name
+from valid_model import Object
+from valid_model.descriptors import List, Set, Dict, Integer, String
+
+class Pickled(Object):
+	__json_cache__ = True
+	items = List(value=Integer(), sample=2, sample_edges=1)
+	tags = Set(value=String())
+	mapping = Dict(key=String(), value=Integer())
+
+class FastPickled(Pickled):
+	__fast_reads__ = True
+
+class TestPickle(unittest.TestCase):
+	def test_containers(self):
+		self._check_containers(Pickled)
+
+	def test_fast_reads(self):
+		import pickle
+		self._check_containers(FastPickled)
+		instance = FastPickled(items=[1])
+		for protocol in range(pickle.HIGHEST_PROTOCOL + 1):
+			loaded = pickle.loads(pickle.dumps(instance, protocol))
+			self.assertEquals(vars(loaded), instance._fields)
+			self.assertIs(loaded._frozen, False)
+			loaded.items = [2]
+			self.assertEquals(loaded.items, [2])
+			self.assertEquals(instance.items, [1])
+
+	def _check_containers(self, Pickled):
+		import pickle
+		from valid_model import ValidationError
+		instance = Pickled(items=[1, 2, 3, 4, 5, 6], tags=set(['a']), mapping={'a': 1})
+		self.assertTrue(instance.items.sampled)
+		instance.__json__()
+		for protocol in range(pickle.HIGHEST_PROTOCOL + 1):
+			loaded = pickle.loads(pickle.dumps(instance, protocol))
+			self.assertEquals(loaded, instance)
+			self.assertIs(loaded._json_cache, None)
+			self.assertTrue(loaded.items.sampled)
+			self.assertRaises(ValidationError, loaded.items.append, 'x')
+			self.assertRaises(ValidationError, loaded.tags.add, 1)
+			self.assertRaises(ValidationError, loaded.mapping.__setitem__, 'b', 'x')
+			loaded.__json__()
+			loaded.tags.add('b')
+			self.assertEquals(loaded.__json__()['tags'], set([u'a', u'b']))
+		frozen = pickle.loads(pickle.dumps(Pickled(tags=set(['a'])).freeze(), 2))
+		self.assertRaises(TypeError, setattr, frozen, 'tags', set())
+		self.assertEquals(frozen.tags, frozenset([u'a']))
+
 class TestGeneric(unittest.TestCase):
 	@staticmethod
-	def _make_one(default=None, validator=None, mutator=None, nullable=True):
+	def _make_one(default=None, validator=None, mutator=None, nullable=True, cache=None):
 		from valid_model.descriptors import Generic
 		from valid_model import Object
 		class Foo(Object):
 			test = Generic(
-				default=default, validator=validator, mutator=mutator, nullable=nullable
+				default=default, validator=validator, mutator=mutator, nullable=nullable,
+				cache=cache
 			)
 		return Foo()
 
@@ -290,6 +917,45 @@ class TestGeneric(unittest.TestCase):
 		self.assertRaises(TypeError, self._make_one, mutator=non_callable)
 		self.assertRaises(ValidationError, setattr, instance, 'test', 'NaN')
 
+	def test___set___defaults(self):
+		from valid_model import ValidationError
+		from valid_model.base import identity, always_valid
+		instance = self._make_one()
+		descriptor = instance.__class__.test
+		self.assertIs(descriptor.mutator, identity)
+		self.assertIs(descriptor.validator, always_valid)
+		instance.test = '5'
+		self.assertEquals(instance.test, '5')
+		# replacing the defaults later still applies them
+		descriptor.mutator = int
+		instance.test = '5'
+		self.assertEquals(instance.test, 5)
+		descriptor.validator = lambda x: x < 3
+		self.assertRaises(ValidationError, setattr, instance, 'test', '5')
+		descriptor.mutator, descriptor.validator = identity, always_valid
+		instance.test = '7'
+		self.assertEquals(instance.test, '7')
+
+	def test_cache(self):
+		from valid_model import ValidationError
+		calls = []
+		def mutator(x):
+			calls.append(x)
+			return int(x)
+		instance = self._make_one(mutator=mutator, validator=lambda x: x > 0, cache=2)
+		for value in ('1', '1', '2', '1', ['3']):
+			try:
+				instance.test = value
+			except ValidationError:
+				pass
+		self.assertEquals(instance.test, 1)
+		self.assertEquals(calls, ['1', '2', ['3']])
+		cache = instance.__class__.test.mutator.cache
+		self.assertEquals((cache.hits, cache.misses), (2, 2))
+		self.assertRaises(ValidationError, setattr, instance, 'test', '-1')
+		self.assertRaises(ValidationError, setattr, instance, 'test', '-1')
+		self.assertEquals(instance.__class__.test.validator.cache.hits, 3)
+
 class TestEmbeddedObject(unittest.TestCase):
 	@staticmethod
 	def _make_one():
@@ -360,6 +1026,236 @@ class TestObjectDict(unittest.TestCase):
 		del instance.test
 		self.assertEquals(instance.test, None)
 
+class TestValidatedContainers(unittest.TestCase):
+	@staticmethod
+	def _make_one():
+		from valid_model.descriptors import List, Set, Dict, Integer, String
+		from valid_model import Object
+		class Foo(Object):
+			__json_cache__ = True
+			items = List(value=Integer(validator=lambda x: x > 0))
+			tags = Set(value=String())
+			mapping = Dict(key=String(), value=Integer())
+		return Foo()
+
+	def test_nested(self):
+		import gc
+		import weakref
+		from valid_model import Object, ValidationError
+		from valid_model.descriptors import List, Dict, Integer, EmbeddedObject
+		class Point(Object):
+			x = Integer()
+		class Foo(Object):
+			__json_cache__ = True
+			matrix = List(value=List(value=Integer()))
+			cubes = Dict(value=List(value=List(value=Integer())))
+			points = List(value=EmbeddedObject(Point))
+		instance = Foo(matrix=[[1]], cubes={'a': [[1]]})
+		self.assertIs(instance.matrix[0].owner, instance)
+		self.assertIs(instance.cubes['a'][0].owner, instance)
+
+		# changing inner containers in place touches the owner
+		fingerprint = instance.fingerprint()
+		instance.matrix[0].append(2)
+		self.assertNotEqual(instance.fingerprint(), fingerprint)
+		self.assertEquals(instance.fingerprint(), Foo(matrix=[[1, 2]], cubes={'a': [[1]]}).fingerprint())
+		instance.cubes['a'][0].append(2)
+		self.assertEquals(instance.__json__()['cubes'], {'a': [[1, 2]]})
+		instance.matrix.append([3])
+		self.assertIs(instance.matrix[1].owner, instance)
+		self.assertRaises(ValidationError, instance.matrix[1].append, 'x')
+
+		# nothing holds on to validated elements
+		instance.points = [Point(x=1)]
+		point = weakref.ref(instance.points[0])
+		instance.points = []
+		gc.collect()
+		self.assertIsNone(point())
+
+	def test_list(self):
+		import copy
+		from valid_model import ValidationError
+		from valid_model.containers import ValidatedList
+		instance = self._make_one()
+		self.assertTrue(isinstance(instance.items, ValidatedList))
+		instance.items.append(1.5)
+		instance.items.extend([2, 3])
+		instance.items.insert(0, 4)
+		instance.items += [5]
+		instance.items[0] = 6
+		instance.items[1:2] = [7]
+		self.assertEquals(instance.items, [6, 7, 2, 3, 5])
+		self.assertRaises(ValidationError, instance.items.append, 'a')
+		self.assertRaises(ValidationError, instance.items.extend, [8, -1])
+		self.assertRaises(ValidationError, instance.items.insert, 0, -1)
+		self.assertRaises(ValidationError, instance.items.__setitem__, 0, -1)
+		self.assertRaises(ValidationError, instance.items.__setitem__, slice(0, 1), [-1])
+		self.assertEquals(instance.items, [6, 7, 2, 3, 5])
+
+		instance.__json__()
+		instance.items.sort()
+		self.assertEquals(instance.__json__()['items'], [2, 3, 5, 6, 7])
+		instance.items.pop()
+		del instance.items[0]
+		self.assertEquals(instance.__json__()['items'], [3, 5, 6])
+
+		# reassigning a tracked container keeps it and skips revalidation
+		items = instance.items
+		instance.items = items
+		self.assertIs(instance.items, items)
+		instance.validate()
+		other = self._make_one()
+		other.items = items
+		self.assertIsNot(other.items, items)
+		self.assertIs(other.items.owner, other)
+
+		# copies and pickles of instances keep validating their containers
+		for duplicate in (copy.deepcopy(instance), copy.copy(instance)):
+			self.assertIsInstance(duplicate.items, ValidatedList)
+			self.assertIs(duplicate.items.owner, duplicate)
+			self.assertRaises(ValidationError, duplicate.items.append, 'a')
+			duplicate.__json__()
+			duplicate.items.append(8)
+			self.assertEquals(duplicate.__json__()['items'], [3, 5, 6, 8])
+		self.assertEquals(instance.items, [3, 5, 6])
+
+	def test_set(self):
+		from valid_model import ValidationError
+		from valid_model.containers import ValidatedSet
+		instance = self._make_one()
+		self.assertTrue(isinstance(instance.tags, ValidatedSet))
+		instance.tags.add('a')
+		instance.tags.update(['b'], ['c'])
+		instance.tags |= set(['d'])
+		self.assertEquals(instance.tags, set([u'a', u'b', u'c', u'd']))
+		self.assertRaises(ValidationError, instance.tags.add, 1)
+		self.assertRaises(ValidationError, instance.tags.update, [1])
+		self.assertRaises(ValidationError, instance.tags.symmetric_difference_update, [1])
+		instance.__json__()
+		instance.tags.discard('a')
+		self.assertEquals(instance.__json__()['tags'], set([u'b', u'c', u'd']))
+		instance.tags -= set(['b'])
+		self.assertEquals(instance.__json__()['tags'], set([u'c', u'd']))
+
+	def test_dict(self):
+		from valid_model import ValidationError
+		from valid_model.containers import ValidatedDict
+		instance = self._make_one()
+		self.assertTrue(isinstance(instance.mapping, ValidatedDict))
+		instance.mapping['a'] = 1
+		instance.mapping.update({'b': 2}, c=3)
+		self.assertEquals(instance.mapping.setdefault('d', 4), 4)
+		self.assertEquals(instance.mapping.setdefault('d', 'x'), 4)
+		self.assertEquals(instance.mapping, {'a': 1, 'b': 2, 'c': 3, 'd': 4})
+		self.assertRaises(ValidationError, instance.mapping.__setitem__, 1, 1)
+		self.assertRaises(ValidationError, instance.mapping.__setitem__, 'e', 'e')
+		self.assertRaises(ValidationError, instance.mapping.update, {'e': 'e'})
+		self.assertRaises(ValidationError, instance.mapping.setdefault, 'e', 'e')
+		instance.__json__()
+		del instance.mapping['a']
+		self.assertEquals(instance.__json__()['mapping'], {'b': 2, 'c': 3, 'd': 4})
+		instance.mapping.clear()
+		self.assertEquals(instance.__json__()['mapping'], {})
+
+	def test_sample(self):
+		from valid_model import Object, ValidationError
+		from valid_model.descriptors import List, Set, Dict, Integer, EmbeddedObject
+		from valid_model.utils import sample_indices
+		class Foo(Object):
+			__json_cache__ = True
+			values = List(value=Integer(validator=lambda x: x > 0), sample=5, sample_edges=2)
+			tags = Set(value=Integer(), sample=5, sample_edges=2)
+			scores = Dict(value=Integer(), sample=5, sample_edges=2)
+
+		# short values are validated completely
+		instance = Foo(values=[1.0] * 9)
+		self.assertFalse(instance.values.sampled)
+		self.assertEquals([type(v) for v in instance.values], [int] * 9)
+		self.assertRaises(ValidationError, Foo, values=[1] * 8 + ['x'])
+
+		instance = Foo(values=[1.0] * 100)
+		self.assertTrue(instance.values.sampled)
+		checked = sorted(sample_indices(100, 5, 2, 0))
+		self.assertEquals(len(checked), 9)
+		self.assertEquals(checked[:2] + checked[-2:], [0, 1, 98, 99])
+		# elements which are not in the sample are converted but not validated
+		self.assertEquals([type(v) for v in instance.values], [int] * 100)
+		self.assertRaises(ValidationError, Foo, values=[1] * 99 + [-1])
+		skipped = min(set(range(100)) - set(checked))
+		values = [1] * 100
+		values[skipped] = 'x'
+		self.assertRaises(ValidationError, Foo, values=values)
+
+		# reassigning keeps the container sampled
+		self.assertTrue(Foo(values=instance.values).values.sampled)
+		instance.validate()
+		self.assertTrue(instance.values.sampled)
+		instance.__json__()
+		instance.validate(full=True)
+		self.assertFalse(instance.values.sampled)
+		self.assertEquals([type(v) for v in instance.__json__()['values']], [int] * 100)
+
+		values[skipped] = -1
+		instance = Foo(values=values)
+		with self.assertRaises(ValidationError) as ctx:
+			instance.validate(full=True)
+		self.assertEquals(ctx.exception.field, 'values')
+		self.assertTrue(instance.values.sampled)
+
+		instance = Foo(
+			tags=set(float(i) for i in range(100)),
+			scores=dict((str(i), float(i)) for i in range(100))
+		)
+		self.assertTrue(instance.tags.sampled)
+		self.assertTrue(instance.scores.sampled)
+		instance.validate(full=True)
+		self.assertEquals(set(type(v) for v in instance.tags), set([int]))
+		self.assertEquals(set(type(v) for v in instance.scores.values()), set([int]))
+		self.assertFalse(instance.tags.sampled or instance.scores.sampled)
+
+		# embedded objects which are not in the sample are converted without
+		# being validated
+		class Element(Object):
+			value = Integer(validator=lambda x: x > 0, nullable=False)
+		class Elements(Object):
+			elements = List(value=EmbeddedObject(Element), sample=1, sample_edges=1)
+			by_name = Dict(value=EmbeddedObject(Element), sample=1, sample_edges=1)
+		skipped = min(set(range(10)) - set(sample_indices(10, 1, 1, 0)))
+		elements = [{'value': 1.0}] * 10
+		elements[skipped] = {'value': -1}
+		instance = Elements(elements=elements, by_name={'a': {'value': 1}})
+		self.assertEquals(set(type(e) for e in instance.elements), set([Element]))
+		self.assertEquals(instance.elements[4].value, 1)
+		self.assertEquals(instance.elements[skipped].value, -1)
+		with self.assertRaises(ValidationError) as ctx:
+			instance.validate_sampled()
+		self.assertEquals(ctx.exception.field, 'elements')
+		self.assertRaises(ValidationError, instance.validate, full=True)
+		by_name = dict((str(i), {'value': 1.0}) for i in range(10))
+		instance = Elements(by_name=by_name)
+		self.assertTrue(instance.by_name.sampled)
+		self.assertEquals(set(type(e) for e in instance.by_name.values()), set([Element]))
+		instance.validate(full=True)
+		skipped = min(set(range(10)) - set(sample_indices(10, 1, 1, 0)))
+		for invalid in (-5, None):
+			by_name[by_name.keys()[skipped]] = {'value': invalid}
+			instance = Elements(by_name=by_name)
+			self.assertRaises(ValidationError, instance.validate, full=True)
+
+		# nested overrides of validate are called without arguments
+		class Inner(Object):
+			values = List(value=Integer(), sample=1, sample_edges=1)
+			def validate(self):
+				Object.validate(self)
+		class Outer(Object):
+			inner = EmbeddedObject(Inner)
+			inners = Dict(value=EmbeddedObject(Inner))
+		outer = Outer(inner={'values': [1.0] * 10}, inners={'a': {'values': [1.0] * 10}})
+		self.assertTrue(outer.inner.values.sampled)
+		self.assertTrue(outer.inners['a'].values.sampled)
+		outer.validate(full=True)
+		self.assertFalse(outer.inner.values.sampled or outer.inners['a'].values.sampled)
+
 class TestString(unittest.TestCase):
 	@staticmethod
 	def _make_one(default=None, validator=None, mutator=None):
@@ -377,6 +1273,35 @@ class TestString(unittest.TestCase):
 		self.assertTrue(isinstance(instance.test, unicode))
 		self.assertRaises(ValidationError, setattr, instance, 'test', 10)
 
+	def test_intern(self):
+		from valid_model.descriptors import String, List
+		from valid_model import Object
+		class Foo(Object):
+			shared = String(intern=True)
+			bounded = String(intern=2, mutator=lambda x: x.lower())
+			tags = List(value=String(intern=True))
+		first = Foo(shared=''.join(['a', 'b']), bounded='X', tags=['c'])
+		second = Foo(shared=u''.join([u'a', u'b']), bounded='x', tags=['ab'])
+		self.assertIs(first.shared, second.shared)
+		self.assertIs(first.bounded, second.bounded)
+		self.assertEquals(second.bounded, u'x')
+		self.assertIs(first.shared, second.tags[0])
+		second.shared = None
+		self.assertEquals(second.shared, None)
+
+		# the bounded table discards the least recently used value
+		table = Foo.bounded.interned
+		Foo(bounded='y')
+		Foo(bounded='z')
+		self.assertEquals(len(table), 2)
+		self.assertFalse(u'x' in table)
+
+		# the shared table is bounded too
+		from valid_model.descriptors import INTERNED, INTERN_SIZE
+		for i in xrange(INTERN_SIZE + 10):
+			Foo(shared=unicode(i))
+		self.assertEquals(len(INTERNED), INTERN_SIZE)
+
 class TestInteger(unittest.TestCase):
 	@staticmethod
 	def _make_one(default=None, validator=None, mutator=None):
@@ -401,6 +1326,20 @@ class TestInteger(unittest.TestCase):
 		self.assertRaises(ValidationError, setattr, instance, 'test', 'hello')
 		self.assertRaises(ValidationError, setattr, instance, 'test', '15')
 
+	def test___set___types(self):
+		from decimal import Decimal
+		from valid_model import ValidationError
+		class Count(int):
+			pass
+		instance = self._make_one()
+		for value, expected in ((5L, 5), (Count(7), 7), (2.5, 2)):
+			instance.test = value
+			self.assertEquals(instance.test, expected)
+			self.assertIs(type(instance.test), int)
+		instance.test = 1 << 70
+		self.assertEquals(instance.test, 1 << 70)
+		self.assertRaises(ValidationError, setattr, instance, 'test', Decimal(1))
+
 class TestFloat(unittest.TestCase):
 	@staticmethod
 	def _make_one(default=None, validator=None, mutator=None):
@@ -468,6 +1407,47 @@ class TestDateTime(unittest.TestCase):
 		instance.test = today
 		self.assertEquals(instance.test, today)
 		self.assertRaises(ValidationError, setattr, instance, 'test', 10)
+		self.assertRaises(ValidationError, setattr, instance, 'test', '2015-01-02')
+
+	def test_parse(self):
+		from datetime import datetime
+		from valid_model import Object, ValidationError
+		from valid_model.descriptors import DateTime, PARSED_DATETIMES
+		class Foo(Object):
+			shared = DateTime(parse=True)
+			own = DateTime(parse=2)
+		instance = Foo()
+		for value, expected in (
+			('2015-01-02', datetime(2015, 1, 2)),
+			('2015-01-02T03:04', datetime(2015, 1, 2, 3, 4)),
+			(u'2015-01-02 03:04:05', datetime(2015, 1, 2, 3, 4, 5)),
+			('2015-01-02T03:04:05.25', datetime(2015, 1, 2, 3, 4, 5, 250000)),
+			('2015-01-02T03:04:05.1234567Z', datetime(2015, 1, 2, 3, 4, 5, 123456)),
+			('2015-01-02T03:04:05+01:00', datetime(2015, 1, 2, 2, 4, 5)),
+			('2015-01-02T03:04:05-0130', datetime(2015, 1, 2, 4, 34, 5)),
+			(0, datetime(1970, 1, 1)),
+			(1.5, datetime(1970, 1, 1, 0, 0, 1, 500000)),
+		):
+			instance.shared = value
+			self.assertEquals(instance.shared, expected)
+		for value in (
+			'x', '2015-1-02', '2015-13-02', '2015-01-02T03:04:05+1', '2015-01-02T3:04',
+			'2015-01-01T00:00:00+25:00', '2015-01-01T00:00:00+01:60', True, [], 1e30, 1e12
+		):
+			with self.assertRaises(ValidationError) as ctx:
+				instance.shared = value
+			self.assertEquals(ctx.exception.field, 'shared')
+
+		# parsed strings are cached
+		instance.shared = '2016-05-06T07:08:09'
+		parsed = instance.shared
+		instance.shared = '2016-05-06T07:08:09'
+		self.assertIs(instance.shared, parsed)
+		self.assertIs(PARSED_DATETIMES.get('2016-05-06T07:08:09'), parsed)
+		for value in ('2015-01-01', '2015-01-02', '2015-01-03'):
+			instance.own = value
+		self.assertEquals(len(Foo.own.parsed), 2)
+		self.assertNotIn('2016-05-06T07:08:09', Foo.own.parsed)
 
 class TestTimeDelta(unittest.TestCase):
 	@staticmethod
@@ -489,6 +1469,48 @@ class TestTimeDelta(unittest.TestCase):
 		self.assertEquals(instance.test, one_minute)
 		self.assertRaises(ValidationError, setattr, instance, 'test', 10)
 
+	def test_parse(self):
+		from datetime import timedelta
+		from valid_model import Object, ValidationError
+		from valid_model.descriptors import TimeDelta
+		class Foo(Object):
+			test = TimeDelta(parse=True)
+		instance = Foo()
+		for value, expected in (
+			('P1D', timedelta(days=1)),
+			('P2W', timedelta(weeks=2)),
+			('PT1.5S', timedelta(seconds=1.5)),
+			('-P1DT2H30M', -timedelta(days=1, hours=2, minutes=30)),
+			('90', timedelta(seconds=90)),
+			(60, timedelta(minutes=1)),
+			(0.25, timedelta(seconds=0.25)),
+		):
+			instance.test = value
+			self.assertEquals(instance.test, expected)
+		for value in ('P', 'PT', 'P1DT', 'P1Y', 'x', True, []):
+			self.assertRaises(ValidationError, setattr, instance, 'test', value)
+
+class TestChoice(unittest.TestCase):
+	@staticmethod
+	def _make_one(choices, default=None, validator=None, mutator=None):
+		from valid_model.descriptors import Choice
+		from valid_model import Object
+		class Foo(Object):
+			test = Choice(
+				choices, default=default, validator=validator, mutator=mutator
+			)
+		return Foo()
+
+	def test___set___validator(self):
+		from valid_model import ValidationError
+		instance = self._make_one(['red', 'green'], mutator=lambda x: x.upper())
+		instance.test = 'red'
+		self.assertEquals(instance.test, 'RED')
+		instance.test = None
+		self.assertEquals(instance.test, None)
+		self.assertRaises(ValidationError, setattr, instance, 'test', 'blue')
+		self.assertRaises(ValidationError, setattr, instance, 'test', ['red'])
+
 class TestList(unittest.TestCase):
 	@staticmethod
 	def _make_one(validator=None, mutator=None, value=None):
@@ -512,6 +1534,82 @@ class TestList(unittest.TestCase):
 		instance.test = None
 		self.assertEquals(instance.test, [])
 
+class TestStream(unittest.TestCase):
+	@staticmethod
+	def _make_one(value=None, typecode=None):
+		from valid_model.descriptors import Stream
+		from valid_model import Object
+		class Foo(Object):
+			test = Stream(value=value, typecode=typecode)
+		return Foo()
+
+	def test___set___validator(self):
+		from valid_model import ValidationError
+		from valid_model.descriptors import Integer
+		instance = self._make_one(value=Integer())
+		instance.test = (x for x in [1, 2.5, 'x', 4])
+		self.assertEquals(next(instance.test), 1)
+		self.assertEquals(next(instance.test), 2)
+		with self.assertRaises(ValidationError) as ctx:
+			next(instance.test)
+		self.assertEquals(ctx.exception.field, 'test[2]')
+		# iteration stops at the first invalid element
+		self.assertEquals(list(instance.test), [])
+		self.assertRaises(ValidationError, setattr, instance, 'test', 10)
+		instance.test = None
+		self.assertIsNone(instance.test)
+
+	def test_freeze(self):
+		instance = self._make_one()
+		instance.test = iter([1, 2])
+		with self.assertRaises(TypeError) as ctx:
+			instance.freeze()
+		self.assertIn('test is a stream', str(ctx.exception))
+		self.assertFalse(instance._frozen)
+		with self.assertRaises(TypeError) as ctx:
+			instance.fingerprint()
+		self.assertIn('test is a stream', str(ctx.exception))
+		self.assertRaises(TypeError, instance.__json__)
+		self.assertRaises(TypeError, str, instance)
+		# nothing was consumed
+		self.assertEquals(list(instance.test), [1, 2])
+		instance.test = None
+		instance.fingerprint()
+		self.assertTrue(instance.freeze()._frozen)
+
+	def test_nested(self):
+		from valid_model import Object, ValidationError
+		from valid_model.descriptors import EmbeddedObject, Integer
+		class Bar(Object):
+			count = Integer(validator=lambda x: x > 0)
+		instance = self._make_one(value=EmbeddedObject(Bar))
+		instance.test = iter([{'count': 1}, {'count': 0}])
+		with self.assertRaises(ValidationError) as ctx:
+			list(instance.test)
+		self.assertEquals(str(ctx.exception), 'test[1]: count')
+
+	def test_typecode(self):
+		from array import array
+		from valid_model import ValidationError
+		from valid_model.descriptors import Float, Integer
+		self.assertRaises(ValueError, self._make_one, typecode='?')
+		instance = self._make_one(value=Float(), typecode='d')
+		instance.test = xrange(5)
+		self.assertEquals(next(instance.test), 0.0)
+		self.assertFalse(instance.test.exhausted)
+		self.assertEquals(instance.test.materialize(), array('d', [0, 1, 2, 3, 4]))
+		self.assertTrue(instance.test.exhausted)
+		# exhausted streams iterate their array
+		self.assertEquals(sum(instance.test), 10.0)
+		self.assertEquals(instance.__json__(), {'test': [0.0, 1.0, 2.0, 3.0, 4.0]})
+
+		instance = self._make_one(value=Integer(), typecode='b')
+		instance.test = [1, 1000]
+		with self.assertRaises(ValidationError) as ctx:
+			instance.test.materialize()
+		self.assertEquals(ctx.exception.field, 'test[1]')
+		self.assertRaises(TypeError, self._make_one().__class__(test=[]).test.materialize)
+
 class TestSet(unittest.TestCase):
 	@staticmethod
 	def _make_one(validator=None, mutator=None, value=None):
@@ -573,6 +1671,213 @@ class TestDict(unittest.TestCase):
 		instance.test = None
 		self.assertEquals(instance.test, {})
 
+class TestModelTable(unittest.TestCase):
+	@staticmethod
+	def _make_model():
+		from valid_model import Object
+		from valid_model.descriptors import String, Integer, Float, Bool, DateTime, List
+		class Foo(Object):
+			name = String(nullable=False)
+			count = Integer(default=0, validator=lambda x: x >= 0)
+			ratio = Float()
+			flag = Bool()
+			created = DateTime()
+			tags = List(value=String())
+		return Foo
+
+	def _make_one(self, path=None):
+		from valid_model import ModelTable
+		return ModelTable(self._make_model(), path=path)
+
+	def _check_table(self, table):
+		from datetime import datetime
+		from valid_model import ValidationError
+		from valid_model.validators import gte, is_in
+		created = datetime(2014, 10, 6, 10, 23, 5, 123)
+		table.append({'name': 'a', 'count': 5, 'ratio': 0.5, 'flag': True, 'created': created, 'tags': ['x']})
+		table.append(table.model(name=u'b\xe9', count=1))
+		table.append({'name': 'c', 'count': 10, 'flag': False})
+		self.assertEquals(len(table), 3)
+		# nothing is appended when validation fails
+		self.assertRaises(ValidationError, table.append, {'name': 'd', 'count': -1})
+		self.assertRaises(ValidationError, table.append, {'name': None})
+		self.assertRaises(ValidationError, table.append, {'name': 'd', 'count': 1 << 70})
+		self.assertRaises(TypeError, table.append, 5)
+		self.assertEquals(len(table), 3)
+		self.assertEquals(list(table.values('count')), [5, 1, 10])
+
+		row = table[0]
+		self.assertTrue(isinstance(row, table.model))
+		self.assertEquals(row.name, u'a')
+		self.assertEquals(row.ratio, 0.5)
+		self.assertIs(row.flag, True)
+		self.assertEquals(row.created, created)
+		self.assertEquals(row.tags, [u'x'])
+		self.assertEquals(table[-2].name, u'b\xe9')
+		self.assertEquals(table[1].ratio, None)
+		self.assertEquals(table[1].flag, None)
+		self.assertRaises(IndexError, table.__getitem__, 3)
+		self.assertDictEqual(
+			table[2].__json__(),
+			{'name': u'c', 'count': 10, 'ratio': None, 'flag': False, 'created': None, 'tags': []}
+		)
+
+		# rows write through to the columns with validation
+		row.count = 7
+		row.name = 'longer name'
+		self.assertEquals(table[0].count, 7)
+		self.assertEquals(table[0].name, u'longer name')
+		self.assertRaises(ValidationError, setattr, row, 'count', -5)
+		self.assertEquals(table[0].count, 7)
+		del row.created
+		self.assertEquals(table[0].created, None)
+		table[1].update({'count': 3, 'unknown': 1})
+		self.assertEquals(table[1].count, 3)
+		self.assertRaises(ValidationError, table[1].update, {'count': -1})
+		self.assertEquals(table[1].count, 3)
+		table[1].update({'count': 4, 'name': 'x'}, atomic=True)
+		self.assertEquals((table[1].count, table[1].name), (4, u'x'))
+		self.assertRaises(ValidationError, table[1].update, {'count': 5, 'name': None}, atomic=True)
+		self.assertEquals((table[1].count, table[1].name), (4, u'x'))
+		# writes through the fields of a row reach the table, or fail loudly
+		fields = table[1]._fields
+		fields['count'] = 1
+		fields['name'] = u'b\xe9'
+		self.assertEquals(table[1].count, 1)
+		self.assertEquals(dict(fields)['name'], u'b\xe9')
+		self.assertRaises(ValidationError, fields.__setitem__, 'count', -1)
+		self.assertRaises(KeyError, fields.__setitem__, 'unknown', 1)
+		self.assertRaises(TypeError, fields.__delitem__, 'count')
+
+		self.assertEquals(table.where(count=gte(5)), [0, 2])
+		self.assertEquals(table.where(count=gte(5), flag=is_in([False])), [2])
+		self.assertEquals(table.where(ratio=gte(0)), [0])
+		self.assertEquals(table.where(), [0, 1, 2])
+		self.assertEquals([r.name for r in table.filter(count=gte(5))], [u'longer name', u'c'])
+		self.assertEquals([r.count for r in table], [7, 1, 10])
+
+		# integers and datetimes are stored in 64 bits on every platform
+		table.append({'name': 'e', 'count': 1 << 40, 'created': datetime(2200, 1, 1)})
+		self.assertEquals(table[3].count, 1 << 40)
+		self.assertEquals(table[3].created, datetime(2200, 1, 1))
+		self.assertEquals(list(table.values('count'))[-1], 1 << 40)
+
+	def test_memory(self):
+		table = self._make_one()
+		self._check_table(table)
+
+	def test_mmap(self):
+		import os
+		import shutil
+		import tempfile
+		path = tempfile.mkdtemp()
+		try:
+			with self._make_one(path) as table:
+				self._check_table(table)
+				self.assertTrue(os.path.exists(os.path.join(path, 'count.col')))
+				self.assertTrue(os.path.exists(os.path.join(path, 'name.data')))
+				table.extend({'name': str(i), 'count': i} for i in xrange(5000))
+				self.assertEquals(len(table), 5004)
+				self.assertEquals(table[5003].count, 4999)
+				self.assertEquals(table[5003].name, u'4999')
+				self.assertEquals(sum(table.values('count')), 18 + (1 << 40) + sum(xrange(5000)))
+		finally:
+			shutil.rmtree(path)
+
+	def test_invalid_model(self):
+		from valid_model import ModelTable
+		self.assertRaises(TypeError, ModelTable, dict)
+
+class FakeSession(object):
+	"Stand-in for cassandra.cluster.Session which records round trips"
+	def __init__(self):
+		self.prepared = []
+		self.executed = []
+
+	def prepare(self, query):
+		self.prepared.append(query)
+		return ('prepared', query)
+
+	def execute(self, statement, parameters=None):
+		self.executed.append((statement, parameters))
+
+class TestPersistence(unittest.TestCase):
+	@staticmethod
+	def _make_model():
+		from valid_model import Object
+		from valid_model.descriptors import String, Integer, List, EmbeddedObject
+		class Bar(Object):
+			name = String()
+		class Job(Object):
+			__cassandra_table__ = 'jobs'
+			__cassandra_partition__ = (('owner',), ('seq',))
+			owner = String(nullable=False)
+			seq = Integer(nullable=False)
+			bars = List(value=EmbeddedObject(Bar))
+		return Job
+
+	def test_insert_statement(self):
+		from valid_model.descriptors import Integer
+		from valid_model.persistence import insert_statement, primary_key
+		Job = self._make_model()
+		statement = insert_statement(Job)
+		self.assertIs(insert_statement(Job, ['seq', 'owner', 'bars']), statement)
+		self.assertEquals(statement.query, 'INSERT INTO jobs (bars,owner,seq) VALUES (?,?,?)')
+		job = Job(owner='a', seq=1, bars=[{'name': 'b'}])
+		self.assertEquals(statement.parameters(job), ([{'name': u'b'}], u'a', 1))
+
+		statement = insert_statement(Job, ['owner', 'seq'], if_not_exists=True, ttl=True, timestamp=True)
+		self.assertEquals(
+			statement.query,
+			'INSERT INTO jobs (owner,seq) VALUES (?,?) IF NOT EXISTS USING TTL ? AND TIMESTAMP ?'
+		)
+		self.assertEquals(
+			statement.parameters_many([job, Job(owner='c', seq=2)], ttl=10, timestamp=5),
+			[(u'a', 1, 10, 5), (u'c', 2, 10, 5)]
+		)
+		self.assertRaises(ValueError, insert_statement, Job, ['nope'])
+		self.assertEquals(primary_key(Job), (('owner',), ('seq',)))
+		# subclasses do not share the statements of their parent
+		class SubJob(Job):
+			extra = Integer()
+		self.assertEquals(
+			insert_statement(SubJob).query,
+			'INSERT INTO jobs (bars,extra,owner,seq) VALUES (?,?,?,?)'
+		)
+
+	def test_writer(self):
+		from valid_model.persistence import Writer
+		Job = self._make_model()
+		jobs = [Job(owner=owner, seq=seq) for seq in xrange(5) for owner in ('a', 'b')]
+		session = FakeSession()
+		writer = Writer(session)
+		writer.insert(jobs[0], ttl=20)
+		self.assertEquals(session.executed, [(
+			('prepared', 'INSERT INTO jobs (bars,owner,seq) VALUES (?,?,?) USING TTL ?'),
+			([], u'a', 0, 20)
+		)])
+
+		del session.executed[:]
+		self.assertEquals(writer.insert_many(jobs, columns=['owner', 'seq']), 10)
+		self.assertEquals(len(session.executed), 10)
+		self.assertEquals(session.prepared.count('INSERT INTO jobs (owner,seq) VALUES (?,?)'), 1)
+
+		# batches group rows by partition key
+		del session.executed[:]
+		self.assertEquals(writer.insert_many(jobs, columns=['owner', 'seq'], batch_size=2), 6)
+		query = 'INSERT INTO jobs (owner,seq) VALUES (?,?);'
+		self.assertEquals(session.executed[0], (
+			('prepared', 'BEGIN UNLOGGED BATCH {0} {0} APPLY BATCH'.format(query)),
+			(u'a', 0, u'a', 1)
+		))
+		self.assertEquals(session.executed[2], (
+			('prepared', 'BEGIN UNLOGGED BATCH {0} APPLY BATCH'.format(query)),
+			(u'a', 4)
+		))
+		self.assertEquals(session.executed[3][1], (u'b', 0, u'b', 1))
+		writer.insert_many(jobs, columns=['owner', 'seq'], batch_size=2)
+		self.assertEquals(len(session.prepared), 4)
+
 class TestDescriptorFuncs(unittest.TestCase):
 	def test_descriptor_finders(self):
 		from valid_model.descriptors import descriptor_classes, descriptors
@@ -583,6 +1888,69 @@ class TestDescriptorFuncs(unittest.TestCase):
 			descriptors_list.remove(cls.__name__)
 		self.assertEquals(len(descriptors_list), 0)
 
+	def test_register(self):
+		from valid_model.descriptors import Generic, descriptor_classes, register, REGISTRY
+		@register
+		class Custom(Generic):
+			pass
+		try:
+			self.assertIn(Custom, descriptor_classes())
+		finally:
+			del REGISTRY['Custom']
+		self.assertRaises(TypeError, register, object)
+
+class TestLRUCache(unittest.TestCase):
+	def test_eviction(self):
+		from valid_model.utils import LRUCache
+		cache = LRUCache(2)
+		cache['a'] = 1
+		cache['b'] = 2
+		self.assertEquals(cache.get('a'), 1)
+		cache['c'] = 3
+		self.assertFalse('b' in cache)
+		self.assertEquals(cache['a'], 1)
+		self.assertEquals(cache.get('b', 5), 5)
+		self.assertEquals(cache.setdefault('c', 4), 3)
+		self.assertEquals(cache.setdefault('d', 4), 4)
+		self.assertFalse('a' in cache)
+		self.assertEquals(len(cache), 2)
+		self.assertEquals((cache.hits, cache.misses), (2, 2))
+		self.assertRaises(ValueError, LRUCache, 0)
+
+	def test_threads(self):
+		import sys
+		import threading
+		from valid_model.utils import LRUCache
+		cache = LRUCache(8)
+		errors = []
+		def work(offset):
+			try:
+				for i in xrange(5000):
+					key = (i + offset) % 32
+					cache[key] = i
+					cache.get(key)
+					cache.setdefault(key + 1, i)
+			except Exception as ex:
+				errors.append(ex)
+		interval = sys.getcheckinterval()
+		# switch threads as often as possible to interleave the updates
+		sys.setcheckinterval(1)
+		try:
+			threads = [threading.Thread(target=work, args=(n,)) for n in range(8)]
+			for thread in threads:
+				thread.start()
+			for thread in threads:
+				thread.join()
+		finally:
+			sys.setcheckinterval(interval)
+		self.assertEquals(errors, [])
+		self.assertEquals(len(cache), 8)
+		link, keys = cache.root[1], []
+		while link is not cache.root:
+			keys.append(link[2])
+			link = link[1]
+		self.assertEquals(sorted(keys), sorted(cache.data))
+
 class TestValidators(unittest.TestCase):
 	def test_truthy(self):
 		from valid_model.validators import truthy
@@ -665,6 +2033,67 @@ class TestValidators(unittest.TestCase):
 		self.assertFalse(is_not_in([12, 13])(12))
 		self.assertTrue(is_not_in([12, 13])(11))
 
+	def test_is_in_containers(self):
+		from valid_model.validators import is_in, is_not_in
+		# hashable elements
+		v = is_in(str(i) for i in xrange(1000))
+		self.assertTrue(v('999'))
+		self.assertFalse(v('1000'))
+		self.assertFalse(v(['999']))
+		# unhashable elements of one type are searched with bisect
+		v = is_in([[3], [1], [2, 1]])
+		self.assertTrue(v([2, 1]))
+		self.assertFalse(v([2]))
+		self.assertFalse(v(2))
+		# sets and dicts only have a partial order and are searched linearly
+		v = is_in([set([1]), set([2]), set([3])])
+		self.assertTrue(v(set([2])))
+		self.assertFalse(v(set([4])))
+		v = is_in([[set([1])], [set([2])], [set([3])]])
+		self.assertTrue(v([set([2])]))
+		self.assertTrue(is_in([{'b': 1}, {'a': 2}, {'a': 1, 'b': 0}])({'a': 2}))
+		# unhashable elements of mixed types
+		v = is_in([[1], {'a': 1}])
+		self.assertTrue(v({'a': 1}))
+		self.assertFalse(v({'a': 2}))
+		# ranges
+		v = is_in(xrange(10, 1000000000, 3))
+		self.assertTrue(v(13))
+		self.assertTrue(v(13.0))
+		self.assertFalse(v(14))
+		self.assertFalse(v(7))
+		self.assertFalse(v('13'))
+		self.assertTrue(is_in(xrange(10, 0, -2))(4))
+		self.assertFalse(is_in(xrange(10, 0, -2))(0))
+		self.assertFalse(is_in(xrange(0))(0))
+		self.assertTrue(is_in(xrange(5, 6))(5))
+		# strings keep substring semantics
+		self.assertTrue(is_in('abcd')('bc'))
+		self.assertTrue(is_not_in({'a': 1})('b'))
+		self.assertFalse(is_not_in(xrange(5))(3))
+
+	def test_between(self):
+		from valid_model.validators import between
+		self.assertTrue(between(12, 14)(12))
+		self.assertTrue(between(12, 14)(14))
+		self.assertFalse(between(12, 14)(15))
+		self.assertFalse(between(12, 14)(11))
+
+	def test_memoize(self):
+		from valid_model.validators import memoize
+		calls = []
+		def double(x):
+			calls.append(x)
+			return x * 2
+		v = memoize(double, size=2)
+		self.assertEquals(v(2), 4)
+		self.assertEquals(v(2), 4)
+		self.assertEquals(v(2.0), 4.0)
+		self.assertEquals(v([1]), [1, 1])
+		self.assertEquals(v([1]), [1, 1])
+		self.assertEquals(calls, [2, 2.0, [1], [1]])
+		self.assertEquals((v.cache.hits, v.cache.misses), (1, 2))
+
 	def test_any_of(self):
 		from valid_model.validators import any_of, lt, gte
 		v = any_of([lt(5), gte(12)])
@@ -681,5 +2110,309 @@ class TestValidators(unittest.TestCase):
 		self.assertFalse(v(10))
 		self.assertFalse(v("hello"))
 
+class TestSchema(unittest.TestCase):
+	@staticmethod
+	def _make_model():
+		from valid_model import Object
+		from valid_model.descriptors import (
+			String, Integer, Float, Bool, DateTime, TimeDelta, List, Set, Dict,
+			EmbeddedObject, Generic
+		)
+		class Point(Object):
+			x = Integer()
+			y = Integer()
+		class Shape(Object):
+			__cassandra_type__ = 'shape_t'
+			name = String()
+			points = List(value=EmbeddedObject(Point))
+		class Drawing(Object):
+			__cassandra_table__ = 'drawings'
+			__cassandra_partition__ = (('owner',), ('created',))
+			__cassandra_order__ = 'created DESC'
+			__cassandra_options__ = ['gc_grace_seconds = 0']
+			__cassandra_frozen__ = ['tags']
+			owner = String(nullable=False)
+			created = DateTime(nullable=False)
+			elapsed = TimeDelta()
+			visible = Bool()
+			scale = Float()
+			main = EmbeddedObject(Shape)
+			tags = Set(value=String())
+			layers = Dict(key=String(), value=List(value=EmbeddedObject(Shape)))
+			notes = List()
+		return Drawing
+
+	def test_ddl(self):
+		from valid_model.schema import layout
+		Drawing = self._make_model()
+		drawing_layout = layout(Drawing)
+		self.assertIs(layout(Drawing), drawing_layout)
+		self.assertEquals(drawing_layout.ddl(), [
+			"CREATE TYPE point (\n\tx int,\n\ty int\n)",
+			"CREATE TYPE shape_t (\n\tname text,\n\tpoints list<frozen<point>>\n)",
+			"CREATE TABLE drawings ("
+			"\n\tcreated timestamp,"
+			"\n\telapsed bigint,"
+			"\n\tlayers map<text,frozen<list<frozen<shape_t>>>>,"
+			"\n\tmain frozen<shape_t>,"
+			"\n\tnotes list<text>,"
+			"\n\towner text,"
+			"\n\tscale float,"
+			"\n\ttags frozen<set<text>>,"
+			"\n\tvisible boolean,"
+			"\n\tPRIMARY KEY ((owner), created)"
+			"\n) WITH CLUSTERING ORDER BY (created DESC)"
+			"\nAND gc_grace_seconds = 0",
+		])
+
+	def test_untyped_field(self):
+		from valid_model import Object
+		from valid_model.descriptors import Generic, String
+		from valid_model.schema import layout
+		class Blob(Object):
+			key = String(nullable=False)
+			data = Generic()
+		self.assertRaises(TypeError, layout(Blob).table_ddl)
+		self.assertEquals(layout(Blob).encode(Blob(key='a', data=3)), (3, u'a'))
+
+	def test_encode_decode(self):
+		from datetime import datetime, timedelta
+		from valid_model.schema import layout
+		Drawing = self._make_model()
+		drawing_layout = layout(Drawing)
+		drawing = Drawing(
+			owner='me', created=datetime(2015, 1, 1), elapsed=timedelta(seconds=2),
+			main={'name': 'sq', 'points': [{'x': 1, 'y': 2}]},
+			layers={'bg': [{'name': 'line'}]}, tags=set(['a'])
+		)
+		row = drawing_layout.encode(drawing)
+		self.assertEquals(dict(zip(drawing_layout.names, row)), {
+			'created': datetime(2015, 1, 1),
+			'elapsed': 2000000,
+			'layers': {u'bg': [{'name': u'line', 'points': []}]},
+			'main': {'name': u'sq', 'points': [{'x': 1, 'y': 2}]},
+			'notes': [],
+			'owner': u'me',
+			'scale': None,
+			'tags': set([u'a']),
+			'visible': None,
+		})
+		# Cassandra returns None for empty collections
+		row = tuple(None if name == 'notes' else value for name, value in zip(drawing_layout.names, row))
+		decoded = drawing_layout.decode(row)
+		self.assertIsInstance(decoded, Drawing)
+		self.assertEquals(drawing_layout.encode(decoded), drawing_layout.encode(drawing))
+		self.assertEquals(decoded.elapsed, timedelta(seconds=2))
+		self.assertEquals(decoded.main.points[0].y, 2)
+		self.assertEquals(decoded.notes, [])
+
+		# user defined types may be read back as objects with attributes
+		from collections import namedtuple
+		point = namedtuple('point', 'x y')(3, 4)
+		decoded = drawing_layout.decode([{'name': 'tri', 'points': [point]}], ['main'])
+		self.assertEquals(decoded.main.points[0].x, 3)
+
+class TestSpec(unittest.TestCase):
+	SPEC = {
+		'name': {'type': 'string', 'required': True},
+		'age': {'type': 'integer', 'default': '0'},
+		'active': {'type': 'boolean', 'default': 'False'},
+		'born': {'type': 'datetime', 'default': '1970-01-02T00:00:00', 'parse': True},
+		'tags': {'type': 'list', 'value': {'type': 'string'}},
+		'scores': {'type': 'map', 'key': {'type': 'string'}, 'value': {'type': 'list', 'value': {'type': 'float'}}},
+		'address': {'type': 'object', 'name': 'Address', 'fields': {'city': {'type': 'string'}}},
+	}
+
+	def test_from_spec(self):
+		from datetime import datetime
+		from valid_model import from_spec, ValidationError
+		Person = from_spec('Person', self.SPEC)
+		self.assertEquals(Person.__name__, 'Person')
+		person = Person(name='a', scores={'x': [1, 2]}, address={'city': 'b'})
+		self.assertEquals(person.__json__(), {
+			'name': u'a', 'age': 0, 'active': False, 'born': datetime(1970, 1, 2),
+			'tags': [], 'scores': {u'x': [1.0, 2.0]}, 'address': {'city': u'b'},
+		})
+		self.assertRaises(ValidationError, setattr, person, 'name', None)
+		self.assertRaises(ValidationError, person.tags.append, 1)
+		self.assertRaises(ValidationError, setattr, person, 'scores', {'x': ['y']})
+		person.born = '2015-01-02T03:04:05Z'
+		self.assertEquals(person.born, datetime(2015, 1, 2, 3, 4, 5))
+
+	def test_invalid_spec(self):
+		from valid_model import from_spec
+		self.assertRaises(ValueError, from_spec, 'Bad', {'a': {'type': 'nope'}})
+		# defaults are parsed, never evaluated
+		self.assertRaises(ValueError, from_spec, 'Bad', {'a': {'type': 'boolean', 'default': '__import__("os")'}})
+
+	def test_cache(self):
+		import copy
+		import gc
+		from valid_model import from_spec
+		from valid_model.spec import CACHE, SpecCache
+		Person = from_spec('Person', self.SPEC)
+		self.assertIs(from_spec('Person', copy.deepcopy(self.SPEC)), Person)
+		self.assertIs(Person.address.class_obj, from_spec('Address', {'city': {'type': 'string'}}))
+		self.assertIsNot(from_spec('Other', self.SPEC), Person)
+		self.assertIsNot(
+			from_spec('A', {'a': {'type': 'string', 'default': 1}}),
+			from_spec('A', {'a': {'type': 'string', 'default': True}})
+		)
+
+		old_recent = CACHE.recent
+		CACHE.recent = SpecCache(1).recent
+		try:
+			from_spec('Temp', {'a': {'type': 'string'}})
+			from_spec('Temp2', {'a': {'type': 'string'}})
+			gc.collect()
+			# evicted from the recently used classes and no longer referenced
+			self.assertNotIn('Temp', [klass.__name__ for klass in CACHE.alive.values()])
+			self.assertIs(from_spec('Person', self.SPEC), Person)
+		finally:
+			CACHE.recent = old_recent
+
+def _short(value):
+	return len(value) < 5
+
+def _lower(value):
+	return value.lower()
+
+def _positive(value):
+	return value > 0
+
+class TestCodegen(unittest.TestCase):
+	@staticmethod
+	def _make_model():
+		from valid_model import Object
+		from valid_model.descriptors import (
+			String, Integer, Choice, Set, Dict, List, EmbeddedObject, TimeDelta
+		)
+		from valid_model.validators import deferred
+		class Part(Object):
+			"""A part"""
+			label = String(validator=_short, mutator=_lower, cache=16, intern=True)
+		class Machine(Object):
+			__cassandra_table__ = 'machines'
+			size = Choice(['s', 'm'], default='s')
+			count = Integer(validator=deferred(_positive), nullable=False, default=1)
+			uptime = TimeDelta(parse=True)
+			parts = List(value=EmbeddedObject(Part))
+			named = Dict(key=String(), value=EmbeddedObject(Part))
+			flags = Set(value=String(), sample=8)
+			main = EmbeddedObject(Part)
+		return Machine, Part
+
+	def _round_trip(self, *models):
+		import imp
+		import os
+		import shutil
+		import tempfile
+		from valid_model.codegen import write_module
+		path = tempfile.mkdtemp()
+		try:
+			module_path = os.path.join(path, 'generated.py')
+			source = write_module(module_path, *models)
+			return imp.load_source('generated', module_path), source
+		finally:
+			shutil.rmtree(path)
+
+	def assertSameClass(self, generated, model):
+		self.assertEquals(generated.field_names, model.field_names)
+		for name in model.field_names:
+			descriptor, original = getattr(generated, name), getattr(model, name)
+			self.assertIs(type(descriptor), type(original))
+			self.assertEquals(descriptor.default if not isinstance(descriptor.default, type) else None,
+				original.default if not isinstance(original.default, type) else None)
+			self.assertEquals(descriptor.nullable, original.nullable)
+
+	def test_callable_defaults(self):
+		from datetime import datetime
+		from valid_model import Object
+		from valid_model.descriptors import DateTime
+		class Post(Object):
+			updated = DateTime(nullable=False, default=datetime.utcnow)
+			published = DateTime(default=datetime(2015, 1, 1))
+			created = DateTime(default=datetime.now)
+		module, source = self._round_trip(Post)
+		self.assertSameClass(module.Post, Post)
+		self.assertIn('default=datetime.datetime.utcnow', source)
+		post = module.Post()
+		self.assertIsInstance(post.updated, datetime)
+		self.assertEquals(post.published, datetime(2015, 1, 1))
+		self.assertIsInstance(post.created, datetime)
+
+	def test_round_trip(self):
+		from datetime import timedelta
+		from valid_model import ValidationError
+		Machine, Part = self._make_model()
+		module, source = self._round_trip(Machine)
+		self.assertSameClass(module.Machine, Machine)
+		self.assertSameClass(module.Part, Part)
+		self.assertIn('cache=16', source)
+		self.assertIn('sample=8', source)
+		self.assertIn('TimeDelta(parse=True)', source)
+		self.assertEquals(module.Machine.__cassandra_table__, 'machines')
+		self.assertEquals(module.Part.__doc__, 'A part')
+
+		kwargs = dict(
+			size='m', uptime=timedelta(1), parts=[{'label': 'AB'}], named={'x': {'label': 'c'}},
+			flags=set(['f']), main={'label': 'D'}
+		)
+		generated, original = module.Machine(**kwargs), Machine(**kwargs)
+		self.assertEquals(generated.__json__(), original.__json__())
+		self.assertEquals(generated.parts[0].label, u'ab')
+		self.assertIs(generated.parts[0].label, original.parts[0].label)
+		for field, value in (('size', 'l'), ('count', None), ('main', {'label': 'toolong'})):
+			errors = []
+			for klass in (module.Machine, Machine):
+				with self.assertRaises(ValidationError) as ctx:
+					klass(**{field: value})
+				errors.append(str(ctx.exception))
+			self.assertEquals(errors[0], errors[1])
+		self.assertEquals(
+			[c[0] for c in generated.deferred_checks()], [c[0] for c in original.deferred_checks()]
+		)
+
+		generated.validate()
+		generated.parts[0]._fields['label'] = u'toolong'
+		self.assertRaises(ValidationError, generated.validate)
+		generated.parts[0]._fields['label'] = u'ab'
+		generated.main._fields['label'] = u'toolong'
+		self.assertRaises(ValidationError, generated.validate)
+		# frozen instances and subclasses use the methods of Object
+		generated.main._fields['label'] = u'd'
+		self.assertEquals(generated.freeze().__json__(), original.freeze().__json__())
+		class Sub(module.Machine):
+			pass
+		self.assertEquals(Sub(**kwargs).__json__(), Machine(**kwargs).__json__())
+
+		# generated classes finish sampled validation
+		generated = module.Machine(flags=set(str(i) for i in range(40)))
+		self.assertTrue(generated.flags.sampled)
+		generated.validate(full=True)
+		self.assertFalse(generated.flags.sampled)
+		self.assertEquals(set(type(flag) for flag in generated.flags), set([unicode]))
+
+	def test_spec(self):
+		from valid_model import from_spec
+		module, _ = self._round_trip(('Person', TestSpec.SPEC))
+		Person = from_spec('Person', TestSpec.SPEC)
+		self.assertSameClass(module.Person, Person)
+		kwargs = dict(name='a', tags=['b'], scores={'x': [1]}, address={'city': 'c'})
+		self.assertEquals(module.Person(**kwargs).__json__(), Person(**kwargs).__json__())
+
+	def test_unsupported(self):
+		from valid_model import Object
+		from valid_model.descriptors import String
+		from valid_model.codegen import generate_module
+		class Lambda(Object):
+			name = String(validator=lambda x: x)
+		self.assertRaises(ValueError, generate_module, Lambda)
+		class Method(Object):
+			name = String()
+			def validate(self):
+				pass
+		self.assertRaises(ValueError, generate_module, Method)
+
 if __name__ == '__main__':
 	unittest.main()
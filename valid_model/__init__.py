@@ -2,5 +2,7 @@ from valid_model import descriptors
 from valid_model import validators
 from valid_model.base import Object
 from valid_model.exc import ValidationError
-__all__ = ['descriptors', 'validators', 'Object', 'ValidationError']
+from valid_model.table import ModelTable
+from valid_model.spec import from_spec
+__all__ = ['descriptors', 'validators', 'Object', 'ValidationError', 'ModelTable', 'from_spec']
 
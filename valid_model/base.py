@@ -20,7 +20,60 @@ validator.
 Each Object also has a validate method which can check conditions that deal with
 multiple attributes within an Object.
 """
+import atexit
+import hashlib
+import os
+import threading
+from copy import copy
+from itertools import izip
+from operator import attrgetter
+from weakref import WeakValueDictionary
 from .exc import ValidationError
+from .validators import memoize
+from .utils import FrozenDict, freeze, thaw, write_canonical
+
+# most column lists whose bindings from_row keeps per class, the columns may
+# come from the keys of arbitrary input dicts
+ROW_BINDINGS_SIZE = 256
+# number of threads of the pool used by Object.async_validate
+ASYNC_POOL_SIZE = 16
+# that pool by process id, created on first use so forked processes get their own
+_ASYNC_POOLS = {}
+_ASYNC_POOLS_LOCK = threading.Lock()
+
+def _async_pool():
+	"""
+	The ThreadPool which async_validate runs checks on when it is not given one
+	"""
+	pid = os.getpid()
+	pool = _ASYNC_POOLS.get(pid)
+	if pool is None:
+		with _ASYNC_POOLS_LOCK:
+			pool = _ASYNC_POOLS.get(pid)
+			if pool is None:
+				# multiprocessing is slow to import and rarely needed
+				from multiprocessing.pool import ThreadPool
+				pool = _ASYNC_POOLS[pid] = ThreadPool(ASYNC_POOL_SIZE)
+				atexit.register(_close_async_pool, pid)
+	return pool
+
+def _close_async_pool(pid):
+	if os.getpid() == pid:
+		pool = _ASYNC_POOLS.pop(pid)
+		pool.close()
+		pool.join()
+
+def identity(value):
+	"""
+	The mutator of descriptors which are not given one
+	"""
+	return value
+
+def always_valid(value):
+	"""
+	The validator of descriptors which are not given one
+	"""
+	return True
 
 class Generic(object):
 	"""
@@ -31,26 +84,59 @@ class Generic(object):
 	mutator: function that will alter value being set prior to validator
 	         function being executed
 	validator: function that must return truthy or a ValidationError will be
-	           raised
+	           raised.  Validators wrapped with validators.deferred are only run
+	           by Object.async_validate
 	nullable: determines if None is a valid value for this attribute
+	cache: if set the results of the mutator and validator functions for the
+	       given number of most recently used values are cached.  This should
+	       only be used when both functions are pure.
 	"""
 	name = None
-	def __init__(self, default=None, validator=None, mutator=None, nullable=True):
+	deferred_validator = None
+	_validator = staticmethod(always_valid)
+	_mutator = staticmethod(identity)
+	_checks = False
+	def __init__(self, default=None, validator=None, mutator=None, nullable=True, cache=None):
 		self.default = default
 		self.nullable = nullable
+		if getattr(validator, 'deferred', False):
+			self.deferred_validator = validator
+			validator = None
 		if validator is None:
-			self.validator = lambda x: True
+			self._validator = always_valid
 		elif not callable(validator):
 			raise TypeError('validator must be callable')
 		else:
-			self.validator = validator
+			self._validator = validator
 
 		if mutator is None:
-			self.mutator = lambda x: x
+			self._mutator = identity
 		elif not callable(mutator):
 			raise TypeError('mutator must be callable')
 		else:
-			self.mutator = mutator
+			self._mutator = mutator
+
+		if cache:
+			if validator is not None:
+				self._validator = memoize(self._validator, cache)
+			if mutator is not None:
+				self._mutator = memoize(self._mutator, cache)
+		self._update_checks()
+
+	def _update_checks(self):
+		# __set__ skips calling the defaults
+		self._checks = self._mutator is not identity or self._validator is not always_valid
+
+	def _set_validator(self, validator):
+		self._validator = validator
+		self._update_checks()
+
+	def _set_mutator(self, mutator):
+		self._mutator = mutator
+		self._update_checks()
+
+	validator = property(attrgetter('_validator'), _set_validator)
+	mutator = property(attrgetter('_mutator'), _set_mutator)
 
 	def get_default(self):
 		if not callable(self.default):
@@ -59,6 +145,44 @@ class Generic(object):
 			default = self.default
 		return default()
 
+	def initial_value(self, instance):
+		"""
+		The value an attribute of instance is set to when it is constructed
+		"""
+		return self.get_default()
+
+	def trusted_value(self, instance, value):
+		"""
+		The value stored for an attribute of instance which is set to value from a
+		trusted source without being mutated or validated
+		"""
+		return value
+
+	def unchecked(self):
+		"""
+		A copy of this descriptor which converts and mutates values without
+		validating them, for the elements a sampled container does not check
+		"""
+		unchecked = copy(self)
+		unchecked.validator = always_valid
+		unchecked.nullable = True
+		return unchecked
+
+	def reset_value(self, instance, value):
+		"""
+		The initial value of an attribute of instance which is released to a pool
+		while holding value.  Containers may be cleared and reused.
+		"""
+		return self.initial_value(instance)
+
+	def deferred_checks(self, value):
+		"""
+		Yield a (field, validator, value) tuple for each deferred validator which
+		applies to value
+		"""
+		if self.deferred_validator is not None and value is not None:
+			yield self.name, self.deferred_validator, value
+
 	def __get__(self, instance, klass=None):
 		if instance is None:
 			return self
@@ -67,105 +191,707 @@ class Generic(object):
 	def __set__(self, instance, value):
 		if value is None and not self.nullable:
 			raise ValidationError("{} is not nullable".format(self.name))
-		elif value is not None:
+		elif value is not None and self._checks:
 			try:
-				value = self.mutator(value)
+				value = self._mutator(value)
 			except (TypeError, ValueError, ValidationError), ex:
 				raise ValidationError("{}: {}".format(self.name, ex))
-			if not self.validator(value):
+			if not self._validator(value):
 				raise ValidationError(self.name)
 		getattr(instance, '_fields')[self.name] = value
+		if instance._json_cache is not None or instance._parents:
+			instance.touch()
 		return value
 
 	def __delete__(self, instance):
 		getattr(instance, '_fields')[self.name] = None
+		if instance._json_cache is not None or instance._parents:
+			instance.touch()
 
 	def __str__(self):
 		return self.name
 
+def join_field(name, field):
+	"""
+	Join the name of an attribute with the path of a field nested in it
+	"""
+	return '{}.{}'.format(name, field) if field else name
+
+def _differences(path, a, b):
+	"""
+	Yield the paths at which a and b differ
+	"""
+	if a is b:
+		return
+	if isinstance(a, Object) and isinstance(b, Object) and a.__class__ is b.__class__:
+		a_fields, b_fields = a._fields, b._fields
+		for field in sorted(a.field_names):
+			field_path = join_field(path, field) if path else field
+			for difference in _differences(field_path, a_fields[field], b_fields[field]):
+				yield difference
+	elif isinstance(a, (list, tuple)) and isinstance(b, (list, tuple)):
+		for idx in xrange(max(len(a), len(b))):
+			item_path = '{}[{}]'.format(path, idx)
+			if idx >= len(a) or idx >= len(b):
+				yield item_path
+			else:
+				for difference in _differences(item_path, a[idx], b[idx]):
+					yield difference
+	elif isinstance(a, dict) and isinstance(b, dict):
+		for key in sorted(set(a) | set(b)):
+			item_path = "{}['{}']".format(path, key)
+			if key not in a or key not in b:
+				yield item_path
+			else:
+				for difference in _differences(item_path, a[key], b[key]):
+					yield difference
+	elif a != b:
+		yield path
+
+class Unprojected(object):
+	"""
+	Placeholder for a field which is left out of a projection, see
+	Object.project
+	"""
+	def __init__(self, name):
+		self.name = name
+
+	def __get__(self, instance, klass=None):
+		if instance is None:
+			return self
+		raise AttributeError('{} is not part of the projection'.format(self.name))
+
+	def __set__(self, instance, value):
+		raise AttributeError('{} is not part of the projection'.format(self.name))
+
+class FieldReader(object):
+	"""
+	Stands in for the descriptor of a field of a class with __fast_reads__.
+	It is not a data descriptor so reading the attribute of an instance finds
+	the value in the instance __dict__ without calling any Python code.
+	Reading it from the class returns the descriptor.
+	"""
+	__slots__ = ('descriptor',)
+
+	def __init__(self, descriptor):
+		self.descriptor = descriptor
+
+	def __get__(self, instance, klass=None):
+		return self.descriptor.__get__(instance, klass)
+
+# attributes of instances which hold cached state, left out of copies and pickles
+CACHE_ATTRIBUTES = ('_json_cache', '_hash_cache', '_fingerprint_cache', '_parents')
+# attributes of instances with __fast_reads__ which are not fields
+FAST_READ_SLOTS = ('_frozen',) + CACHE_ATTRIBUTES
+
+def _fast_new(cls, *args, **kwargs):
+	self = object.__new__(cls)
+	set_attr = object.__setattr__
+	set_attr(self, '_frozen', False)
+	for attr in CACHE_ATTRIBUTES:
+		set_attr(self, attr, None)
+	return self
+
+def _field_setters(cls):
+	"""
+	The descriptor which writes each field of a class with __fast_reads__
+	"""
+	setters = {}
+	for name in cls.field_names:
+		for klass in cls.__mro__:
+			if name in vars(klass):
+				setter = vars(klass)[name]
+				if isinstance(setter, FieldReader):
+					setter = setter.descriptor
+				setters[name] = setter
+				break
+	cls._field_setters = setters
+	return setters
+
+def _fast_setattr(self, name, value):
+	setters = self._field_setters
+	if setters is None:
+		setters = _field_setters(type(self))
+	setter = setters.get(name)
+	if setter is not None:
+		setter.__set__(self, value)
+	elif hasattr(getattr(type(self), name, None), '__set__'):
+		# slots and properties
+		object.__setattr__(self, name, value)
+	else:
+		# anything else would be stored with the fields
+		raise AttributeError('{} has no field {}'.format(type(self).__name__, name))
+
+def _fast_delattr(self, name):
+	setters = self._field_setters
+	if setters is None:
+		setters = _field_setters(type(self))
+	setter = setters.get(name)
+	if setter is None:
+		object.__delattr__(self, name)
+	else:
+		setter.__delete__(self)
+
+def _set_fields(self, fields):
+	object.__setattr__(self, '__dict__', fields)
+
 class ObjectMeta(type):
 	"""
 	Metaclass used to set the attribute name to each descriptor in the Object
-	class
+	class.  Fields inherited from Object subclasses are taken from their
+	field_names, inherited descriptors are found through the MRO.
+
+	Classes with __fast_reads__ keep field values in the instance __dict__,
+	see Object.
 	"""
 	def __new__(mcs, name, bases, attrs):
 		field_names = set()
-		for attr, value in attrs.iteritems():
+		for attr, value in attrs.items():
 			if isinstance(value, Generic):
 				value.name = attr
-				attrs[attr] = value
 				field_names.add(attr)
 
 		for base in bases:
-			parent = base.__mro__[0]
-			for attr, value in vars(parent).iteritems():
-				if isinstance(value, Generic) and attr not in attrs:
-					value.name = attr
-					attrs[attr] = value
-					field_names.add(attr)
+			if isinstance(base, ObjectMeta):
+				inherited = base.field_names
+			else:
+				inherited = []
+				for attr, value in vars(base).iteritems():
+					if isinstance(value, Generic):
+						value.name = attr
+						inherited.append(attr)
+			field_names.update(attr for attr in inherited if attr not in attrs)
 		attrs['field_names'] = field_names
+		# compiled when the class is first instantiated
+		attrs['_field_descriptors'] = None
+
+		inherited_fast_reads = any(getattr(base, '__fast_reads__', False) for base in bases)
+		if inherited_fast_reads or attrs.get('__fast_reads__'):
+			for attr in field_names:
+				if attr in attrs:
+					attrs[attr] = FieldReader(attrs[attr])
+				elif not inherited_fast_reads:
+					# inherited descriptors are data descriptors which would be
+					# found before the instance __dict__
+					base = next(base for base in bases if hasattr(base, attr))
+					attrs[attr] = FieldReader(getattr(base, attr))
+			attrs['_field_setters'] = None
+			if not inherited_fast_reads:
+				attrs['__fast_reads__'] = True
+				attrs['__slots__'] = FAST_READ_SLOTS
+				attrs['__new__'] = staticmethod(_fast_new)
+				attrs['__setattr__'] = _fast_setattr
+				attrs['__delattr__'] = _fast_delattr
+				attrs['_fields'] = property(attrgetter('__dict__'), _set_fields)
 		return type.__new__(mcs, name, bases, attrs)
 
 class Object(object):
 	"""
 	Base class for creating object models
+
+	Setting __json_cache__ to True on a subclass caches the output of __json__
+	for each instance until an attribute of the instance or of an Object nested
+	in it is set or deleted.
+
+	Setting __fast_reads__ to True on a subclass stores field values in the
+	instance __dict__ so reading them is as fast as reading a plain attribute.
+	Setting them becomes slower because it goes through __setattr__.
+	Instances of such classes can not hold attributes which are not fields.
 	"""
 	__metaclass__ = ObjectMeta
+	__json_cache__ = False
+	__fast_reads__ = False
 	field_names = None # stub gets set in ObjectMeta.__new__
+	_field_descriptors = None
+	_frozen = False
+	_json_cache = None
+	_hash_cache = None
+	# (cached __json__ the fingerprint was computed with, fingerprint)
+	_fingerprint_cache = None
+	# Objects whose cached __json__ includes this instance by id, since
+	# instances which are not frozen can not be hashed
+	_parents = None
+	# the full model of a class returned by Object.project
+	_projection_of = None
 
 	def __init__(self, **kwargs):
-		self._fields = {}
-		cls = self.__class__
-		for field in self.field_names: # pylint: disable=E1135,E1133
-			self._fields[field] = getattr(cls, field).get_default()
+		descriptors = self._field_descriptors
+		if descriptors is None:
+			descriptors = self._compile()
+		fields = self._fields = {}
+		for descriptor in descriptors:
+			fields[descriptor.name] = descriptor.initial_value(self)
 		for key, value in kwargs.items():
 			if key in self.field_names: # pylint: disable=E1135,E1133
 				setattr(self, key, value)
 
+	@classmethod
+	def _compile(cls):
+		"""
+		Prepare the class for constructing instances.  This is done when the class
+		is first instantiated rather than when it is created so that importing
+		many models stays cheap.
+		"""
+		cls._field_descriptors = tuple(getattr(cls, name) for name in cls.field_names)
+		return cls._field_descriptors
+
+	@classmethod
+	def _row_binding(cls, columns):
+		"""
+		Return the descriptors of columns, None for columns which are not fields,
+		and the descriptors of the fields which are not among columns.  Bindings
+		are cached per class and column list, the cache is emptied once it holds
+		ROW_BINDINGS_SIZE of them.
+		"""
+		columns = tuple(columns)
+		bindings = vars(cls).get('_row_bindings')
+		if bindings is None:
+			bindings = {}
+			setattr(cls, '_row_bindings', bindings)
+		binding = bindings.get(columns)
+		if binding is None:
+			if len(bindings) >= ROW_BINDINGS_SIZE:
+				bindings.clear()
+			field_names = cls.field_names
+			binding = bindings[columns] = (
+				tuple(getattr(cls, c) if c in field_names else None for c in columns),
+				tuple(getattr(cls, f) for f in field_names if f not in columns)
+			)
+		return binding
+
+	@classmethod
+	def _from_binding(cls, binding, row, validate):
+		descriptors, missing = binding
+		obj = cls.__new__(cls)
+		fields = obj._fields = {}
+		for descriptor in missing:
+			fields[descriptor.name] = descriptor.initial_value(obj)
+		if validate:
+			for descriptor, value in izip(descriptors, row):
+				if descriptor is not None:
+					descriptor.__set__(obj, value)
+		else:
+			for descriptor, value in izip(descriptors, row):
+				if descriptor is not None:
+					fields[descriptor.name] = descriptor.trusted_value(obj, value)
+		return obj
+
+	@classmethod
+	def from_row(cls, row, columns, validate=True):
+		"""
+		Create an instance from a sequence of values in the order of columns.
+		Columns which are not fields are ignored like unknown keyword arguments
+		to the constructor, which is not called.  When validate is False values
+		are stored as they are, which must only be used for trusted sources.
+		"""
+		return cls._from_binding(cls._row_binding(columns), row, validate)
+
+	@classmethod
+	def iter_rows(cls, cursor, columns=None, validate=True):
+		"""
+		Create an instance from every row of a DB-API cursor or other iterable of
+		rows, see from_row.  columns defaults to the names in cursor.description.
+		"""
+		if columns is None:
+			columns = [column[0] for column in cursor.description]
+		binding = cls._row_binding(columns)
+		from_binding = cls._from_binding
+		for row in cursor:
+			yield from_binding(binding, row, validate)
+
+	@classmethod
+	def pool(cls, size, debug=False):
+		"""
+		Return the ObjectPool of this class, which keeps up to size released
+		instances for reuse.  The pool is created on the first call and resized
+		by later calls.
+		"""
+		# imported here because the pool module imports CACHE_ATTRIBUTES from
+		# this one
+		from .pool import ObjectPool
+		pool = vars(cls).get('_object_pool')
+		if pool is None or pool.debug != debug:
+			pool = ObjectPool(cls, size, debug)
+			setattr(cls, '_object_pool', pool)
+		else:
+			pool.resize(size)
+		return pool
+
+	def release(self):
+		"""
+		Return the instance to the pool of its class, see Object.pool
+		"""
+		pool = vars(self.__class__).get('_object_pool')
+		if pool is None:
+			raise ValueError('{} has no pool'.format(self.__class__.__name__))
+		pool.release(self)
+
+	@classmethod
+	def project(cls, *names):
+		"""
+		Return a subclass whose instances only hold, validate and serialize the
+		named fields.  Reading or setting any other field raises an
+		AttributeError.  The class is created once for each set of names.
+		"""
+		unknown = set(names) - cls.field_names
+		if unknown:
+			raise ValueError('{} has no fields {}'.format(
+				cls.__name__, ', '.join(sorted(unknown))
+			))
+		if cls._projection_of is not None:
+			return cls._projection_of.project(*names)
+
+		key = frozenset(names)
+		projections = vars(cls).get('_projections')
+		if projections is None:
+			projections = {}
+			setattr(cls, '_projections', projections)
+		projection = projections.get(key)
+		if projection is None:
+			attrs = dict(
+				(name, Unprojected(name)) for name in cls.field_names if name not in key
+			)
+			attrs['_projection_of'] = cls
+			projection = type(cls)(cls.__name__ + 'Projection', (cls,), attrs)
+			projections[key] = projection
+		return projection
+
+	def upgrade(self, doc=None):
+		"""
+		Return an instance of the full model of a projection with the fields of
+		this instance, which are not validated again, and the other fields set
+		from doc.
+		"""
+		model = self._projection_of
+		if model is None:
+			raise TypeError('{} is not a projection'.format(self.__class__.__name__))
+		full = model()
+		fields = full._fields
+		for name, value in self._fields.iteritems():
+			fields[name] = getattr(model, name).trusted_value(full, value)
+		if doc:
+			full.update(doc)
+		return full
+
+	def __getstate__(self):
+		"""
+		Copies and pickles hold the fields and other attributes of the instance
+		but not cached state such as the output of __json__.  List, Set and
+		Dict attributes are held as plain containers and the names of those
+		which were only validated by a sample are kept in _sampled.
+		"""
+		if self.__fast_reads__:
+			state = {'_fields': self._fields, '_frozen': self._frozen}
+		else:
+			state = dict(vars(self))
+			for attr in CACHE_ATTRIBUTES:
+				state.pop(attr, None)
+		sampled = [
+			name for name, value in self._fields.iteritems()
+			if getattr(value, 'sampled', False)
+		]
+		if sampled:
+			state['_sampled'] = sampled
+		return state
+
+	def __setstate__(self, state):
+		state = dict(state)
+		fields = state.pop('_fields')
+		sampled = state.pop('_sampled', ())
+		if not state.get('_frozen'):
+			# shallow copies must not share the fields of the original
+			fields = dict(fields)
+			descriptors = self._field_descriptors
+			if descriptors is None:
+				descriptors = self._compile()
+			# containers are copied and pickled as plain lists, sets and dicts
+			for descriptor in descriptors:
+				value = fields.get(descriptor.name)
+				if isinstance(value, (list, set, dict)):
+					value = fields[descriptor.name] = descriptor.trusted_value(self, value)
+					if descriptor.name in sampled:
+						value.sampled = True
+		if self.__fast_reads__:
+			# pickle protocols 0 and 1 create instances without calling __new__
+			for attr in CACHE_ATTRIBUTES:
+				object.__setattr__(self, attr, None)
+		for attr, value in state.iteritems():
+			object.__setattr__(self, attr, value)
+		object.__setattr__(self, '_fields', fields)
+
 	def __str__(self):
 		return str(self.__json__())
 
+	def __eq__(self, other):
+		"""
+		Instances of the same class are equal when all of their fields are equal.
+		Comparison stops at the first difference.
+		"""
+		if self is other:
+			return True
+		if not isinstance(other, Object) or other.__class__ is not self.__class__:
+			return NotImplemented
+		if self._frozen == other._frozen:
+			return self._fields == other._fields
+		# frozen lists are tuples which never equal lists
+		return next(_differences(None, self, other), None) is None
+
+	def __ne__(self, other):
+		equal = self.__eq__(other)
+		return equal if equal is NotImplemented else not equal
+
+	def diff(self, other):
+		"""
+		Return the paths of the fields which differ between this instance and
+		another instance of the same class, such as 'name', 'address.city',
+		'tags[2]' or "scores['math']".  Only Objects, lists, tuples and dicts are
+		compared element by element.
+		"""
+		if other.__class__ is not self.__class__:
+			raise TypeError('{!r} is not a {}'.format(other, self.__class__.__name__))
+		return list(_differences(None, self, other))
+
+	def __hash__(self):
+		"""
+		Frozen instances are hashed by class and content.  Like lists, instances
+		which are not frozen compare by content which can change so they can not
+		be hashed.
+		"""
+		if not self._frozen:
+			raise TypeError('unhashable {} instance, freeze it first'.format(self.__class__.__name__))
+		if self._hash_cache is None:
+			self._hash_cache = hash((self.__class__, self._fields))
+		return self._hash_cache
+
+	def fingerprint(self):
+		"""
+		Return a hex digest of the class name and content of the instance which is
+		the same for equal instances of the class, across processes.  It is cached
+		on frozen instances and, for classes with __json_cache__, until the
+		instance changes.
+		"""
+		cached = self._fingerprint_cache
+		if cached is not None and (self._frozen or cached[0] is self._json_cache):
+			return cached[1]
+		# the cached __json__ is discarded whenever the instance changes
+		json_doc = self.__json__() if self.__json_cache__ and not self._frozen else None
+		digest = hashlib.sha1()
+		write = digest.update
+		fields = self._fields
+		write(self.__class__.__name__)
+		for name, prefix in self._fingerprint_order():
+			write(prefix)
+			write_canonical(fields[name], write)
+		result = digest.hexdigest()
+		if self._frozen or json_doc is not None:
+			self._fingerprint_cache = (json_doc, result)
+		return result
+
+	@classmethod
+	def _fingerprint_order(cls):
+		"""
+		Field names in the order they are fingerprinted, with their encodings
+		"""
+		order = vars(cls).get('_fingerprint_fields')
+		if order is None:
+			order = tuple((name, name + '=') for name in sorted(cls.field_names))
+			setattr(cls, '_fingerprint_fields', order)
+		return order
+
+	def _write_canonical(self, write):
+		# nested Objects are written as their fingerprint so that cached
+		# fingerprints of frozen Objects are reused
+		write('o')
+		write(self.fingerprint())
+
 	def __json__(self):
 		"""
-		Convert the Object instance and any nested Objects into a dict.
+		Convert the Object instance and any nested Objects into a dict.  The
+		result for a frozen instance is cached and must not be modified.
 		"""
+		if self._json_cache is not None:
+			return self._json_cache
+		if self._frozen:
+			self._json_cache = thaw(self._fields)
+			return self._json_cache
+		# nested Objects must invalidate this instance's cache or the cache of an
+		# Object this instance is nested in
+		observed = self.__json_cache__ or self._parents
+		nested_json = self._nested_json if observed else lambda v: v.__json__()
 		json_doc = {}
 		for key, value in self._fields.iteritems():
 			if hasattr(value, '__json__'):
-				json_doc[key] = value.__json__()
+				json_doc[key] = nested_json(value)
 			elif isinstance(value, list):
 				json_doc[key] = [
-					v.__json__() if hasattr(v, '__json__') else v
+					nested_json(v) if hasattr(v, '__json__') else v
 					for v in value
 				]
 			elif isinstance(value, dict):
 				json_doc[key] = dict(
-					(k, v.__json__()) if hasattr(v, '__json__') else (k, v)
+					(k, nested_json(v)) if hasattr(v, '__json__') else (k, v)
 					for k, v in value.iteritems()
 				)
 			else:
 				json_doc[key] = value
 
+		if self.__json_cache__:
+			self._json_cache = json_doc
 		return json_doc
 
-	def update(self, doc):
+	def _nested_json(self, value):
+		if isinstance(value, Object) and not value._frozen:
+			if value._parents is None:
+				value._parents = WeakValueDictionary()
+			value._parents[id(self)] = self
+		return value.__json__()
+
+	def touch(self):
 		"""
-		Update attributes from a dict-like object
+		Discard the cached __json__ of this instance and of every Object it is
+		nested in.  This must be called after a List, Set or Dict attribute is
+		modified in place.
 		"""
-		for key, value in doc.iteritems():
-			if key in self._fields:
-				setattr(self, key, value)
+		if self._json_cache is not None and not self._frozen:
+			self._json_cache = None
+		if self._parents:
+			for parent in self._parents.values():
+				parent.touch()
+
+	def freeze(self):
+		"""
+		Make the instance and every nested Object and container immutable so it
+		can be shared without copies or locks.  Lists become tuples, sets become
+		frozensets and dicts become FrozenDicts.  Setting or deleting an attribute
+		of a frozen instance raises a TypeError.  Nested Objects are frozen in
+		place.
+		"""
+		if not self._frozen:
+			self._fields = FrozenDict(
+				(key, freeze(value)) for key, value in self._fields.iteritems()
+			)
+			self._frozen = True
+		return self
+
+	def update(self, doc, strict=False, atomic=False):
+		"""
+		Update attributes from a dict-like object.  Keys which are not fields are
+		ignored unless strict is True, in which case a ValidationError listing all
+		of them is raised before anything is set.  When atomic is True every value
+		is validated before any attribute is set so the instance is left unchanged
+		if one of them fails.
+		"""
+		field_names = self.field_names
+		if len(doc) > len(field_names):
+			keys = [key for key in field_names if key in doc]
+		else:
+			keys = [key for key in doc if key in field_names]
+		if strict and len(keys) < len(doc):
+			unknown = sorted(key for key in doc if key not in field_names)
+			raise ValidationError('unknown fields {}'.format(', '.join(map(repr, unknown))))
+
+		if not atomic:
+			for key in keys:
+				setattr(self, key, doc[key])
+			return
 
-	def validate(self):
+		cls = self.__class__
+		# values are validated against a plain instance holding a copy of the
+		# fields and the results are moved over once all of them have passed
+		staged = Object.__new__(Object)
+		staged._fields = dict(self._fields)
+		for key in keys:
+			getattr(cls, key).__set__(staged, doc[key])
+		fields = self._fields
+		for key in keys:
+			value = staged._fields[key]
+			if getattr(value, 'owner', None) is staged:
+				value._track(value.descriptor, self)
+			fields[key] = value
+		if keys and (self._json_cache is not None or self._parents):
+			self.touch()
+
+	def deferred_validate(self):
+		"""
+		Allows for multi-field validation which does I/O.  This is only run by
+		async_validate and must return truthy or raise a ValidationError.
+		"""
+		return True
+
+	def deferred_checks(self):
+		"""
+		Yield a (field, validator, value) tuple for every deferred validator of the
+		instance and of any nested Objects, including deferred_validate.
+		"""
+		cls = self.__class__
+		if cls.deferred_validate.im_func is not Object.deferred_validate.im_func:
+			yield None, cls.deferred_validate.im_func, self
+		for key, value in self._fields.iteritems():
+			for check in getattr(cls, key).deferred_checks(value):
+				yield check
+
+	def async_validate(self, pool=None):
+		"""
+		Validate the instance and then run every check from deferred_checks
+		concurrently.  Checks are run on pool, which may be any object with the
+		map method of multiprocessing.pool.ThreadPool.  A ThreadPool of
+		ASYNC_POOL_SIZE threads shared by every call is used if pool is not
+		given.
+		"""
+		self.validate()
+		checks = {}
+		for field, validator, value in self.deferred_checks():
+			key = getattr(validator, 'key', lambda x: (validator, x))(value)
+			try:
+				check = checks.get(key)
+			except TypeError:
+				# unhashable keys are never deduplicated
+				key = object()
+				check = None
+			if check is None:
+				checks[key] = (field, validator, value)
+		if not checks:
+			return
+		checks = checks.values()
+		if pool is None:
+			pool = _async_pool()
+		results = pool.map(lambda check: check[1](check[2]), checks)
+		for (field, _, value), result in zip(checks, results):
+			if not result:
+				raise ValidationError('{!r} is not valid'.format(value), field)
+
+	def validate_sampled(self):
 		"""
-		Allows for multi-field validation
+		Validate the elements which List, Set and Dict attributes of this
+		instance and of nested instances skipped because only a sample of them
+		was validated
 		"""
-		for key in self._fields:
-			setattr(self, key, self._fields[key])
+		for value in self._fields.itervalues():
+			if getattr(value, 'sampled', False):
+				value.validate_all()
+			if isinstance(value, dict):
+				value = value.itervalues()
+			elif not isinstance(value, (list, tuple)):
+				value = (value,)
+			for v in value:
+				if isinstance(v, Object):
+					v.validate_sampled()
+
+	def validate(self, full=False):
+		"""
+		Allows for multi-field validation.  With full=True validate_sampled is
+		called first, so overrides of validate in nested classes are called
+		without arguments.
+		"""
+		if full:
+			self.validate_sampled()
+		if not self._frozen:
+			for key in self._fields:
+				setattr(self, key, self._fields[key])
 		for key, value in self._fields.iteritems():
 			if hasattr(value, 'validate'):
 				value.validate()
-			elif isinstance(value, list):
+			elif isinstance(value, (list, tuple)):
 				for v in value:
 					if hasattr(v, 'validate'):
 						v.validate()
@@ -0,0 +1,443 @@
+"""
+Write Object subclasses out as the source of an importable module so that
+deployments can ship precompiled schema modules instead of building classes
+from specs at startup.
+
+source = generate_module(Person, ('Tenant', tenant_spec))
+write_module('schemas/people.py', Person, ('Tenant', tenant_spec))
+
+Each class is written with its descriptors along with an __init__, __json__
+and validate specialized to its fields.  The specialized methods fall back to
+those of Object for subclasses and for instances which are frozen or have
+their __json__ cached.  Classes which an EmbeddedObject refers to are written
+to the module too unless they can be imported.
+
+Only what can be written as source is supported: validators and mutators must
+be module level functions, optionally wrapped with validators.memoize or
+validators.deferred, defaults must be literals, builtin types, module level
+functions or class methods of importable classes such as datetime.utcnow, and
+methods of the classes are not written out.  A ValueError is raised for
+anything else.
+"""
+import datetime
+import re
+import sys
+
+from .base import Object, Generic, FieldReader, identity, always_valid
+from .descriptors import (
+	String, Integer, Float, Bool, DateTime, TimeDelta, Choice, List, Set, Dict,
+	EmbeddedObject, ObjectList, ObjectDict, INTERNED, PARSED_DATETIMES, PARSED_TIMEDELTAS
+)
+from .spec import from_spec
+
+HEADER = '# Generated by valid_model.codegen, do not edit\n'
+# descriptors whose values can not have __json__ or validate methods
+SCALARS = (String, Integer, Float, Bool, DateTime, TimeDelta)
+LITERALS = (
+	type(None), bool, int, long, float, str, unicode, datetime.datetime,
+	datetime.timedelta
+)
+BUILTINS = (list, set, dict, tuple, frozenset, unicode, str, int, long, float, bool)
+DUNDER = re.compile(r'^__\w+__$')
+# class attributes which are never written out
+SKIPPED_ATTRIBUTES = set([
+	'__module__', '__doc__', '__dict__', '__weakref__', '__metaclass__', 'field_names',
+	# recreated from __fast_reads__ by ObjectMeta
+	'__slots__', '__new__', '__setattr__', '__delattr__', '_fields'
+])
+
+
+def json_value(value):
+	"""
+	The __json__ of a single attribute value, see Object.__json__
+	"""
+	if hasattr(value, '__json__'):
+		return value.__json__()
+	elif isinstance(value, list):
+		return [v.__json__() if hasattr(v, '__json__') else v for v in value]
+	elif isinstance(value, dict):
+		return dict(
+			(k, v.__json__()) if hasattr(v, '__json__') else (k, v)
+			for k, v in value.iteritems()
+		)
+	return value
+
+def validate_value(value):
+	"""
+	Validate the Objects held by a single attribute value, see Object.validate
+	"""
+	if hasattr(value, 'validate'):
+		value.validate()
+	elif isinstance(value, (list, tuple)):
+		for v in value:
+			if hasattr(v, 'validate'):
+				v.validate()
+
+
+def _is_scalar(descriptor):
+	return type(descriptor) in SCALARS and descriptor.mutator is identity
+
+def _is_embedded(descriptor):
+	return type(descriptor) is EmbeddedObject
+
+def _importable(klass):
+	module = sys.modules.get(klass.__module__)
+	return (
+		klass.__module__ != '__main__' and module is not None and
+		getattr(module, klass.__name__, None) is klass
+	)
+
+
+class ModuleWriter(object):
+	"""
+	Collects the classes, imports and helpers of a generated module
+	"""
+	def __init__(self):
+		self.imports = {}
+		self.classes = []
+		self.names = {}
+		self.helpers = set()
+		self.uses_datetime = False
+
+	def add_import(self, module, name):
+		"""
+		Import name from module and return the name it is bound to
+		"""
+		bound = self.imports.setdefault((module, name), name)
+		for (other_module, other_name), other in self.imports.iteritems():
+			if other == bound and (other_module, other_name) != (module, name):
+				bound = self.imports[(module, name)] = '_{}_{}'.format(
+					module.replace('.', '_'), name
+				)
+				break
+		return bound
+
+	def add_model(self, model):
+		"""
+		Add a class to the module after the classes it depends on
+		"""
+		if not (isinstance(model, type) and issubclass(model, Object)):
+			raise TypeError('{!r} is not a subclass of Object'.format(model))
+		if model in self.names:
+			return self.names[model]
+		if model.__name__ in self.names.values():
+			raise ValueError('two classes are named {}'.format(model.__name__))
+		# reserved before the dependencies so that cycles terminate
+		self.names[model] = model.__name__
+		for name in sorted(model.field_names):
+			for class_obj in _embedded_classes(getattr(model, name)):
+				if class_obj not in self.names and not _importable(class_obj):
+					self.add_model(class_obj)
+		self.classes.append(model)
+		return model.__name__
+
+	def class_ref(self, klass):
+		if klass in self.names:
+			return self.names[klass]
+		if _importable(klass):
+			return self.add_import(klass.__module__, klass.__name__)
+		return self.add_model(klass)
+
+	def function_ref(self, func, where):
+		module = sys.modules.get(getattr(func, '__module__', None))
+		name = getattr(func, '__name__', None)
+		owner = getattr(func, '__self__', None)
+		if isinstance(owner, type) and _importable(owner) and getattr(owner, name, None) == func:
+			# class methods such as datetime.utcnow
+			if owner.__module__ == 'datetime':
+				# the module is imported for datetime literals as well
+				self.uses_datetime = True
+				return 'datetime.{}.{}'.format(owner.__name__, name)
+			return '{}.{}'.format(self.class_ref(owner), name)
+		if module is None or name is None or getattr(module, name, None) is not func:
+			raise ValueError('{} must be a module level function, got {!r}'.format(where, func))
+		return self.add_import(module.__name__, name)
+
+	def literal(self, value, where):
+		if isinstance(value, type) and value in BUILTINS:
+			return value.__name__
+		elif isinstance(value, datetime.datetime) and value.tzinfo is not None:
+			raise ValueError('{} has a timezone aware datetime'.format(where))
+		elif isinstance(value, LITERALS):
+			if isinstance(value, (datetime.datetime, datetime.timedelta)):
+				self.uses_datetime = True
+			return repr(value)
+		elif isinstance(value, list):
+			return '[{}]'.format(', '.join(self.literal(v, where) for v in value))
+		elif isinstance(value, tuple):
+			return '({})'.format(''.join(self.literal(v, where) + ', ' for v in value))
+		elif isinstance(value, (set, frozenset)):
+			items = '[{}]'.format(', '.join(self.literal(v, where) for v in value))
+			return '{}({})'.format(value.__class__.__name__ if type(value) in (set, frozenset) else 'set', items)
+		elif isinstance(value, dict):
+			return '{{{}}}'.format(', '.join(
+				'{}: {}'.format(self.literal(k, where), self.literal(v, where))
+				for k, v in value.iteritems()
+			))
+		elif callable(value):
+			return self.function_ref(value, where)
+		raise ValueError('{} can not be written as source: {!r}'.format(where, value))
+
+	def function_arg(self, func, where):
+		"""
+		Source of a validator or mutator, None for the defaults
+		"""
+		if func is identity or func is always_valid:
+			return None
+		if getattr(func, 'deferred', False):
+			source = '{}({}'.format(
+				self.add_import('valid_model.validators', 'deferred'),
+				self.function_ref(func.__wrapped__, where)
+			)
+			if func.key_function is not None:
+				source += ', key={}'.format(self.function_ref(func.key_function, where))
+			return source + ')'
+		if hasattr(func, 'cache') and hasattr(func, '__wrapped__'):
+			func = func.__wrapped__
+		return self.function_ref(func, where)
+
+	def descriptor(self, descriptor, where):
+		"""
+		Source of an expression which creates an equivalent descriptor
+		"""
+		desc_class = type(descriptor)
+		if desc_class is EmbeddedObject:
+			return '{}({})'.format(
+				self.add_import('valid_model.descriptors', 'EmbeddedObject'),
+				self.class_ref(descriptor.class_obj)
+			)
+		if desc_class is ObjectList:
+			desc_class = List
+		elif desc_class is ObjectDict:
+			desc_class = Dict
+		if desc_class not in (String, Integer, Float, Bool, DateTime, TimeDelta, Choice, List, Set, Dict):
+			raise ValueError('{} is a {} which can not be written as source'.format(
+				where, desc_class.__name__
+			))
+		args = []
+		if desc_class is Choice:
+			args.append(self.literal(descriptor.choices, where))
+
+		container_default = {List: list, Set: set, Dict: dict}.get(desc_class)
+		if descriptor.default is not container_default:
+			args.append('default={}'.format(self.literal(descriptor.default, where)))
+		if desc_class is Dict and descriptor.key is not None:
+			args.append('key={}'.format(self.descriptor(descriptor.key, where + ' key')))
+		if desc_class in (List, Set, Dict) and descriptor.value is not None:
+			args.append('value={}'.format(self.descriptor(descriptor.value, where + ' value')))
+
+		validator = descriptor.deferred_validator or descriptor.validator
+		for arg, func in (('validator', validator), ('mutator', descriptor.mutator)):
+			source = self.function_arg(func, '{} {}'.format(where, arg))
+			if source is not None:
+				args.append('{}={}'.format(arg, source))
+		if container_default is None:
+			if not descriptor.nullable:
+				args.append('nullable=False')
+			cached = [
+				func.cache.size for func in (descriptor.validator, descriptor.mutator)
+				if hasattr(func, 'cache')
+			]
+			if cached:
+				args.append('cache={}'.format(cached[0]))
+		if container_default is not None and descriptor.sample is not None:
+			args.append('sample={!r}'.format(descriptor.sample))
+			for arg, default in (('sample_edges', 10), ('sample_seed', 0)):
+				if getattr(descriptor, arg) != default:
+					args.append('{}={!r}'.format(arg, getattr(descriptor, arg)))
+		if desc_class in (DateTime, TimeDelta) and descriptor.parsed is not None:
+			shared = descriptor.parsed is PARSED_DATETIMES or descriptor.parsed is PARSED_TIMEDELTAS
+			args.append('parse={}'.format(True if shared else descriptor.parsed.size))
+		if desc_class is String and descriptor.interned is not None:
+			intern = True if descriptor.interned is INTERNED else descriptor.interned.size
+			args.append('intern={}'.format(intern))
+		return '{}({})'.format(
+			self.add_import('valid_model.descriptors', desc_class.__name__), ', '.join(args)
+		)
+
+	def class_attributes(self, model):
+		"""
+		Configuration attributes of model and its bases such as
+		__cassandra_table__
+		"""
+		attrs = {}
+		for klass in reversed(model.__mro__):
+			if klass is object or klass is Object:
+				continue
+			for name, value in vars(klass).iteritems():
+				if name in SKIPPED_ATTRIBUTES or isinstance(value, (Generic, FieldReader)):
+					continue
+				if isinstance(value, (staticmethod, classmethod, property)) or callable(value):
+					raise ValueError('{}.{} is a method which can not be written as source'.format(
+						model.__name__, name
+					))
+				if DUNDER.match(name) or not name.startswith('_'):
+					attrs[name] = value
+		return attrs
+
+	def initial_value(self, model, name, descriptor):
+		initial_value = type(descriptor).initial_value.im_func
+		if initial_value is Generic.initial_value.im_func and isinstance(descriptor.default, LITERALS):
+			return self.literal(descriptor.default, '{}.{}'.format(model.__name__, name))
+		return '{}.{}.initial_value(self)'.format(self.names[model], name)
+
+	def json_expression(self, descriptor, value):
+		desc_class = type(descriptor)
+		if _is_scalar(descriptor) or (desc_class is Set and descriptor.mutator is identity):
+			return value
+		elif _is_embedded(descriptor):
+			return '({0}.__json__() if {0} is not None else None)'.format(value)
+		elif desc_class in (List, ObjectList, Dict, ObjectDict) and descriptor.mutator is identity:
+			element = descriptor.value
+			if element is not None and _is_scalar(element):
+				return '{}({})'.format('list' if desc_class in (List, ObjectList) else 'dict', value)
+			elif element is not None and _is_embedded(element):
+				if desc_class in (List, ObjectList):
+					return '[v.__json__() if v is not None else None for v in {}]'.format(value)
+				return 'dict((k, v.__json__() if v is not None else None) for k, v in {}.iteritems())'.format(value)
+		self.helpers.add('json_value')
+		return 'json_value({})'.format(value)
+
+	def nested_validation(self, descriptor, value):
+		"""
+		Lines which validate the Objects held by an attribute value
+		"""
+		desc_class = type(descriptor)
+		if _is_scalar(descriptor):
+			return []
+		elif _is_embedded(descriptor):
+			return ['if {} is not None:'.format(value), '\t{}.validate()'.format(value)]
+		elif descriptor.mutator is identity:
+			if desc_class in (Set, Dict, ObjectDict):
+				return []
+			elif desc_class in (List, ObjectList):
+				element = descriptor.value
+				if element is not None and _is_scalar(element):
+					return []
+				elif element is not None and _is_embedded(element):
+					return [
+						'for v in {}:'.format(value),
+						'\tif v is not None:',
+						'\t\tv.validate()',
+					]
+		self.helpers.add('validate_value')
+		return ['validate_value({})'.format(value)]
+
+	def class_source(self, model):
+		name = self.names[model]
+		fields = sorted(model.field_names)
+		descriptors = [(field, getattr(model, field)) for field in fields]
+		lines = ['class {}({}):'.format(name, self.add_import('valid_model.base', 'Object'))]
+		if model.__doc__:
+			lines.append('\t__doc__ = {!r}'.format(model.__doc__))
+		for attr, value in sorted(self.class_attributes(model).iteritems()):
+			lines.append('\t{} = {}'.format(attr, self.literal(value, '{}.{}'.format(name, attr))))
+		for field, descriptor in descriptors:
+			lines.append('\t{} = {}'.format(
+				field, self.descriptor(descriptor, '{}.{}'.format(name, field))
+			))
+
+		lines.extend([
+			'',
+			'\tdef __init__(self, **kwargs):',
+			'\t\tif self.__class__ is not {}:'.format(name),
+			'\t\t\tObject.__init__(self, **kwargs)',
+			'\t\t\treturn',
+			'\t\tself._fields = {',
+		])
+		lines.extend(
+			'\t\t\t{!r}: {},'.format(field, self.initial_value(model, field, descriptor))
+			for field, descriptor in descriptors
+		)
+		lines.extend([
+			'\t\t}',
+			'\t\tfield_names = self.field_names',
+			'\t\tfor key, value in kwargs.items():',
+			'\t\t\tif key in field_names:',
+			'\t\t\t\tsetattr(self, key, value)',
+			'',
+			'\tdef __json__(self):',
+			'\t\tif (self.__class__ is not {} or self._json_cache is not None or'.format(name),
+			'\t\t\t\tself._frozen or self.__json_cache__ or self._parents):',
+			'\t\t\treturn Object.__json__(self)',
+			'\t\tfields = self._fields',
+			'\t\treturn {',
+		])
+		lines.extend(
+			'\t\t\t{!r}: {},'.format(field, self.json_expression(descriptor, 'fields[{!r}]'.format(field)))
+			for field, descriptor in descriptors
+		)
+		lines.extend([
+			'\t\t}',
+			'',
+			'\tdef validate(self, full=False):',
+			'\t\tif full:',
+			'\t\t\tself.validate_sampled()',
+			'\t\tif self.__class__ is not {}:'.format(name),
+			'\t\t\treturn Object.validate(self)',
+			'\t\tfields = self._fields',
+			'\t\tif not self._frozen:',
+		])
+		lines.extend(
+			'\t\t\t{0}.{1}.__set__(self, fields[{1!r}])'.format(name, field)
+			for field, _ in descriptors
+		)
+		if not descriptors:
+			lines.append('\t\t\tpass')
+		for field, descriptor in descriptors:
+			lines.extend(
+				'\t\t' + line
+				for line in self.nested_validation(descriptor, 'fields[{!r}]'.format(field))
+			)
+		return '\n'.join(lines) + '\n'
+
+	def source(self):
+		# classes are written first so that every import is known
+		classes = [self.class_source(model) for model in self.classes]
+		for helper in sorted(self.helpers):
+			self.add_import('valid_model.codegen', helper)
+		modules = {}
+		for (module, name), bound in self.imports.iteritems():
+			modules.setdefault(module, []).append(
+				name if bound == name else '{} as {}'.format(name, bound)
+			)
+		imports = ['import datetime', ''] if self.uses_datetime else []
+		imports.extend(
+			'from {} import {}'.format(module, ', '.join(sorted(names)))
+			for module, names in sorted(modules.iteritems())
+		)
+		return '{}{}\n\n\n{}'.format(HEADER, '\n'.join(imports), '\n\n'.join(classes))
+
+
+def _embedded_classes(descriptor):
+	if isinstance(descriptor, EmbeddedObject):
+		yield descriptor.class_obj
+	for nested in (getattr(descriptor, 'key', None), getattr(descriptor, 'value', None)):
+		if nested is not None:
+			for class_obj in _embedded_classes(nested):
+				yield class_obj
+
+def generate_module(*models):
+	"""
+	Return the source of a module defining each model, which is either an Object
+	subclass or a (name, spec) tuple as taken by valid_model.from_spec
+	"""
+	writer = ModuleWriter()
+	for model in models:
+		if isinstance(model, tuple):
+			model = from_spec(*model)
+		writer.add_model(model)
+	return writer.source()
+
+def write_module(path, *models):
+	"""
+	Write the source of a module defining each model to path, see
+	generate_module
+	"""
+	source = generate_module(*models)
+	with open(path, 'w') as module:
+		module.write(source)
+	return source
+
+
+__all__ = ['generate_module', 'write_module']
@@ -0,0 +1,314 @@
+"""
+Containers used as the values of List, Set and Dict attributes.
+
+Elements added to a container are validated with the descriptor of the
+attribute it belongs to, so only the new elements are checked instead of the
+whole container.  Any change to a container touches the Object which owns it
+so that cached state such as the output of __json__ is discarded.
+
+Copies and pickles of these containers are plain lists, sets and dicts.
+
+ValidatedStream is the value of Stream attributes.  It validates the elements
+of any iterable as they are consumed instead of holding all of them.
+"""
+from array import array
+import weakref
+
+from .exc import ValidationError
+
+
+def _no_owner():
+	return None
+
+def _touching(method):
+	"""
+	Wrap a method which changes a container without adding elements to it
+	"""
+	def touching(self, *args, **kwargs):
+		result = method(self, *args, **kwargs)
+		self.touch()
+		return result
+	touching.__name__ = method.__name__
+	touching.__doc__ = method.__doc__
+	return touching
+
+def _validate_embedded(name, values):
+	"""
+	Validate the embedded instances among values, which were converted without
+	being validated if they were not in the sample
+	"""
+	for value in values:
+		if hasattr(value, 'validate'):
+			try:
+				value.validate()
+			except ValidationError as ex:
+				raise ValidationError(ex.msg, '{}.{}'.format(name, ex.field) if ex.field else name)
+
+
+class TrackedContainer(object):
+	"""
+	descriptor: the List, Set or Dict descriptor which validates new elements
+	owner: the Object instance whose attribute holds the container
+	sampled: True while only a sample of the elements has been validated, see
+	         validate_all
+	"""
+	__slots__ = ()
+
+	def _track(self, descriptor, owner):
+		self.descriptor = descriptor
+		self._owner = _no_owner if owner is None else weakref.ref(owner)
+
+	@property
+	def owner(self):
+		return self._owner()
+
+	def touch(self):
+		owner = self._owner()
+		if owner is not None and (owner._json_cache is not None or owner._parents):
+			owner.touch()
+
+
+class ValidatedList(TrackedContainer, list):
+	__slots__ = ('descriptor', '_owner', 'sampled')
+
+	def __init__(self, values=(), descriptor=None, owner=None):
+		list.__init__(self, values)
+		self._track(descriptor, owner)
+		self.sampled = False
+
+	def __reduce__(self):
+		return (list, (list(self),))
+
+	def validate_all(self):
+		"""
+		Validate the elements which were skipped when only a sample was validated
+		"""
+		if self.sampled:
+			validate = self.descriptor.validate_value
+			owner = self.owner
+			values = [validate(v, owner) for v in self]
+			_validate_embedded(self.descriptor.name, values)
+			list.__setslice__(self, 0, len(self), values)
+			self.sampled = False
+			self.touch()
+
+	def append(self, value):
+		list.append(self, self.descriptor.validate_value(value, self.owner))
+		self.touch()
+
+	def extend(self, values):
+		validate = self.descriptor.validate_value
+		owner = self.owner
+		list.extend(self, [validate(v, owner) for v in values])
+		self.touch()
+
+	def insert(self, idx, value):
+		list.insert(self, idx, self.descriptor.validate_value(value, self.owner))
+		self.touch()
+
+	def __setitem__(self, idx, value):
+		validate = self.descriptor.validate_value
+		owner = self.owner
+		if isinstance(idx, slice):
+			value = [validate(v, owner) for v in value]
+		else:
+			value = validate(value, owner)
+		list.__setitem__(self, idx, value)
+		self.touch()
+
+	def __setslice__(self, i, j, values):
+		validate = self.descriptor.validate_value
+		owner = self.owner
+		list.__setslice__(self, i, j, [validate(v, owner) for v in values])
+		self.touch()
+
+	def __iadd__(self, values):
+		self.extend(values)
+		return self
+
+	__imul__ = _touching(list.__imul__)
+	__delitem__ = _touching(list.__delitem__)
+	__delslice__ = _touching(list.__delslice__)
+	pop = _touching(list.pop)
+	remove = _touching(list.remove)
+	reverse = _touching(list.reverse)
+	sort = _touching(list.sort)
+
+
+class ValidatedSet(TrackedContainer, set):
+	__slots__ = ('descriptor', '_owner', 'sampled')
+
+	def __init__(self, values=(), descriptor=None, owner=None):
+		set.__init__(self, values)
+		self._track(descriptor, owner)
+		self.sampled = False
+
+	def __reduce__(self):
+		return (set, (list(self),))
+
+	def validate_all(self):
+		"""
+		Validate the elements which were skipped when only a sample was validated
+		"""
+		if self.sampled:
+			validate = self.descriptor.validate_value
+			owner = self.owner
+			values = [validate(v, owner) for v in self]
+			_validate_embedded(self.descriptor.name, values)
+			set.clear(self)
+			set.update(self, values)
+			self.sampled = False
+			self.touch()
+
+	def add(self, value):
+		set.add(self, self.descriptor.validate_value(value, self.owner))
+		self.touch()
+
+	def update(self, *others):
+		validate = self.descriptor.validate_value
+		owner = self.owner
+		set.update(self, *([validate(v, owner) for v in other] for other in others))
+		self.touch()
+
+	def symmetric_difference_update(self, other):
+		validate = self.descriptor.validate_value
+		owner = self.owner
+		set.symmetric_difference_update(self, [validate(v, owner) for v in other])
+		self.touch()
+
+	def __ior__(self, other):
+		self.update(other)
+		return self
+
+	def __ixor__(self, other):
+		self.symmetric_difference_update(other)
+		return self
+
+	__iand__ = _touching(set.__iand__)
+	__isub__ = _touching(set.__isub__)
+	clear = _touching(set.clear)
+	difference_update = _touching(set.difference_update)
+	discard = _touching(set.discard)
+	intersection_update = _touching(set.intersection_update)
+	pop = _touching(set.pop)
+	remove = _touching(set.remove)
+
+
+class ValidatedDict(TrackedContainer, dict):
+	__slots__ = ('descriptor', '_owner', 'sampled')
+
+	def __init__(self, values=(), descriptor=None, owner=None):
+		dict.__init__(self, values)
+		self._track(descriptor, owner)
+		self.sampled = False
+
+	def __reduce__(self):
+		return (dict, (dict(self),))
+
+	def validate_all(self):
+		"""
+		Validate the items which were skipped when only a sample was validated
+		"""
+		if self.sampled:
+			validate = self.descriptor.validate_item
+			owner = self.owner
+			items = [validate(k, v, owner) for k, v in self.iteritems()]
+			_validate_embedded(self.descriptor.name, [v for k, v in items])
+			dict.clear(self)
+			dict.update(self, items)
+			self.sampled = False
+			self.touch()
+
+	def __setitem__(self, key, value):
+		key, value = self.descriptor.validate_item(key, value, self.owner)
+		dict.__setitem__(self, key, value)
+		self.touch()
+
+	def update(self, *args, **kwargs):
+		validate = self.descriptor.validate_item
+		owner = self.owner
+		dict.update(self, [validate(k, v, owner) for k, v in dict(*args, **kwargs).iteritems()])
+		self.touch()
+
+	def setdefault(self, key, default=None):
+		key = self.descriptor.validate_key(key, self.owner)
+		if key not in self:
+			dict.__setitem__(self, key, self.descriptor.validate_value(key, default, self.owner))
+			self.touch()
+		return self[key]
+
+	__delitem__ = _touching(dict.__delitem__)
+	clear = _touching(dict.clear)
+	pop = _touching(dict.pop)
+	popitem = _touching(dict.popitem)
+
+
+class ValidatedStream(object):
+	"""
+	Iterator over values which validates each element with
+	descriptor.validate_element as it is consumed.  Iteration stops at the
+	first invalid element.  With a typecode the validated elements are also
+	kept in an array, which is iterated instead once values is exhausted.
+	"""
+	__slots__ = ('descriptor', 'index', 'array', '_iterator')
+
+	def __init__(self, values, descriptor, typecode=None):
+		self.descriptor = descriptor
+		self.index = 0
+		self.array = None if typecode is None else array(typecode)
+		self._iterator = iter(values)
+
+	@property
+	def exhausted(self):
+		return self._iterator is None
+
+	def __iter__(self):
+		if self._iterator is None and self.array is not None:
+			return iter(self.array)
+		return self
+
+	def next(self):
+		iterator = self._iterator
+		if iterator is None:
+			raise StopIteration
+		try:
+			value = next(iterator)
+		except StopIteration:
+			self._iterator = None
+			raise
+		try:
+			value = self.descriptor.validate_element(value, self.index)
+			if self.array is not None:
+				self.array.append(value)
+		except ValidationError:
+			self._iterator = None
+			raise
+		except (TypeError, OverflowError) as ex:
+			# the value does not fit the array
+			self._iterator = None
+			raise ValidationError(str(ex), '{}[{}]'.format(self.descriptor.name, self.index))
+		self.index += 1
+		return value
+
+	def materialize(self):
+		"""
+		Consume the remaining elements and return the array of all of them
+		"""
+		if self.array is None:
+			raise TypeError('stream has no typecode')
+		for _ in self:
+			pass
+		return self.array
+
+	def __json__(self):
+		# only the elements of streams with a typecode are kept once consumed
+		if self.array is None:
+			raise TypeError('{} is a stream without a typecode which can not be serialized'.format(self.descriptor.name))
+		return self.materialize().tolist()
+
+	def freeze(self):
+		# consuming the stream to freeze it would defeat its purpose
+		raise TypeError('{} is a stream which can not be frozen'.format(self.descriptor.name))
+
+	def _write_canonical(self, write):
+		raise TypeError('{} is a stream which can not be fingerprinted'.format(self.descriptor.name))
@@ -1,11 +1,66 @@
+from array import array
 from datetime import datetime, timedelta
 import warnings
 from .exc import ValidationError
-from .base import Object, Generic
-from .utils import is_descriptor
+from .base import Generic, join_field
+from .containers import (
+	TrackedContainer, ValidatedList, ValidatedSet, ValidatedDict, ValidatedStream
+)
+from .utils import is_descriptor, LRUCache, sample_indices, parse_datetime, parse_timedelta
+from .validators import is_in
+
+# shared table of the most recently used values for String(intern=True)
+INTERN_SIZE = 65536
+INTERNED = LRUCache(INTERN_SIZE)
+
+# shared tables of recently parsed strings for DateTime(parse=True) and
+# TimeDelta(parse=True)
+PARSE_CACHE_SIZE = 1024
+PARSED_DATETIMES = LRUCache(PARSE_CACHE_SIZE)
+PARSED_TIMEDELTAS = LRUCache(PARSE_CACHE_SIZE)
+
+# conversions of values of exactly these types to Integer and Float values,
+# other types fall back to isinstance checks
+INTEGER_CONVERSIONS = {long: int, float: int}
+FLOAT_CONVERSIONS = {int: float, long: float}
+
+
+class _Element(object):
+	"""
+	Throwaway instance which the elements of a container owned by owner are set
+	on
+	"""
+	__slots__ = ('_fields', 'owner', '__weakref__')
+	_json_cache = None
+	_parents = None
+
+	def __init__(self, owner):
+		self._fields = {}
+		self.owner = owner
+
+def _element(owner):
+	"""
+	The _Element to set the elements of a container owned by owner on, which
+	may be an _Element already
+	"""
+	return owner if isinstance(owner, _Element) else _Element(owner)
+
+def _set_element(descriptor, value, owner):
+	"""
+	Set value with descriptor as an element of a container owned by owner.
+	Containers nested in the element are tracked by owner, so changing them in
+	place touches it.
+	"""
+	element = _element(owner)
+	value = descriptor.__set__(element, value)
+	if isinstance(value, TrackedContainer):
+		value._track(value.descriptor, element.owner)
+	return value
 
 
 class EmbeddedObject(Generic):
+	# dicts are converted without validating the embedded instance if False
+	validate_embedded = True
 	def __init__(self, class_obj):
 		self.class_obj = class_obj
 		validator = lambda x: isinstance(x, class_obj)
@@ -16,11 +71,30 @@ class EmbeddedObject(Generic):
 	def __set__(self, instance, value):
 		try:
 			if isinstance(value, dict):
-				value = self.class_obj(**value)
+				if self.validate_embedded:
+					value = self.class_obj(**value)
+				else:
+					value = self.trusted_value(instance, value)
 			return Generic.__set__(self, instance, value)
 		except ValidationError as ex:
 			raise ValidationError(ex.msg, '{}.{}'.format(self.name, ex.field) if ex.field else self.name)
 
+	def trusted_value(self, instance, value):
+		if isinstance(value, dict):
+			return self.class_obj.from_row(value.values(), value.keys(), validate=False)
+		return value
+
+	def unchecked(self):
+		unchecked = Generic.unchecked(self)
+		unchecked.validate_embedded = False
+		return unchecked
+
+	def deferred_checks(self, value):
+		for check in Generic.deferred_checks(self, value):
+			yield check
+		if value is not None:
+			for field, validator, v in value.deferred_checks():
+				yield join_field(self.name, field), validator, v
 
 
 class String(Generic):
@@ -28,11 +102,24 @@ class String(Generic):
 	This descriptor will convert any set value to a python unicode string before
 	being mutated and validated.  If the value is type(str) it will be decoded
 	using utf-8
+
+	intern: if True valid values are replaced by an equal value from a table
+	        shared by all interned String descriptors so that equal values are
+	        the same object.  The table holds at most INTERN_SIZE of the most
+	        recently used values.  If a number the descriptor uses its own
+	        table which holds at most that many.
 	"""
-	def __init__(self, default=None, validator=None, mutator=None, nullable=True):
+	def __init__(self, default=None, validator=None, mutator=None, nullable=True, cache=None, intern=False):
 		Generic.__init__(
-			self, default=default, validator=validator, mutator=mutator, nullable=nullable
+			self, default=default, validator=validator, mutator=mutator, nullable=nullable,
+			cache=cache
 		)
+		if intern is True:
+			self.interned = INTERNED
+		elif intern:
+			self.interned = LRUCache(intern)
+		else:
+			self.interned = None
 
 	def __set__(self, instance, value):
 		if value is None or isinstance(value, unicode):
@@ -41,21 +128,29 @@ class String(Generic):
 			value = unicode(value, 'utf-8')
 		else:
 			raise ValidationError("{!r} is not a string".format(value), self.name)
-		return Generic.__set__(self, instance, value)
+		value = Generic.__set__(self, instance, value)
+		if self.interned is not None and value is not None:
+			value = self.interned.setdefault(value, value)
+			getattr(instance, '_fields')[self.name] = value
+		return value
 
 class Integer(Generic):
 	"""
 	This descriptor will convert any set value to an int before being mutated and
 	validated.
 	"""
-	def __init__(self, default=None, validator=None, mutator=None, nullable=True):
+	def __init__(self, default=None, validator=None, mutator=None, nullable=True, cache=None):
 		Generic.__init__(
-			self, default=default, validator=validator, mutator=mutator, nullable=nullable
+			self, default=default, validator=validator, mutator=mutator, nullable=nullable,
+			cache=cache
 		)
 
 	def __set__(self, instance, value):
-		if value is not None:
-			if not isinstance(value, (int, long, float)) or isinstance(value, bool):
+		if value.__class__ is not int and value is not None:
+			convert = INTEGER_CONVERSIONS.get(value.__class__)
+			if convert is not None:
+				value = convert(value)
+			elif not isinstance(value, (int, long, float)) or isinstance(value, bool):
 				raise ValidationError("{!r} is not an int".format(value), self.name)
 			else:
 				value = int(value)
@@ -66,14 +161,18 @@ class Float(Generic):
 	This descriptor will convert any set value to a float before being mutated
 	and validated.
 	"""
-	def __init__(self, default=None, validator=None, mutator=None, nullable=True):
+	def __init__(self, default=None, validator=None, mutator=None, nullable=True, cache=None):
 		Generic.__init__(
-			self, default=default, validator=validator, mutator=mutator, nullable=nullable
+			self, default=default, validator=validator, mutator=mutator, nullable=nullable,
+			cache=cache
 		)
 
 	def __set__(self, instance, value):
-		if value is not None:
-			if not isinstance(value, (int, long, float)) or isinstance(value, bool):
+		if value.__class__ is not float and value is not None:
+			convert = FLOAT_CONVERSIONS.get(value.__class__)
+			if convert is not None:
+				value = convert(value)
+			elif not isinstance(value, (int, long, float)) or isinstance(value, bool):
 				raise ValidationError("{!r} is not a float".format(value), self.name)
 			else:
 				value = float(value)
@@ -84,13 +183,14 @@ class Bool(Generic):
 	This descriptor will convert any set value to a bool before being mutated
 	and validated.
 	"""
-	def __init__(self, default=None, validator=None, mutator=None, nullable=True):
+	def __init__(self, default=None, validator=None, mutator=None, nullable=True, cache=None):
 		Generic.__init__(
-			self, default=default, validator=validator, mutator=mutator, nullable=nullable
+			self, default=default, validator=validator, mutator=mutator, nullable=nullable,
+			cache=cache
 		)
 
 	def __set__(self, instance, value):
-		if value is not None:
+		if value.__class__ is not bool and value is not None:
 			if value in (0, 1) or isinstance(value, bool):
 				value = bool(value)
 			else:
@@ -101,40 +201,161 @@ class DateTime(Generic):
 	"""
 	This descriptor will assert any set value is a datetime or None before being
 	mutated and validated.
+
+	parse: if True ISO-8601 strings such as 2015-01-02T03:04:05Z and numbers of
+	       seconds since the epoch are parsed into naive datetimes, in UTC if
+	       they had a UTC offset, see utils.parse_datetime.  Recently parsed
+	       strings are kept in a table shared by all DateTime descriptors, or in
+	       a table of its own holding at most that many strings if parse is a
+	       number.
 	"""
-	def __init__(self, default=None, validator=None, mutator=None, nullable=True):
+	def __init__(self, default=None, validator=None, mutator=None, nullable=True, cache=None, parse=False):
 		Generic.__init__(
-			self, default=default, validator=validator, mutator=mutator, nullable=nullable
+			self, default=default, validator=validator, mutator=mutator, nullable=nullable,
+			cache=cache
 		)
+		if parse is True:
+			self.parsed = PARSED_DATETIMES
+		elif parse:
+			self.parsed = LRUCache(parse)
+		else:
+			self.parsed = None
+
+	def parse(self, value):
+		"""
+		Parse a value which is not a datetime, using the table of parsed strings
+		"""
+		if isinstance(value, basestring):
+			parsed = self.parsed.get(value)
+			if parsed is not None:
+				return parsed
+		try:
+			parsed = parse_datetime(value)
+		except ValueError:
+			raise ValidationError("{!r} is not a datetime".format(value), self.name)
+		if isinstance(value, basestring):
+			self.parsed[value] = parsed
+		return parsed
 
 	def __set__(self, instance, value):
 		if value is not None and not isinstance(value, datetime):
-			raise ValidationError("{!r} is not a datetime".format(value), self.name)
+			if self.parsed is None:
+				raise ValidationError("{!r} is not a datetime".format(value), self.name)
+			value = self.parse(value)
 		return Generic.__set__(self, instance, value)
 
 class TimeDelta(Generic):
 	"""
 	This descriptor will assert any set value is a timedelta or None before
 	being mutated and validated.
+
+	parse: if True ISO-8601 durations such as P1DT2H and numbers of seconds
+	       are parsed into timedeltas, see utils.parse_timedelta.  Parsed strings
+	       are cached like DateTime(parse=True).
 	"""
-	def __init__(self, default=None, validator=None, mutator=None, nullable=True):
+	def __init__(self, default=None, validator=None, mutator=None, nullable=True, cache=None, parse=False):
 		Generic.__init__(
-			self, default=default, validator=validator, mutator=mutator, nullable=nullable
+			self, default=default, validator=validator, mutator=mutator, nullable=nullable,
+			cache=cache
 		)
+		if parse is True:
+			self.parsed = PARSED_TIMEDELTAS
+		elif parse:
+			self.parsed = LRUCache(parse)
+		else:
+			self.parsed = None
+
+	def parse(self, value):
+		"""
+		Parse a value which is not a timedelta, using the table of parsed strings
+		"""
+		if isinstance(value, basestring):
+			parsed = self.parsed.get(value)
+			if parsed is not None:
+				return parsed
+		try:
+			parsed = parse_timedelta(value)
+		except ValueError:
+			raise ValidationError("{!r} is not a timedelta".format(value), self.name)
+		if isinstance(value, basestring):
+			self.parsed[value] = parsed
+		return parsed
 
 	def __set__(self, instance, value):
 		if value is not None and not isinstance(value, timedelta):
-			raise ValidationError("{!r} is not a timedelta".format(value), self.name)
+			if self.parsed is None:
+				raise ValidationError("{!r} is not a timedelta".format(value), self.name)
+			value = self.parse(value)
+		return Generic.__set__(self, instance, value)
+
+class Choice(Generic):
+	"""
+	This descriptor will assert any set value is one of choices or None before
+	being mutated and validated.
+	"""
+	def __init__(self, choices, default=None, validator=None, mutator=None, nullable=True, cache=None):
+		Generic.__init__(
+			self, default=default, validator=validator, mutator=mutator, nullable=nullable,
+			cache=cache
+		)
+		self.choices = choices
+		self.is_choice = is_in(choices)
+
+	def __set__(self, instance, value):
+		if value is not None and not self.is_choice(value):
+			raise ValidationError("{!r} is not a valid choice".format(value), self.name)
 		return Generic.__set__(self, instance, value)
 
 class List(Generic):
-	def __init__(self, default=list, value=None, validator=None, mutator=None):
+	"""
+	This descriptor will assert any set value is a list before its elements are
+	validated with the value descriptor.  The attribute holds a ValidatedList
+	which validates elements as they are added.
+
+	sample: if set, a value with more elements than sample + 2 * sample_edges
+	        only has its first and last sample_edges elements and sample others
+	        chosen at random with sample_seed validated.  The other elements
+	        are converted without being validated and the container is marked
+	        as sampled until its validate_all or the validate(full=True) of the
+	        Object is called.
+	"""
+	def __init__(self, default=list, value=None, validator=None, mutator=None,
+			sample=None, sample_edges=10, sample_seed=0):
 		Generic.__init__(
 			self, default=default, validator=validator, mutator=mutator, nullable=False
 		)
 		if value is not None and not isinstance(value, Generic):
 			raise TypeError('value must be None or an instance of Generic')
 		self.value = value
+		self.sample = sample
+		self.sample_edges = sample_edges
+		self.sample_seed = sample_seed
+
+	def initial_value(self, instance):
+		value = self.get_default()
+		return ValidatedList(value, self, instance) if isinstance(value, list) else value
+
+	def trusted_value(self, instance, value):
+		return ValidatedList(() if value is None else value, self, instance)
+
+	def reset_value(self, instance, value):
+		if self.default is list and getattr(value, 'owner', None) is instance:
+			list.__delslice__(value, 0, len(value))
+			value.sampled = False
+			return value
+		return self.initial_value(instance)
+
+	def validate_value(self, value, owner=None, descriptor=None):
+		"""
+		Validate a single element of a container owned by owner with the value
+		descriptor, or with descriptor such as its unchecked copy
+		"""
+		if self.value is None:
+			return value
+		try:
+			return _set_element(descriptor or self.value, value, owner)
+		except ValidationError as ex:
+			raise ValidationError(ex.msg, '{}.{}'.format(self.name, ex.field) if ex.field else self.name)
 
 	def __set__(self, instance, value):
 		if value is None:
@@ -142,46 +363,175 @@ class List(Generic):
 		elif not isinstance(value, list):
 			raise ValidationError("{!r} is not a list".format(value), self.name)
 
+		sampled = False
+		if getattr(value, 'descriptor', None) is self:
+			# elements of a ValidatedList were validated when they were added
+			sampled = value.sampled
+		elif self.value is not None:
+			indices = sample_indices(len(value), self.sample, self.sample_edges, self.sample_seed)
+			if indices is None:
+				element = _element(instance)
+				value = [self.validate_value(v, element) for v in value]
+			else:
+				# elements which are not in the sample are still converted
+				checked = set(indices)
+				unchecked = self.value.unchecked()
+				element = _element(instance)
+				value = [
+					self.validate_value(v, element, None if i in checked else unchecked)
+					for i, v in enumerate(value)
+				]
+				sampled = True
+		value = Generic.__set__(self, instance, value)
+		if getattr(value, 'owner', None) is not instance:
+			value = ValidatedList(value, self, instance)
+			value.sampled = sampled
+			getattr(instance, '_fields')[self.name] = value
+		return value
+
+	def deferred_checks(self, value):
+		for check in Generic.deferred_checks(self, value):
+			yield check
 		if self.value is not None:
-			new_value = list()
-			dummy = Object()
-			for v in value:
-				try:
-					v = self.value.__set__(dummy, v)
-				except ValidationError as ex:
-					raise ValidationError(ex.msg, '{}.{}'.format(self.name, ex.field) if ex.field else self.name)
-				new_value.append(v)
-			value = new_value
+			for element in value:
+				for field, validator, v in self.value.deferred_checks(element):
+					yield join_field(self.name, field), validator, v
+
+class Stream(Generic):
+	"""
+	This descriptor accepts any iterable, such as a generator or a file, and
+	holds a ValidatedStream which validates the elements with the value
+	descriptor as they are consumed so they never all have to be in memory.  The
+	index of an invalid element is part of the field of the ValidationError,
+	such as values[3].
+
+	typecode: if set the validated elements are also collected into an
+	          array.array of this typecode, which is iterated again once the
+	          iterable is exhausted
+	"""
+	def __init__(self, value=None, typecode=None, validator=None, mutator=None, nullable=True):
+		Generic.__init__(self, validator=validator, mutator=mutator, nullable=nullable)
+		if value is not None and not isinstance(value, Generic):
+			raise TypeError('value must be None or an instance of Generic')
+		if typecode is not None:
+			# raises ValueError for unknown typecodes
+			array(typecode)
+		self.value = value
+		self.typecode = typecode
+
+	def validate_element(self, value, index):
+		"""
+		Validate the element at index with the value descriptor
+		"""
+		if self.value is None:
+			return value
+		try:
+			return _set_element(self.value, value, None)
+		except ValidationError as ex:
+			raise ValidationError(ex.msg, join_field('{}[{}]'.format(self.name, index), ex.field))
+
+	def __set__(self, instance, value):
+		if value is not None and getattr(value, 'descriptor', None) is not self:
+			if not hasattr(value, '__iter__'):
+				raise ValidationError("{!r} is not iterable".format(value), self.name)
+			value = ValidatedStream(value, self, self.typecode)
 		return Generic.__set__(self, instance, value)
 
 class Set(Generic):
-	def __init__(self, default=set, value=None, validator=None, mutator=None):
+	"""
+	This descriptor will assert any set value is a set before its elements are
+	validated with the value descriptor.  The attribute holds a ValidatedSet
+	which validates elements as they are added.
+
+	sample: as for List
+	"""
+	def __init__(self, default=set, value=None, validator=None, mutator=None,
+			sample=None, sample_edges=10, sample_seed=0):
 		Generic.__init__(
 			self, default=default, validator=validator, mutator=mutator, nullable=False
 		)
 		if value is not None and not isinstance(value, Generic):
 			raise TypeError('value must be None or an instance of Generic')
 		self.value = value
+		self.sample = sample
+		self.sample_edges = sample_edges
+		self.sample_seed = sample_seed
+
+	def initial_value(self, instance):
+		value = self.get_default()
+		return ValidatedSet(value, self, instance) if isinstance(value, set) else value
+
+	def trusted_value(self, instance, value):
+		return ValidatedSet(() if value is None else value, self, instance)
+
+	def reset_value(self, instance, value):
+		if self.default is set and getattr(value, 'owner', None) is instance:
+			set.clear(value)
+			value.sampled = False
+			return value
+		return self.initial_value(instance)
+
+	def validate_value(self, value, owner=None, descriptor=None):
+		"""
+		Validate a single element of a container owned by owner with the value
+		descriptor, or with descriptor such as its unchecked copy
+		"""
+		if self.value is None:
+			return value
+		try:
+			return _set_element(descriptor or self.value, value, owner)
+		except ValidationError as ex:
+			raise ValidationError(ex.msg, '{}.{}'.format(self.name, ex.field) if ex.field else self.name)
 
 	def __set__(self, instance, value):
 		if value is None:
 			value = set()
 		elif not isinstance(value, set):
 			raise ValidationError("{!r} is not a set".format(value), self.name)
+
+		sampled = False
+		if getattr(value, 'descriptor', None) is self:
+			# elements of a ValidatedSet were validated when they were added
+			sampled = value.sampled
+		elif self.value is not None:
+			indices = sample_indices(len(value), self.sample, self.sample_edges, self.sample_seed)
+			if indices is None:
+				element = _element(instance)
+				value = set(self.validate_value(v, element) for v in value)
+			else:
+				checked = set(indices)
+				unchecked = self.value.unchecked()
+				element = _element(instance)
+				value = set(
+					self.validate_value(v, element, None if i in checked else unchecked)
+					for i, v in enumerate(value)
+				)
+				sampled = True
+		value = Generic.__set__(self, instance, value)
+		if getattr(value, 'owner', None) is not instance:
+			value = ValidatedSet(value, self, instance)
+			value.sampled = sampled
+			getattr(instance, '_fields')[self.name] = value
+		return value
+
+	def deferred_checks(self, value):
+		for check in Generic.deferred_checks(self, value):
+			yield check
 		if self.value is not None:
-			new_value = set()
-			dummy = Object()
-			for v in value:
-				try:
-					v = self.value.__set__(dummy, v)
-				except ValidationError as ex:
-					raise ValidationError(ex.msg, '{}.{}'.format(self.name, ex.field) if ex.field else self.name)
-				new_value.add(v)
-			value = new_value
-		return Generic.__set__(self, instance, value)
+			for element in value:
+				for field, validator, v in self.value.deferred_checks(element):
+					yield join_field(self.name, field), validator, v
 
 class Dict(Generic):
-	def __init__(self, default=dict, key=None, value=None, validator=None, mutator=None):
+	"""
+	This descriptor will assert any set value is a dict before its keys and
+	values are validated with the key and value descriptors.  The attribute
+	holds a ValidatedDict which validates items as they are added.
+
+	sample: as for List, with items instead of elements
+	"""
+	def __init__(self, default=dict, key=None, value=None, validator=None, mutator=None,
+			sample=None, sample_edges=10, sample_seed=0):
 		Generic.__init__(
 			self, default=default, validator=validator, mutator=mutator, nullable=False
 		)
@@ -191,27 +541,96 @@ class Dict(Generic):
 		if value is not None and not isinstance(value, Generic):
 			raise TypeError('value must be None or an instance of Generic')
 		self.value = value
+		self.sample = sample
+		self.sample_edges = sample_edges
+		self.sample_seed = sample_seed
+
+	def initial_value(self, instance):
+		value = self.get_default()
+		return ValidatedDict(value, self, instance) if isinstance(value, dict) else value
+
+	def trusted_value(self, instance, value):
+		return ValidatedDict(() if value is None else value, self, instance)
+
+	def reset_value(self, instance, value):
+		if self.default is dict and getattr(value, 'owner', None) is instance:
+			dict.clear(value)
+			value.sampled = False
+			return value
+		return self.initial_value(instance)
+
+	def validate_key(self, key, owner=None, descriptor=None):
+		"""
+		Validate a single key of a dict owned by owner with the key descriptor, or
+		with descriptor such as its unchecked copy
+		"""
+		if self.key is None:
+			return key
+		try:
+			return _set_element(descriptor or self.key, key, owner)
+		except ValidationError as ex:
+			raise ValidationError(ex.msg, "{} key {}".format(self.name, key))
+
+	def validate_value(self, key, value, owner=None, descriptor=None):
+		"""
+		Validate the value of an already validated key of a dict owned by owner
+		with the value descriptor, or with descriptor such as its unchecked copy
+		"""
+		if self.value is None:
+			return value
+		try:
+			return _set_element(descriptor or self.value, value, owner)
+		except ValidationError as ex:
+			raise ValidationError(ex.msg, "{}['{}']".format(self.name, key))
+
+	def validate_item(self, key, value, owner=None, key_descriptor=None, value_descriptor=None):
+		key = self.validate_key(key, owner, key_descriptor)
+		return key, self.validate_value(key, value, owner, value_descriptor)
 
 	def __set__(self, instance, value):
 		if value is None:
 			value = {}
 		elif not isinstance(value, dict):
 			raise ValidationError("{!r} is not a dict".format(value), self.name)
-		new_value = {}
-		dummy = Object()
+
+		sampled = False
+		if getattr(value, 'descriptor', None) is self:
+			# items of a ValidatedDict were validated when they were added
+			sampled = value.sampled
+		else:
+			indices = sample_indices(len(value), self.sample, self.sample_edges, self.sample_seed)
+			if indices is None:
+				element = _element(instance)
+				value = dict(self.validate_item(k, v, element) for k, v in value.iteritems())
+			else:
+				checked = set(indices)
+				unchecked = (
+					self.key and self.key.unchecked(), self.value and self.value.unchecked()
+				)
+				element = _element(instance)
+				value = dict(
+					self.validate_item(k, v, element) if i in checked
+					else self.validate_item(k, v, element, *unchecked)
+					for i, (k, v) in enumerate(value.iteritems())
+				)
+				sampled = True
+		value = Generic.__set__(self, instance, value)
+		if getattr(value, 'owner', None) is not instance:
+			value = ValidatedDict(value, self, instance)
+			value.sampled = sampled
+			getattr(instance, '_fields')[self.name] = value
+		return value
+
+	def deferred_checks(self, value):
+		for check in Generic.deferred_checks(self, value):
+			yield check
 		for k, v in value.iteritems():
 			if self.key is not None:
-				try:
-					k = self.key.__set__(dummy, k)
-				except ValidationError as ex:
-					raise ValidationError(ex.msg, "{} key {}".format(self.name, k))
+				for _, validator, checked in self.key.deferred_checks(k):
+					yield "{} key {}".format(self.name, k), validator, checked
 			if self.value is not None:
-				try:
-					v = self.value.__set__(dummy, v)
-				except ValidationError as ex:
-					raise ValidationError(ex.msg, "{}['{}']".format(self.name, k))
-			new_value[k] = v
-		return Generic.__set__(self, instance, new_value)
+				for field, validator, v in self.value.deferred_checks(v):
+					yield join_field("{}['{}']".format(self.name, k), field), validator, v
 
 class ObjectList(List):
 	def __init__(self, class_obj, mutator=None):
@@ -230,16 +649,28 @@ class ObjectDict(Dict):
 		warnings.warn("ObjectDict(class_obj) should be replaced with Dict(value=EmbeddedObject(class_obj))", DeprecationWarning)
 
 
+# descriptor classes by name, see register
+REGISTRY = {}
+
+def register(desc_class):
+	"""
+	Add a descriptor class to those returned by descriptors() and
+	descriptor_classes().  May be used as a class decorator.
+	"""
+	if not (is_descriptor(desc_class) and issubclass(desc_class, Generic)):
+		raise TypeError('{!r} is not a descriptor class'.format(desc_class))
+	REGISTRY[desc_class.__name__] = desc_class
+	return desc_class
+
+for _value in globals().values():
+	if is_descriptor(_value) and issubclass(_value, Generic):
+		register(_value)
+del _value
+
 def descriptors():
-	return [
-		name for name, value in globals().iteritems()
-		if is_descriptor(value) and issubclass(value, Generic)
-	]
+	return REGISTRY.keys()
 
 def descriptor_classes():
-	return [
-		value for value in globals().itervalues()
-		if is_descriptor(value) and issubclass(value, Generic)
-	]
+	return REGISTRY.values()
 
-__all__ = ['descriptor_classes'] + descriptors()
+__all__ = ['descriptor_classes', 'register'] + descriptors()
@@ -0,0 +1,169 @@
+"""
+Generate parameterized CQL statements for Object models and write whole
+collections of objects with as few round trips as possible.
+
+Models name their table and primary key with class attributes in the same way
+as examples/cassandra_example.py:
+
+class Job(Object):
+	__cassandra_table__ = 'jobs'
+	__cassandra_partition__ = (('owner',), ('created',))
+	owner = String(nullable=False)
+	created = DateTime(nullable=False)
+	status = String()
+
+Statements are built once per model class and column subset and are prepared
+once per session.  Values are encoded with the layout from valid_model.schema.
+
+writer = Writer(session)
+writer.insert_many(jobs, batch_size=50)
+"""
+from itertools import islice
+
+from .schema import layout, primary_key, table_name
+
+
+class InsertStatement(object):
+	"""
+	Parameterized INSERT of a subset of the columns of a model.  When ttl or
+	timestamp is True the statement takes them as its last parameters.
+	"""
+	def __init__(self, model, columns, if_not_exists=False, ttl=False, timestamp=False):
+		self.model = model
+		self.columns = columns
+		self.ttl = ttl
+		self.timestamp = timestamp
+		self.partition_columns = primary_key(model)[0]
+		by_name = layout(model).by_name
+		self.encoders = [(column, by_name[column].encode) for column in columns]
+
+		query = 'INSERT INTO {} ({}) VALUES ({})'.format(
+			table_name(model), ','.join(columns), ','.join('?' for _ in columns)
+		)
+		if if_not_exists:
+			query += ' IF NOT EXISTS'
+		options = []
+		if ttl:
+			options.append('TTL ?')
+		if timestamp:
+			options.append('TIMESTAMP ?')
+		if options:
+			query += ' USING {}'.format(' AND '.join(options))
+		self.query = query
+
+	def parameters(self, obj, ttl=None, timestamp=None):
+		fields = obj._fields
+		params = [
+			fields[column] if encode is None else encode(fields[column])
+			for column, encode in self.encoders
+		]
+		if self.ttl:
+			params.append(ttl)
+		if self.timestamp:
+			params.append(timestamp)
+		return tuple(params)
+
+	def parameters_many(self, objs, ttl=None, timestamp=None):
+		parameters = self.parameters
+		return [parameters(obj, ttl, timestamp) for obj in objs]
+
+	def partition(self, obj):
+		fields = obj._fields
+		return tuple(fields[column] for column in self.partition_columns)
+
+
+def insert_statement(model, columns=None, if_not_exists=False, ttl=False, timestamp=False):
+	"""
+	Return the cached InsertStatement of model for columns, which defaults to
+	all fields
+	"""
+	columns = tuple(sorted(model.field_names if columns is None else columns))
+	key = (columns, if_not_exists, bool(ttl), bool(timestamp))
+	statements = vars(model).get('_insert_statements')
+	if statements is None:
+		statements = {}
+		setattr(model, '_insert_statements', statements)
+	statement = statements.get(key)
+	if statement is None:
+		unknown = set(columns) - model.field_names
+		if unknown:
+			raise ValueError('{} are not fields of {}'.format(
+				', '.join(sorted(unknown)), model.__name__
+			))
+		statement = statements[key] = InsertStatement(model, *key)
+	return statement
+
+def batch_query(query, size):
+	return 'BEGIN UNLOGGED BATCH {} APPLY BATCH'.format(
+		' '.join('{};'.format(query) for _ in xrange(size))
+	)
+
+
+class Writer(object):
+	"""
+	Writes objects through a session with the prepare and execute methods of
+	cassandra.cluster.Session.  Each distinct query is prepared once.
+	"""
+	def __init__(self, session):
+		self.session = session
+		self.prepared = {}
+
+	def prepare(self, query):
+		prepared = self.prepared.get(query)
+		if prepared is None:
+			prepared = self.prepared[query] = self.session.prepare(query)
+		return prepared
+
+	def insert(self, obj, columns=None, ttl=None, timestamp=None, if_not_exists=False):
+		statement = insert_statement(
+			obj.__class__, columns, if_not_exists, ttl is not None, timestamp is not None
+		)
+		return self.session.execute(
+			self.prepare(statement.query), statement.parameters(obj, ttl, timestamp)
+		)
+
+	def insert_many(self, objs, columns=None, ttl=None, timestamp=None, batch_size=None):
+		"""
+		Insert every object in objs.  Without batch_size every object is its own
+		round trip, otherwise objects are grouped by model and partition key into
+		unlogged batches of at most batch_size inserts.  Returns the number of
+		round trips made.
+		"""
+		statements = {}
+		groups = {}
+		order = []
+		for obj in objs:
+			model = obj.__class__
+			statement = statements.get(model)
+			if statement is None:
+				statement = statements[model] = insert_statement(
+					model, columns, False, ttl is not None, timestamp is not None
+				)
+			key = (model, statement.partition(obj)) if batch_size else model
+			group = groups.get(key)
+			if group is None:
+				group = groups[key] = []
+				order.append(key)
+			group.append(statement.parameters(obj, ttl, timestamp))
+
+		round_trips = 0
+		for key in order:
+			statement = statements[key[0] if batch_size else key]
+			params = groups[key]
+			if not batch_size:
+				prepared = self.prepare(statement.query)
+				for row in params:
+					self.session.execute(prepared, row)
+				round_trips += len(params)
+				continue
+			rows = iter(params)
+			chunk = list(islice(rows, batch_size))
+			while chunk:
+				prepared = self.prepare(batch_query(statement.query, len(chunk)))
+				self.session.execute(prepared, tuple(p for row in chunk for p in row))
+				round_trips += 1
+				chunk = list(islice(rows, batch_size))
+		return round_trips
+
+
+__all__ = ['Writer', 'InsertStatement', 'insert_statement', 'primary_key', 'table_name']
@@ -0,0 +1,124 @@
+"""
+Free lists of Object instances which are reset and reused instead of being
+allocated for every short-lived object.
+
+pool = Event.pool(256)
+with pool.borrow(name='click') as event:
+	handle(event)
+
+event = pool.acquire(name='click')
+...
+event.release()
+
+A released instance must not be used again.  With debug=True releasing an
+instance twice, releasing an instance of another class or reading and writing
+the attributes of a released instance raise an error.
+"""
+from contextlib import contextmanager
+
+from .base import CACHE_ATTRIBUTES
+
+
+class ReleasedFields(dict):
+	"""
+	Placeholder for the attribute storage of an instance released to a pool in
+	debug mode
+	"""
+	def _released(self, *args, **kwargs):
+		raise ReferenceError('instance was released to its pool')
+
+	__getitem__ = __setitem__ = __delitem__ = get = iteritems = _released
+	__iter__ = __contains__ = __len__ = _released
+
+RELEASED = ReleasedFields()
+
+
+class ObjectPool(object):
+	"""
+	Free list of at most size released instances of model
+	"""
+	def __init__(self, model, size, debug=False):
+		if size < 1:
+			raise ValueError('size must be at least 1')
+		self.model = model
+		self.size = size
+		self.debug = debug
+		self.descriptors = [getattr(model, name) for name in model.field_names]
+		# (instance, attribute storage) pairs
+		self.free = []
+		self.released = set()
+
+	def acquire(self, **kwargs):
+		"""
+		Return a released instance or a new one with attributes set from kwargs
+		like the constructor
+		"""
+		if not self.free:
+			return self.model(**kwargs)
+		obj, fields = self.free.pop()
+		obj._fields = fields
+		if self.debug:
+			self.released.discard(id(obj))
+		field_names = self.model.field_names
+		for key, value in kwargs.iteritems():
+			if key in field_names:
+				setattr(obj, key, value)
+		return obj
+
+	def release(self, obj):
+		"""
+		Reset the attributes of obj to their initial values and keep it for reuse
+		"""
+		if self.debug:
+			self._check_release(obj)
+		fields = obj._fields
+		for descriptor in self.descriptors:
+			name = descriptor.name
+			fields[name] = descriptor.reset_value(obj, fields[name])
+		for attr in CACHE_ATTRIBUTES:
+			if getattr(obj, attr) is not None:
+				setattr(obj, attr, None)
+		if len(self.free) < self.size:
+			if self.debug:
+				obj._fields = RELEASED
+				self.released.add(id(obj))
+			self.free.append((obj, fields))
+
+	def _check_release(self, obj):
+		if type(obj) is not self.model:
+			raise TypeError('{!r} is not a {}'.format(obj, self.model.__name__))
+		if id(obj) in self.released:
+			raise ValueError('{!r} was already released'.format(obj))
+		if obj._frozen:
+			raise TypeError('frozen instances can not be released')
+		if obj._parents:
+			raise ValueError('{!r} is nested in a cached Object'.format(obj))
+
+	@contextmanager
+	def borrow(self, **kwargs):
+		"""
+		Context manager which acquires an instance and releases it on exit
+		"""
+		obj = self.acquire(**kwargs)
+		try:
+			yield obj
+		finally:
+			self.release(obj)
+
+	def resize(self, size):
+		if size < 1:
+			raise ValueError('size must be at least 1')
+		for obj, _ in self.free[size:]:
+			self.released.discard(id(obj))
+		del self.free[size:]
+		self.size = size
+
+	def clear(self):
+		del self.free[:]
+		self.released.clear()
+
+	def __len__(self):
+		return len(self.free)
+
+
+__all__ = ['ObjectPool']
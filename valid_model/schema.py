@@ -0,0 +1,300 @@
+"""
+Compile the Cassandra layout of an Object model.
+
+The layout of a model is computed once from its descriptors and cached on the
+class.  It holds the CQL type of every column along with functions which
+encode attribute values into statement parameters and decode values read back
+from Cassandra, so rows can be converted without inspecting the type of each
+value.  Nested EmbeddedObject classes become user defined types.
+
+Models configure their layout with class attributes:
+
+__cassandra_table__: name of the table, defaults to the lowercase class name
+__cassandra_type__: name of the user defined type when the model is embedded,
+                    defaults to the lowercase class name
+__cassandra_partition__: tuple of the partition key columns and the clustering
+                         columns, defaults to the non-nullable fields as the
+                         partition key
+__cassandra_order__: CLUSTERING ORDER BY clause
+__cassandra_options__: list of table options
+__cassandra_frozen__: names of collection columns which are frozen
+
+layout(BlogPost).ddl()
+"""
+from datetime import timedelta
+
+from .descriptors import (
+	String, Integer, Float, Bool, DateTime, TimeDelta, Choice, List, Set, Dict,
+	EmbeddedObject
+)
+
+# checked in order so that subclasses of these descriptors are mapped too
+SCALAR_TYPES = (
+	(Bool, 'boolean'),
+	(Integer, 'int'),
+	(Float, 'float'),
+	(String, 'text'),
+	(DateTime, 'timestamp'),
+	(TimeDelta, 'bigint'),
+	(Choice, 'text'),
+)
+
+
+def table_name(model):
+	tablename = getattr(model, '__cassandra_table__', model.__name__.lower())
+	if not tablename:
+		raise ValueError('__cassandra_table__ must be defined with a non-empty string')
+	return tablename
+
+def primary_key(model):
+	"""
+	Return the partition key columns and the clustering columns of a model.
+	Without __cassandra_partition__ the non-nullable fields are the partition
+	key.
+	"""
+	partition = getattr(model, '__cassandra_partition__', None)
+	if partition:
+		clustering = partition[1] if len(partition) > 1 else ()
+		return tuple(partition[0]), tuple(clustering)
+	return tuple(sorted(
+		field for field in model.field_names if not getattr(model, field).nullable
+	)), ()
+
+
+def _encode_timedelta(value):
+	return (value.days * 86400 + value.seconds) * 1000000 + value.microseconds
+
+def _decode_timedelta(value):
+	return timedelta(microseconds=value)
+
+def _nullable(func):
+	"""
+	Wrap a codec so that None passes through it unchanged
+	"""
+	if func is None:
+		return None
+	def nullable(value):
+		return None if value is None else func(value)
+	return nullable
+
+def _collection(container, encode_item):
+	"""
+	Codec for a list or set.  Cassandra returns None for empty collections.
+	"""
+	if encode_item is None:
+		return lambda value: container() if value is None else container(value)
+	return lambda value: container() if value is None else container(
+		encode_item(v) for v in value
+	)
+
+def _mapping(encode_key, encode_value):
+	encode_key = encode_key or (lambda k: k)
+	encode_value = encode_value or (lambda v: v)
+	return lambda value: {} if value is None else dict(
+		(encode_key(k), encode_value(v)) for k, v in value.iteritems()
+	)
+
+def compile_type(descriptor, frozen=False):
+	"""
+	Return the CQL type of a descriptor along with functions which encode an
+	attribute value for Cassandra and decode a value read from Cassandra.  A
+	codec of None means values are passed through unchanged.  The type is None
+	when the descriptor has no CQL equivalent.  Collections nested in other
+	collections are frozen.
+	"""
+	if descriptor is None:
+		return 'text', None, None
+	if isinstance(descriptor, EmbeddedObject):
+		nested = layout(descriptor.class_obj)
+		return (
+			'frozen<{}>'.format(nested.type_name),
+			_nullable(nested.encode_udt), _nullable(nested.decode_udt)
+		)
+	if isinstance(descriptor, (List, Set)):
+		kind, container = ('list', list) if isinstance(descriptor, List) else ('set', set)
+		value_type, encode, decode = compile_type(descriptor.value, frozen=True)
+		cql_type = '{}<{}>'.format(kind, value_type)
+		encode, decode = _collection(container, encode), _collection(container, decode)
+	elif isinstance(descriptor, Dict):
+		key_type, encode_key, decode_key = compile_type(descriptor.key, frozen=True)
+		value_type, encode_value, decode_value = compile_type(descriptor.value, frozen=True)
+		cql_type = 'map<{},{}>'.format(key_type, value_type)
+		encode = _mapping(encode_key, encode_value)
+		decode = _mapping(decode_key, decode_value)
+	else:
+		for desc_class, cql_type in SCALAR_TYPES:
+			if isinstance(descriptor, desc_class):
+				break
+		else:
+			return None, None, None
+		if desc_class is TimeDelta:
+			return cql_type, _nullable(_encode_timedelta), _nullable(_decode_timedelta)
+		return cql_type, None, None
+	return ('frozen<{}>'.format(cql_type) if frozen else cql_type), encode, decode
+
+
+class Column(object):
+	def __init__(self, name, cql_type, encode, decode):
+		self.name = name
+		self.cql_type = cql_type
+		self.encode = encode
+		self.decode = decode
+
+
+class Layout(object):
+	"""
+	Columns of a model ordered by name with their CQL types and codecs
+	"""
+	def __init__(self, model):
+		self.model = model
+		self.type_name = getattr(model, '__cassandra_type__', model.__name__.lower())
+		self.columns = []
+		self.by_name = {}
+		self._ddl = None
+
+	def compile(self):
+		frozen = set(getattr(self.model, '__cassandra_frozen__', ()))
+		for name in sorted(self.model.field_names):
+			cql_type, encode, decode = compile_type(getattr(self.model, name), name in frozen)
+			column = Column(name, cql_type, encode, decode)
+			self.columns.append(column)
+			self.by_name[name] = column
+		self.names = tuple(column.name for column in self.columns)
+
+	def encode(self, obj, names=None):
+		"""
+		Return the encoded values of obj for the names columns, which default to
+		all columns
+		"""
+		fields = obj._fields
+		columns = self.columns if names is None else [self.by_name[n] for n in names]
+		return tuple(
+			fields[c.name] if c.encode is None else c.encode(fields[c.name])
+			for c in columns
+		)
+
+	def encode_udt(self, obj):
+		return dict(zip(self.names, self.encode(obj)))
+
+	def decode_values(self, values, names=None):
+		"""
+		Return a dict of attribute values decoded from values read from the names
+		columns, which default to all columns
+		"""
+		columns = self.columns if names is None else [self.by_name[n] for n in names]
+		return dict(
+			(c.name, v if c.decode is None else c.decode(v))
+			for c, v in zip(columns, values)
+		)
+
+	def decode(self, row, names=None, validate=True):
+		"""
+		Build an instance of the model from a row of values read from the names
+		columns, which default to all columns.  See Object.from_row for validate.
+		"""
+		if names is None:
+			names, columns = self.names, self.columns
+		else:
+			columns = [self.by_name[n] for n in names]
+		return self.model.from_row([
+			v if c.decode is None else c.decode(v) for c, v in zip(columns, row)
+		], names, validate)
+
+	def decode_udt(self, value):
+		"""
+		Build an instance of the model from a user defined type value which is a
+		dict or has an attribute for each field
+		"""
+		if isinstance(value, dict):
+			values = [value.get(name) for name in self.names]
+		else:
+			values = [getattr(value, name, None) for name in self.names]
+		return self.decode(values)
+
+	def udts(self):
+		"""
+		Return the layouts of every model embedded in this one, directly or not,
+		ordered so that each type is declared after the types it uses
+		"""
+		ordered = []
+		def visit(model_layout, seen):
+			for column in model_layout.columns:
+				for nested in _embedded(getattr(model_layout.model, column.name)):
+					nested_layout = layout(nested)
+					if nested_layout not in seen:
+						seen.add(nested_layout)
+						visit(nested_layout, seen)
+						ordered.append(nested_layout)
+		visit(self, set([self]))
+		return ordered
+
+	def _check_types(self):
+		missing = [column.name for column in self.columns if column.cql_type is None]
+		if missing:
+			raise TypeError('{} have no CQL type'.format(', '.join(missing)))
+
+	def type_ddl(self):
+		self._check_types()
+		ddl = "CREATE TYPE {} (".format(self.type_name)
+		ddl += ",".join(
+			"\n\t{} {}".format(column.name, column.cql_type) for column in self.columns
+		)
+		return ddl + "\n)"
+
+	def table_ddl(self):
+		self._check_types()
+		model = self.model
+		partition, clustering = primary_key(model)
+		if not partition:
+			raise ValueError('__cassandra_partition__ must be defined as a tuple of 2 tuples')
+		ddl = "CREATE TABLE {} (".format(table_name(model))
+		for column in self.columns:
+			ddl += "\n\t{} {},".format(column.name, column.cql_type)
+		ddl += "\n\tPRIMARY KEY (({})".format(','.join(partition))
+		if clustering:
+			ddl += ", {}".format(','.join(clustering))
+		ddl += ")\n)"
+		options = []
+		ordering = getattr(model, '__cassandra_order__', None)
+		if ordering:
+			options.append("CLUSTERING ORDER BY ({})".format(ordering))
+		options.extend(getattr(model, '__cassandra_options__', None) or [])
+		if options:
+			ddl += " WITH {}".format("\nAND ".join(options))
+		return ddl
+
+	def ddl(self):
+		"""
+		Statements which create the user defined types used by the model followed
+		by its table
+		"""
+		if self._ddl is None:
+			self._ddl = [nested.type_ddl() for nested in self.udts()] + [self.table_ddl()]
+		return list(self._ddl)
+
+
+def _embedded(descriptor):
+	"""
+	Yield the classes of the EmbeddedObject descriptors in a descriptor
+	"""
+	if isinstance(descriptor, EmbeddedObject):
+		yield descriptor.class_obj
+	for nested in (getattr(descriptor, 'key', None), getattr(descriptor, 'value', None)):
+		if nested is not None:
+			for class_obj in _embedded(nested):
+				yield class_obj
+
+def layout(model):
+	"""
+	Return the cached Layout of a model
+	"""
+	model_layout = vars(model).get('_cassandra_layout')
+	if model_layout is None:
+		model_layout = Layout(model)
+		# cached before compiling so that self referencing models terminate
+		setattr(model, '_cassandra_layout', model_layout)
+		model_layout.compile()
+	return model_layout
+
+
+__all__ = ['layout', 'compile_type', 'table_name', 'primary_key']
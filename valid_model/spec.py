@@ -0,0 +1,176 @@
+"""
+Build Object subclasses from specification dicts such as those stored per
+tenant in a database.
+
+Person = from_spec('Person', {
+	'name': {'type': 'string', 'required': True},
+	'age': {'type': 'integer', 'default': '0'},
+	'tags': {'type': 'list', 'value': {'type': 'string'}},
+	'scores': {'type': 'map', 'key': {'type': 'string'}, 'value': {'type': 'float'}},
+	'address': {'type': 'object', 'name': 'Address', 'fields': {
+		'city': {'type': 'string'},
+	}},
+})
+
+Each field spec has a type and optionally a default, required to make the
+field non-nullable, value and key specs for the elements of list, set and map
+fields, parse for datetime and timedelta fields which accept ISO-8601 strings
+and numbers and the name and fields of an object field.  Defaults given as
+strings are parsed without evaluating them.
+
+Classes are cached by the content of their name and spec so the same class is
+returned for identical specs.  The most recently used SPEC_CACHE_SIZE classes
+are kept alive, older classes are only reused while something else still
+references them.
+"""
+from datetime import datetime, timedelta
+import weakref
+
+from .base import Object, ObjectMeta
+from .descriptors import (
+	String, Integer, Float, Bool, DateTime, TimeDelta, List, Set, Dict, EmbeddedObject
+)
+from .utils import LRUCache, parse_datetime, parse_timedelta
+
+SPEC_CACHE_SIZE = 256
+
+SPEC_TYPES = {
+	'string': String,
+	'integer': Integer,
+	'float': Float,
+	'boolean': Bool,
+	'datetime': DateTime,
+	'timedelta': TimeDelta,
+	'list': List,
+	'set': Set,
+	'map': Dict,
+	'object': EmbeddedObject,
+}
+
+
+def _parse_bool(value):
+	if isinstance(value, basestring):
+		lowered = value.strip().lower()
+		if lowered in ('true', '1'):
+			return True
+		elif lowered in ('false', '0'):
+			return False
+		raise ValueError('{!r} is not a boolean'.format(value))
+	return bool(value)
+
+def _parse_datetime(value):
+	if isinstance(value, datetime):
+		return value
+	return parse_datetime(value)
+
+def _parse_timedelta(value):
+	if isinstance(value, timedelta):
+		return value
+	return parse_timedelta(value)
+
+DEFAULT_PARSERS = {
+	'string': unicode,
+	'integer': int,
+	'float': float,
+	'boolean': _parse_bool,
+	'datetime': _parse_datetime,
+	'timedelta': _parse_timedelta,
+	'list': list,
+	'set': set,
+	'map': dict,
+}
+
+
+def descriptor_from_spec(spec):
+	"""
+	Create the descriptor of a single field spec
+	"""
+	spec_type = spec.get('type')
+	if spec_type not in SPEC_TYPES:
+		raise ValueError('{!r} is not a valid field type'.format(spec_type))
+	if spec_type == 'object':
+		return EmbeddedObject(from_spec(spec['name'], spec['fields']))
+
+	kwargs = {}
+	if spec.get('default') is not None:
+		try:
+			kwargs['default'] = DEFAULT_PARSERS[spec_type](spec['default'])
+		except (TypeError, ValueError) as ex:
+			raise ValueError('invalid default {!r}: {}'.format(spec['default'], ex))
+	if spec_type in ('list', 'set', 'map'):
+		if spec.get('value') is not None:
+			kwargs['value'] = descriptor_from_spec(spec['value'])
+		if spec_type == 'map' and spec.get('key') is not None:
+			kwargs['key'] = descriptor_from_spec(spec['key'])
+	elif spec.get('required'):
+		kwargs['nullable'] = False
+	if spec_type in ('datetime', 'timedelta') and spec.get('parse'):
+		kwargs['parse'] = spec['parse']
+	return SPEC_TYPES[spec_type](**kwargs)
+
+def _canonical(value):
+	if isinstance(value, dict):
+		return frozenset((k, _canonical(v)) for k, v in value.iteritems())
+	elif isinstance(value, (list, tuple)):
+		return tuple(_canonical(v) for v in value)
+	elif isinstance(value, (set, frozenset)):
+		return frozenset(_canonical(v) for v in value)
+	elif isinstance(value, basestring):
+		return value
+	# 1, 1.0 and True are equal but are not the same default
+	return value.__class__, value
+
+def spec_key(name, spec):
+	"""
+	Hashable key which is equal for class names and specs with the same content
+	"""
+	return name, _canonical(spec)
+
+
+class SpecCache(object):
+	"""
+	Classes built from specs by spec_key.  The size most recently used classes
+	are held by the cache, the rest are held weakly.
+	"""
+	def __init__(self, size):
+		self.recent = LRUCache(size)
+		self.alive = weakref.WeakValueDictionary()
+
+	def get(self, key):
+		klass = self.recent.get(key)
+		if klass is None:
+			klass = self.alive.get(key)
+			if klass is not None:
+				self.recent[key] = klass
+		return klass
+
+	def __setitem__(self, key, klass):
+		self.recent[key] = klass
+		self.alive[key] = klass
+
+	def clear(self):
+		self.recent.clear()
+		self.alive.clear()
+
+	def __len__(self):
+		return len(self.alive)
+
+CACHE = SpecCache(SPEC_CACHE_SIZE)
+
+
+def from_spec(name, spec):
+	"""
+	Return an Object subclass named name with a field for each item of spec
+	"""
+	key = spec_key(name, spec)
+	klass = CACHE.get(key)
+	if klass is None:
+		attrs = dict(
+			(field, descriptor_from_spec(field_spec))
+			for field, field_spec in spec.iteritems()
+		)
+		klass = CACHE[key] = ObjectMeta(str(name), (Object,), attrs)
+	return klass
+
+
+__all__ = ['from_spec', 'descriptor_from_spec']
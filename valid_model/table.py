@@ -0,0 +1,464 @@
+"""
+ModelTable stores a homogeneous collection of Object instances column by
+column instead of as a list of full instances.
+
+Scalar fields (Integer, Float, Bool, DateTime and String) are stored in typed
+columns which may optionally be backed by mmap files in a directory.  Every
+other field is kept in a plain list column.  Values are validated with the
+model's descriptors when a row is appended, and rows are returned as
+lightweight views which read and write the underlying columns.
+
+table = ModelTable(Person, path='/tmp/people')
+table.append({'name': 'Josh', 'age': 30})
+table.append(Person(name='Bob', age=12))
+adults = list(table.filter(age=gte(18)))
+"""
+import array
+from collections import MutableMapping
+import mmap
+import os
+import struct
+from datetime import datetime, timedelta
+
+from .base import Object
+from .descriptors import String, Integer, Float, Bool, DateTime
+from .exc import ValidationError
+
+EPOCH = datetime(1970, 1, 1)
+# 64 bit integers, which struct always supports but array.array only does as
+# 'l' on platforms with a 64 bit long
+INT64 = 'q'
+ARRAY_INT64 = 'l' if array.array('l').itemsize == 8 else None
+# items allocated the first time an mmap file is created
+INITIAL_CAPACITY = 1024
+# items decoded at a time when scanning an mmap column
+SCAN_CHUNK = 65536
+
+
+class ListStorage(list):
+	"""
+	In-memory storage for values which have no fixed width representation
+	"""
+	def close(self):
+		pass
+
+
+class ArrayStorage(array.array):
+	"""
+	In-memory storage of fixed width values
+	"""
+	def close(self):
+		pass
+
+
+class MmapFile(object):
+	"""
+	A file mapped into memory which grows as data is written past its end
+	"""
+	def __init__(self, path):
+		self.path = path
+		self.file = open(path, 'w+b')
+		self.file.truncate(INITIAL_CAPACITY)
+		self.mmap = mmap.mmap(self.file.fileno(), INITIAL_CAPACITY)
+
+	def reserve(self, size):
+		capacity = len(self.mmap)
+		if size > capacity:
+			while capacity < size:
+				capacity *= 2
+			self.mmap.resize(capacity)
+
+	def close(self):
+		if not self.file.closed:
+			self.mmap.close()
+			self.file.close()
+
+
+class MmapStorage(object):
+	"""
+	Storage of fixed width values in an mmap file
+	"""
+	def __init__(self, path, typecode):
+		self.typecode = typecode
+		self.struct = struct.Struct(typecode)
+		self.file = MmapFile(path)
+		self.length = 0
+
+	def append(self, value):
+		size = self.struct.size
+		self.file.reserve((self.length + 1) * size)
+		self.struct.pack_into(self.file.mmap, self.length * size, value)
+		self.length += 1
+
+	def __getitem__(self, idx):
+		return self.struct.unpack_from(self.file.mmap, idx * self.struct.size)[0]
+
+	def __setitem__(self, idx, value):
+		self.struct.pack_into(self.file.mmap, idx * self.struct.size, value)
+
+	def __len__(self):
+		return self.length
+
+	def __iter__(self):
+		size = self.struct.size
+		for start in xrange(0, self.length, SCAN_CHUNK):
+			stop = min(start + SCAN_CHUNK, self.length)
+			chunk = struct.unpack(
+				'{}{}'.format(stop - start, self.typecode), self.file.mmap[start * size:stop * size]
+			)
+			for value in chunk:
+				yield value
+
+	def close(self):
+		self.file.close()
+
+
+class MmapStringStorage(object):
+	"""
+	Storage of unicode strings as utf-8 in an mmap file.  Overwritten values are
+	appended to the data file and the space used by the old value is not
+	reclaimed.
+	"""
+	def __init__(self, path):
+		self.starts = MmapStorage(path + '.start', INT64)
+		self.ends = MmapStorage(path + '.end', INT64)
+		self.data = MmapFile(path + '.data')
+		self.size = 0
+
+	def _write(self, value):
+		encoded = value.encode('utf-8')
+		start = self.size
+		self.size += len(encoded)
+		self.data.reserve(self.size)
+		self.data.mmap[start:self.size] = encoded
+		return start, self.size
+
+	def append(self, value):
+		start, end = self._write(value)
+		self.starts.append(start)
+		self.ends.append(end)
+
+	def __getitem__(self, idx):
+		return unicode(self.data.mmap[self.starts[idx]:self.ends[idx]], 'utf-8')
+
+	def __setitem__(self, idx, value):
+		self.starts[idx], self.ends[idx] = self._write(value)
+
+	def __len__(self):
+		return len(self.starts)
+
+	def __iter__(self):
+		data = self.data.mmap
+		for start, end in zip(self.starts, self.ends):
+			yield unicode(data[start:end], 'utf-8')
+
+	def close(self):
+		self.starts.close()
+		self.ends.close()
+		self.data.close()
+
+
+class Column(object):
+	"""
+	A column of values for a single field.  None is tracked separately from the
+	storage so that fixed width storage can hold nullable fields.
+
+	encode: converts a validated value into the value held by storage
+	decode: converts a value held by storage back into the field's value
+	"""
+	def __init__(self, storage, encode=None, decode=None):
+		self.storage = storage
+		self.nulls = set()
+		self.encode = encode
+		self.decode = decode
+
+	def append(self, value):
+		"""
+		Append an already encoded value
+		"""
+		if value is None:
+			self.nulls.add(len(self.storage))
+			value = self.empty()
+		self.storage.append(value)
+
+	def empty(self):
+		if isinstance(self.storage, ListStorage):
+			return None
+		elif isinstance(self.storage, MmapStringStorage):
+			return u''
+		return 0
+
+	def __getitem__(self, idx):
+		if idx in self.nulls:
+			return None
+		value = self.storage[idx]
+		return value if self.decode is None else self.decode(value)
+
+	def __setitem__(self, idx, value):
+		if value is None:
+			self.nulls.add(idx)
+			value = self.empty()
+		else:
+			self.nulls.discard(idx)
+		self.storage[idx] = value
+
+	def __len__(self):
+		return len(self.storage)
+
+	def __iter__(self):
+		decode = self.decode
+		if not self.nulls and decode is None:
+			return iter(self.storage)
+		return self._iter_slow()
+
+	def _iter_slow(self):
+		nulls = self.nulls
+		decode = self.decode
+		for idx, value in enumerate(self.storage):
+			if idx in nulls:
+				yield None
+			elif decode is None:
+				yield value
+			else:
+				yield decode(value)
+
+	def close(self):
+		self.storage.close()
+
+
+def _int_range(typecode):
+	bits = struct.calcsize(typecode) * 8
+	return -(1 << (bits - 1)), (1 << (bits - 1)) - 1
+
+def _check_range(typecode):
+	low, high = _int_range(typecode)
+	def encode(value):
+		if not low <= value <= high:
+			raise ValidationError('{!r} is out of range'.format(value))
+		return value
+	return encode
+
+def _encode_datetime(value):
+	if value.tzinfo is not None:
+		value = value.replace(tzinfo=None) - value.utcoffset()
+	delta = value - EPOCH
+	return (delta.days * 86400 + delta.seconds) * 1000000 + delta.microseconds
+
+def _decode_datetime(value):
+	return EPOCH + timedelta(microseconds=value)
+
+
+class _ColumnField(object):
+	"""
+	Descriptor used by row views to read and write a single column
+	"""
+	def __init__(self, table, descriptor):
+		self.table = table
+		self.descriptor = descriptor
+		self.name = descriptor.name
+
+	def __get__(self, row, klass=None):
+		if row is None:
+			return self.descriptor
+		return self.table.columns[self.name][row._index]
+
+	def __set__(self, row, value):
+		self.table.set_value(row._index, self.name, value)
+
+	def __delete__(self, row):
+		self.table.set_value(row._index, self.name, None)
+
+
+class _RowFields(MutableMapping):
+	"""
+	Field values of a row view, which read and write the table columns so that
+	code writing through the _fields of an instance updates the table
+	"""
+	def __init__(self, table, index):
+		self.table = table
+		self.index = index
+
+	def __getitem__(self, name):
+		return self.table.columns[name][self.index]
+
+	def __setitem__(self, name, value):
+		if name not in self.table.columns:
+			raise KeyError(name)
+		self.table.set_value(self.index, name, value)
+
+	def __delitem__(self, name):
+		raise TypeError('fields of a table row can not be removed')
+
+	def __iter__(self):
+		return iter(self.table.columns)
+
+	def __len__(self):
+		return len(self.table.columns)
+
+
+class ModelTable(object):
+	"""
+	Columnar container for instances of a single Object subclass.
+
+	model: the Object subclass which rows are validated against
+	path: optional directory in which the scalar columns will be stored as
+	      mmap files.  The files are scratch storage and are truncated when the
+	      table is created.
+	"""
+	def __init__(self, model, path=None):
+		if not isinstance(model, type) or not issubclass(model, Object):
+			raise TypeError('model must be a subclass of Object')
+		self.model = model
+		self.path = path
+		self.length = 0
+		self.columns = {}
+		self.descriptors = {}
+		self.scratch = Object()
+		for name in model.field_names:
+			descriptor = getattr(model, name)
+			self.descriptors[name] = descriptor
+			self.columns[name] = self._make_column(name, descriptor)
+		self.row_class = self._make_row_class()
+
+	def _storage(self, name, typecode):
+		if self.path is None:
+			if typecode == INT64:
+				if ARRAY_INT64 is None:
+					return ListStorage()
+				typecode = ARRAY_INT64
+			return ArrayStorage(typecode)
+		return MmapStorage(os.path.join(self.path, '{}.col'.format(name)), typecode)
+
+	def _make_column(self, name, descriptor):
+		if isinstance(descriptor, Bool):
+			return Column(self._storage(name, 'b'), int, bool)
+		elif isinstance(descriptor, Integer):
+			return Column(self._storage(name, INT64), _check_range(INT64))
+		elif isinstance(descriptor, Float):
+			return Column(self._storage(name, 'd'))
+		elif isinstance(descriptor, DateTime):
+			return Column(self._storage(name, INT64), _encode_datetime, _decode_datetime)
+		elif isinstance(descriptor, String) and self.path is not None:
+			return Column(MmapStringStorage(os.path.join(self.path, name)))
+		return Column(ListStorage())
+
+	def _make_row_class(self):
+		attrs = {'__slots__': ('_index',)}
+		row_class = type(self.model)(self.model.__name__ + 'Row', (self.model,), attrs)
+		for name, descriptor in self.descriptors.iteritems():
+			setattr(row_class, name, _ColumnField(self, descriptor))
+		row_class.field_names = self.model.field_names
+		row_class._fields = property(lambda row: _RowFields(self, row._index))
+		return row_class
+
+	def _encode(self, name, value, validate=True):
+		"""
+		Validate a value with the field's descriptor and encode it for storage
+		"""
+		if validate:
+			value = self.descriptors[name].__set__(self.scratch, value)
+		encode = self.columns[name].encode
+		if value is None or encode is None:
+			return value
+		try:
+			return encode(value)
+		except ValidationError as ex:
+			raise ValidationError(ex.msg, name)
+
+	def append(self, obj):
+		"""
+		Append an instance of the model or a dict of field values.  Instances
+		have already been validated, dicts are validated field by field with
+		the model's descriptors, missing fields are set to their default and
+		unknown keys are ignored.  Nothing is appended if any field fails
+		validation.
+		"""
+		validate = not isinstance(obj, self.model)
+		if not validate:
+			values = [(name, obj._fields[name]) for name in self.columns]
+		elif isinstance(obj, dict):
+			values = [
+				(name, obj[name] if name in obj else descriptor.get_default())
+				for name, descriptor in self.descriptors.iteritems()
+			]
+		else:
+			raise TypeError('{!r} is not a {} or dict'.format(obj, self.model.__name__))
+		encoded = [(name, self._encode(name, value, validate)) for name, value in values]
+		for name, value in encoded:
+			self.columns[name].append(value)
+		self.length += 1
+
+	def extend(self, objs):
+		for obj in objs:
+			self.append(obj)
+
+	def set_value(self, idx, name, value):
+		"""
+		Validate and store the value of a single field of a row
+		"""
+		self.columns[name][idx] = self._encode(name, value)
+
+	def values(self, name):
+		"""
+		Iterate over all values of a field
+		"""
+		return iter(self.columns[name])
+
+	def where(self, **predicates):
+		"""
+		Return the indexes of the rows where every predicate returns truthy for
+		the value of its field.  Any validator from valid_model.validators can be
+		used as a predicate, None values never match.
+
+		table.where(age=gte(18), country=is_in(['US', 'CA']))
+		"""
+		indexes = None
+		for name, predicate in predicates.iteritems():
+			column = self.columns[name]
+			if indexes is None:
+				indexes = [
+					idx for idx, value in enumerate(column)
+					if value is not None and predicate(value)
+				]
+			else:
+				indexes = [
+					idx for idx, value in ((i, column[i]) for i in indexes)
+					if value is not None and predicate(value)
+				]
+		return range(self.length) if indexes is None else indexes
+
+	def filter(self, **predicates):
+		"""
+		Iterate over the rows which match all of the predicates, see where()
+		"""
+		for idx in self.where(**predicates):
+			yield self[idx]
+
+	def __getitem__(self, idx):
+		if idx < 0:
+			idx += self.length
+		if not 0 <= idx < self.length:
+			raise IndexError('table index out of range')
+		row = self.row_class.__new__(self.row_class)
+		row._index = idx
+		return row
+
+	def __iter__(self):
+		for idx in xrange(self.length):
+			yield self[idx]
+
+	def __len__(self):
+		return self.length
+
+	def close(self):
+		for column in self.columns.itervalues():
+			column.close()
+
+	def __enter__(self):
+		return self
+
+	def __exit__(self, exc_type, exc_value, tb):
+		self.close()
+
+
+__all__ = ['ModelTable']
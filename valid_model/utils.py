@@ -1,3 +1,8 @@
+from datetime import date, datetime, timedelta
+from random import Random
+import re
+import threading
+
 def is_descriptor(obj):
 	return all((
 		hasattr(obj, 'name'),
@@ -5,3 +10,351 @@ def is_descriptor(obj):
 		hasattr(obj, '__get__'),
 		hasattr(obj, '__set__')
 	))
+
+class LRUCache(object):
+	"""
+	Bounded mapping which discards the least recently used key once it holds
+	more than size keys.  Lookups keep count of hits and misses.  A lock
+	guards the linked list so one cache can be shared between threads.
+	"""
+	def __init__(self, size):
+		if size < 1:
+			raise ValueError('size must be a positive number')
+		self.size = size
+		self.hits = 0
+		self.misses = 0
+		self.lock = threading.Lock()
+		self.clear()
+
+	def clear(self):
+		with self.lock:
+			self.data = {}
+			# sentinel of a circular doubly linked list of [prev, next, key, value]
+			# ordered from least to most recently used
+			self.root = root = []
+			root[:] = [root, root, None, None]
+
+	def _move_to_end(self, link):
+		prev, next_ = link[0], link[1]
+		prev[1] = next_
+		next_[0] = prev
+		root = self.root
+		last = root[0]
+		last[1] = root[0] = link
+		link[0] = last
+		link[1] = root
+
+	def get(self, key, default=None):
+		with self.lock:
+			link = self.data.get(key)
+			if link is None:
+				self.misses += 1
+				return default
+			self.hits += 1
+			self._move_to_end(link)
+			return link[3]
+
+	def __getitem__(self, key):
+		with self.lock:
+			link = self.data[key]
+			self._move_to_end(link)
+			return link[3]
+
+	def _set(self, key, value):
+		link = self.data.get(key)
+		if link is not None:
+			link[3] = value
+			self._move_to_end(link)
+			return
+		root = self.root
+		last = root[0]
+		link = [last, root, key, value]
+		last[1] = root[0] = self.data[key] = link
+		if len(self.data) > self.size:
+			oldest = root[1]
+			root[1] = oldest[1]
+			oldest[1][0] = root
+			del self.data[oldest[2]]
+
+	def __setitem__(self, key, value):
+		with self.lock:
+			self._set(key, value)
+
+	def setdefault(self, key, default):
+		with self.lock:
+			link = self.data.get(key)
+			if link is None:
+				self.misses += 1
+				self._set(key, default)
+				return default
+			self.hits += 1
+			self._move_to_end(link)
+			return link[3]
+
+	def __contains__(self, key):
+		return key in self.data
+
+	def __len__(self):
+		return len(self.data)
+
+class FrozenDict(dict):
+	"""
+	Immutable and hashable dict
+	"""
+	_hash = None
+
+	def _immutable(self, *args, **kwargs):
+		raise TypeError('{} is immutable'.format(self.__class__.__name__))
+
+	__setitem__ = __delitem__ = _immutable
+	clear = pop = popitem = setdefault = update = _immutable
+
+	def __hash__(self):
+		if self._hash is None:
+			self._hash = hash(frozenset(self.iteritems()))
+		return self._hash
+
+	def __reduce__(self):
+		return (self.__class__, (dict(self),))
+
+	def __repr__(self):
+		return '{}({})'.format(self.__class__.__name__, dict.__repr__(self))
+
+def sample_indices(size, count, edges, seed):
+	"""
+	Sorted indices of the first and last edges elements of a sequence of size
+	elements and count others chosen at random with seed, or None if that
+	would not skip any element
+	"""
+	if count is None or size <= count + 2 * edges:
+		return None
+	middle = sorted(Random(seed).sample(xrange(edges, size - edges), count))
+	return range(edges) + middle + range(size - edges, size)
+
+EPOCH = datetime(1970, 1, 1)
+
+def _seconds(value):
+	if value.__class__ is bool or not isinstance(value, (int, long, float)):
+		raise ValueError('{!r} is not a number'.format(value))
+	try:
+		return timedelta(seconds=value)
+	except OverflowError:
+		raise ValueError('{!r} is out of range'.format(value))
+
+def _parse_offset(text):
+	"""
+	Offset of a UTC offset such as +02:00, -0530, +02 or Z
+	"""
+	if text in ('Z', 'z'):
+		return timedelta(0)
+	length = len(text)
+	if text[0] not in '+-' or length not in (3, 5, 6) or (length == 6 and text[3] != ':'):
+		raise ValueError('{!r} is not a UTC offset'.format(text))
+	digits = text[1:3] + text[-2:] if length > 3 else text[1:3] + '00'
+	if not digits.isdigit() or digits[:2] > '23' or digits[2:] > '59':
+		raise ValueError('{!r} is not a UTC offset'.format(text))
+	offset = timedelta(hours=int(digits[:2]), minutes=int(digits[2:]))
+	return -offset if text[0] == '-' else offset
+
+def parse_datetime(value):
+	"""
+	Parse an ISO-8601 date or date and time such as 2015-01-02T03:04:05.678+01:00,
+	in which seconds, fractions and the UTC offset are optional, or a number of
+	seconds since the epoch into a naive datetime.  Times with a UTC offset are
+	converted to UTC.  Raises a ValueError for anything else.
+	"""
+	if not isinstance(value, basestring):
+		try:
+			return EPOCH + _seconds(value)
+		except OverflowError:
+			raise ValueError('{!r} is out of range'.format(value))
+	length = len(value)
+	if length < 10 or value[4] != '-' or value[7] != '-':
+		raise ValueError('{!r} is not an ISO-8601 datetime'.format(value))
+	# one int of all the digits is much faster than an int for every part
+	digits = value[0:4] + value[5:7] + value[8:10]
+	microsecond = 0
+	end = 10
+	if length == 10:
+		digits += '000000'
+	elif length < 16 or value[10] not in 'T t' or value[13] != ':':
+		raise ValueError('{!r} is not an ISO-8601 datetime'.format(value))
+	elif length > 16 and value[16] == ':':
+		digits += value[11:13] + value[14:16] + value[17:19]
+		end = 19
+		if length > 20 and value[19] in '.,':
+			end = 20
+			while end < length and value[end].isdigit():
+				end += 1
+			microsecond = int(value[20:end][:6].ljust(6, '0'))
+	else:
+		digits += value[11:13] + value[14:16] + '00'
+		end = 16
+	if len(digits) != 14 or not digits.isdigit():
+		raise ValueError('{!r} is not an ISO-8601 datetime'.format(value))
+	rest, second = divmod(int(digits), 100)
+	rest, minute = divmod(rest, 100)
+	rest, hour = divmod(rest, 100)
+	rest, day = divmod(rest, 100)
+	year, month = divmod(rest, 100)
+	result = datetime(year, month, day, hour, minute, second, microsecond)
+	if end < length:
+		try:
+			result -= _parse_offset(value[end:])
+		except OverflowError:
+			raise ValueError('{!r} is out of range'.format(value))
+	return result
+
+_NUMBER = r'(\d+(?:[.,]\d+)?)'
+_DURATION = re.compile(r'([-+])?P(?:{0}W)?(?:{0}D)?(?:T(?:{0}H)?(?:{0}M)?(?:{0}S)?)?$'.format(_NUMBER))
+_DURATION_UNITS = ('weeks', 'days', 'hours', 'minutes', 'seconds')
+
+def parse_timedelta(value):
+	"""
+	Parse an ISO-8601 duration such as P1DT2H30M or -PT1.5S, in which years and
+	months are not allowed because their length varies, or a number of seconds
+	given as a number or string into a timedelta.  Raises a ValueError for
+	anything else.
+	"""
+	if not isinstance(value, basestring):
+		return _seconds(value)
+	match = _DURATION.match(value)
+	if match is None:
+		try:
+			return _seconds(float(value))
+		except ValueError:
+			raise ValueError('{!r} is not an ISO-8601 duration'.format(value))
+	sign, parts = match.group(1), match.groups()[1:]
+	if value.endswith('T') or all(part is None for part in parts):
+		raise ValueError('{!r} is not an ISO-8601 duration'.format(value))
+	try:
+		result = timedelta(**dict(
+			(unit, float(part.replace(',', '.')))
+			for unit, part in zip(_DURATION_UNITS, parts) if part is not None
+		))
+	except OverflowError:
+		raise ValueError('{!r} is out of range'.format(value))
+	return -result if sign == '-' else result
+
+def freeze(value):
+	"""
+	Return an immutable version of value.  Objects are frozen in place, lists
+	and tuples become tuples, sets become frozensets and dicts become
+	FrozenDicts with their contents frozen recursively.
+	"""
+	if hasattr(value, 'freeze'):
+		return value.freeze()
+	elif isinstance(value, (list, tuple)):
+		return tuple(freeze(v) for v in value)
+	elif isinstance(value, (set, frozenset)):
+		return frozenset(freeze(v) for v in value)
+	elif isinstance(value, dict) and not isinstance(value, FrozenDict):
+		return FrozenDict((k, freeze(v)) for k, v in value.iteritems())
+	return value
+
+def thaw(value):
+	"""
+	Return a mutable copy of a value returned by freeze with nested Objects
+	converted by __json__
+	"""
+	if hasattr(value, '__json__'):
+		return value.__json__()
+	elif isinstance(value, tuple):
+		return [thaw(v) for v in value]
+	elif isinstance(value, frozenset):
+		return set(thaw(v) for v in value)
+	elif isinstance(value, FrozenDict):
+		return dict((k, thaw(v)) for k, v in value.iteritems())
+	return value
+
+def _write_text(value, write):
+	if isinstance(value, unicode):
+		value = value.encode('utf-8')
+	write('s{}:{}'.format(len(value), value))
+
+def _write_datetime(value, write):
+	offset = value.utcoffset()
+	if offset is None:
+		write('d' + value.isoformat())
+	else:
+		# aware datetimes are normalized to UTC
+		write('D' + (value - offset).replace(tzinfo=None).isoformat())
+
+def _write_sequence(value, write):
+	write('[')
+	for item in value:
+		write_canonical(item, write)
+	write(']')
+
+def _encoded(value):
+	parts = []
+	write_canonical(value, parts.append)
+	return ''.join(parts)
+
+def _write_set(value, write):
+	write('{')
+	for item in sorted(_encoded(item) for item in value):
+		write(item)
+	write('}')
+
+def _write_dict(value, write):
+	write('(')
+	for item in sorted(_encoded(k) + _encoded(v) for k, v in value.iteritems()):
+		write(item)
+	write(')')
+
+def _write_canonical_method(value, write):
+	value._write_canonical(write)
+
+CANONICAL_ENCODERS = {
+	type(None): lambda value, write: write('N'),
+	bool: lambda value, write: write('T' if value else 'F'),
+	int: lambda value, write: write('i{};'.format(value)),
+	long: lambda value, write: write('i{};'.format(value)),
+	float: lambda value, write: write('f{!r};'.format(value)),
+	str: _write_text,
+	unicode: _write_text,
+	datetime: _write_datetime,
+	date: lambda value, write: write('a' + value.isoformat()),
+	timedelta: lambda value, write: write(
+		't{}/{}/{};'.format(value.days, value.seconds, value.microseconds)
+	),
+	list: _write_sequence,
+	tuple: _write_sequence,
+	set: _write_set,
+	frozenset: _write_set,
+	dict: _write_dict,
+}
+
+_CANONICAL_BASES = (
+	(bool, CANONICAL_ENCODERS[bool]),
+	((int, long), CANONICAL_ENCODERS[int]),
+	(float, CANONICAL_ENCODERS[float]),
+	(basestring, _write_text),
+	(datetime, _write_datetime),
+	(date, CANONICAL_ENCODERS[date]),
+	(timedelta, CANONICAL_ENCODERS[timedelta]),
+	((list, tuple), _write_sequence),
+	((set, frozenset), _write_set),
+	(dict, _write_dict),
+)
+
+def write_canonical(value, write):
+	"""
+	Pass a type tagged encoding of value to write which is the same for equal
+	values.  Sets and dicts are written in sorted order and aware datetimes in
+	UTC.  Objects are written by their _write_canonical method.
+	"""
+	encoder = CANONICAL_ENCODERS.get(value.__class__)
+	if encoder is None:
+		if hasattr(value, '_write_canonical'):
+			encoder = _write_canonical_method
+		else:
+			for types, base_encoder in _CANONICAL_BASES:
+				if isinstance(value, types):
+					encoder = base_encoder
+					break
+			else:
+				raise TypeError('{!r} has no canonical encoding'.format(value))
+		CANONICAL_ENCODERS[value.__class__] = encoder
+	encoder(value, write)
@@ -11,9 +11,23 @@ not_identity(None)
 # x >= 100 or x < 20
 any_of(gte(100), lt(20))
 
+# 20 <= x <= 100
+between(20, 100)
+
 # isinstance(x, dict) and (not x or x in ['a', 'b', 'c'])
 all_of(is_instance(dict), any_of(falsey, is_in(['a', 'b', 'c'])))
+
+# cache the results of an expensive pure validator or mutator
+memoize(any_of(gte(100), lt(20)), size=1000)
+
+# a validator which does I/O and is only run by Object.async_validate
+deferred(lambda x: user_service.exists(x), key=lambda x: ('user', x))
 """
+from bisect import bisect_left
+from .utils import LRUCache
+
+_missing = object()
+
 def truthy(value):
 	return bool(value)
 
@@ -53,11 +67,75 @@ def contains(value):
 def not_contains(value):
 	return lambda x: value not in x
 
+def _membership(value):
+	"""
+	Build a function which tests if its argument is in the container value.
+	The container is copied into a frozenset when its elements are hashable,
+	into a sorted list searched with bisect when they are unhashable but of a
+	single, totally ordered type such as lists of numbers and into a tuple
+	searched linearly otherwise.  xrange is
+	checked arithmetically and strings, sets and dicts are used as they are.
+	"""
+	if isinstance(value, (basestring, set, frozenset, dict)):
+		container = value
+	elif isinstance(value, xrange):
+		return _range_membership(value)
+	else:
+		value = tuple(value)
+		try:
+			container = frozenset(value)
+		except TypeError:
+			return _sorted_membership(value)
+
+	def contains(x):
+		try:
+			return x in container
+		except TypeError:
+			# unhashable values can't be in a set or dict
+			return False
+	return contains
+
+def _range_membership(value):
+	if not value:
+		return lambda x: False
+	start, last = value[0], value[-1]
+	step = value[1] - start if len(value) > 1 else 1
+	low, high = min(start, last), max(start, last)
+	def contains(x):
+		return (
+			isinstance(x, (int, long, float)) and low <= x <= high and
+			(x - start) % step == 0
+		)
+	return contains
+
+def _totally_ordered(value):
+	"""
+	True for numbers, strings and lists and tuples of them, which compare in a
+	total order unlike sets which only compare as subsets
+	"""
+	if isinstance(value, (list, tuple)):
+		return all(_totally_ordered(v) for v in value)
+	return isinstance(value, (int, long, float, basestring))
+
+def _sorted_membership(value):
+	if len(set(type(v) for v in value)) != 1 or not all(_totally_ordered(v) for v in value):
+		return lambda x: x in value
+	ordered = sorted(value)
+	size = len(ordered)
+	def contains(x):
+		idx = bisect_left(ordered, x)
+		return idx < size and ordered[idx] == x
+	return contains
+
 def is_in(value):
-	return lambda x: x in value
+	return _membership(value)
 
 def is_not_in(value):
-	return lambda x: x not in value
+	contains = _membership(value)
+	return lambda x: not contains(x)
+
+def between(low, high):
+	return lambda x: low <= x <= high
 
 def any_of(value):
 	return lambda x: any(v(x) for v in value)
@@ -65,3 +143,42 @@ def any_of(value):
 def all_of(value):
 	return lambda x: all(v(x) for v in value)
 
+
+def memoize(value, size=128):
+	"""
+	Wrap a pure single argument function so that the results of the size most
+	recently used arguments are cached.  Arguments are cached by type and value
+	so that 1, 1.0 and True are separate entries.  Unhashable arguments are
+	passed to the function without being cached and exceptions are never
+	cached.  The cache and its hit and miss counts are available as the cache
+	attribute of the returned function.
+	"""
+	cache = LRUCache(size)
+	def memoized(x):
+		try:
+			key = (x.__class__, x)
+			result = cache.get(key, _missing)
+		except TypeError:
+			return value(x)
+		if result is _missing:
+			result = cache[key] = value(x)
+		return result
+	memoized.cache = cache
+	memoized.__wrapped__ = value
+	return memoized
+
+def deferred(value, key=None):
+	"""
+	Mark a validator which does I/O.  A deferred validator is not run when an
+	attribute is set, Object.async_validate runs all of the deferred validators
+	of an instance concurrently.  Checks with equal keys are only run once per
+	call to async_validate.  key is a function of the value being validated and
+	defaults to the validator and the value.
+	"""
+	def deferred_validator(x):
+		return value(x)
+	deferred_validator.deferred = True
+	deferred_validator.key = key or (lambda x: (deferred_validator, x))
+	deferred_validator.__wrapped__ = value
+	deferred_validator.key_function = key
+	return deferred_validator